@@ -0,0 +1,13 @@
+"""
+gunicorn settings, loaded automatically when gunicorn starts from this directory.
+"""
+import os
+
+
+def on_starting(server):
+    # Metric files from a previous run would be summed into this run's totals
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'voting_admin.settings')
+    import django
+    django.setup()
+    from management.metrics import clear_multiprocess_dir
+    clear_multiprocess_dir()
@@ -1,13 +1,28 @@
 from django.contrib import admin
-from .models import Vote, VoteResults, SystemLog
+from .models import Round, Team, Vote, VoteResults, DeviceReset, SystemLog, VoterAggregate, SyncStatus
+
+
+@admin.register(Round)
+class RoundAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'started_at', 'ended_at', 'purged_at']
+    readonly_fields = ['started_at', 'ended_at', 'purged_at', 'summary']
+    ordering = ['-id']
+
+
+@admin.register(Team)
+class TeamAdmin(admin.ModelAdmin):
+    list_display = ['team_id', 'name', 'position']
+    list_editable = ['position']
+    search_fields = ['team_id', 'name']
 
 
 @admin.register(Vote)
 class VoteAdmin(admin.ModelAdmin):
-    list_display = ['name', 'user_team', 'voted_for', 'timestamp', 'ip_address', 'synced_with_backend']
-    list_filter = ['user_team', 'voted_for', 'synced_with_backend', 'timestamp']
+    list_display = ['name', 'team_display_name', 'voted_for_display_name', 'timestamp', 'ip_address',
+                    'synced_with_backend']
+    list_filter = ['round', 'user_team', 'voted_for', 'synced_with_backend', 'timestamp']
     search_fields = ['name', 'user_identifier', 'vote_id', 'ip_address']
-    readonly_fields = ['vote_id', 'timestamp', 'created_at', 'updated_at']
+    readonly_fields = ['round', 'vote_id', 'timestamp', 'created_at', 'updated_at']
     ordering = ['-timestamp']
     
     fieldsets = (
@@ -18,7 +33,7 @@ class VoteAdmin(admin.ModelAdmin):
             'fields': ('user_identifier', 'ip_address')
         }),
         ('System Fields', {
-            'fields': ('synced_with_backend', 'created_at', 'updated_at'),
+            'fields': ('round', 'synced_with_backend', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
@@ -26,13 +41,28 @@ class VoteAdmin(admin.ModelAdmin):
 
 @admin.register(VoteResults)
 class VoteResultsAdmin(admin.ModelAdmin):
-    list_display = ['team_name', 'vote_count', 'percentage', 'total_votes', 'last_updated']
-    list_filter = ['last_updated']
+    list_display = ['team_name', 'vote_count', 'percentage', 'total_votes', 'round', 'last_updated']
+    list_filter = ['round', 'last_updated']
     search_fields = ['team_name', 'team_id']
     readonly_fields = ['last_updated']
     ordering = ['-vote_count']
 
 
+@admin.register(DeviceReset)
+class DeviceResetAdmin(admin.ModelAdmin):
+    list_display = ['timestamp', 'previous_voter_count']
+    readonly_fields = ['timestamp', 'previous_voter_count']
+    ordering = ['-timestamp']
+
+
+@admin.register(VoterAggregate)
+class VoterAggregateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'voted_for_display_name', 'vote_count', 'latest_timestamp', 'ip_address']
+    search_fields = ['name', 'ip_address']
+    readonly_fields = ['updated_at']
+    ordering = ['-latest_timestamp']
+
+
 @admin.register(SystemLog)
 class SystemLogAdmin(admin.ModelAdmin):
     list_display = ['timestamp', 'level', 'action_type', 'message_short', 'user', 'ip_address']
@@ -44,3 +74,11 @@ class SystemLogAdmin(admin.ModelAdmin):
     def message_short(self, obj):
         return obj.message[:50] + '...' if len(obj.message) > 50 else obj.message
     message_short.short_description = 'Message'
+
+
+@admin.register(SyncStatus)
+class SyncStatusAdmin(admin.ModelAdmin):
+    list_display = ['task', 'last_success_at', 'last_attempt_at', 'consecutive_failures', 'next_run_at']
+    readonly_fields = ['task', 'data', 'last_attempt_at', 'last_success_at', 'last_error',
+                       'consecutive_failures', 'next_run_at']
+    ordering = ['task']
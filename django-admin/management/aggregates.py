@@ -0,0 +1,88 @@
+"""
+Incremental maintenance of ``VoterAggregate`` rows.
+
+Votes are grouped by round and voter name (blank names become
+``Anonymous``). New votes are merged into the existing rows; deletions
+rebuild only the affected names from the ``Vote`` table.
+"""
+from typing import Iterable, Optional
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Vote, VoterAggregate, active_round_id
+
+
+def voter_key(name: Optional[str]) -> str:
+    """Aggregate key for a vote's name"""
+    return (name or '').strip() or VoterAggregate.ANONYMOUS
+
+
+def _merge(aggregate: VoterAggregate, vote: Vote):
+    teams = set(filter(None, aggregate.voted_for_teams.split(',')))
+    if vote.voted_for:
+        teams.add(vote.voted_for)
+    aggregate.voted_for_teams = ','.join(sorted(teams))
+    if vote.user_team and not aggregate.user_team:
+        aggregate.user_team = vote.user_team
+    if aggregate.latest_timestamp is None or vote.timestamp > aggregate.latest_timestamp:
+        aggregate.latest_timestamp = vote.timestamp
+        aggregate.ip_address = vote.ip_address
+    aggregate.vote_count += 1
+
+
+def record_votes(votes: Iterable[Vote]):
+    """Merge newly inserted votes into their voters' aggregates (call inside the insert transaction)"""
+    by_key = {}
+    for vote in votes:
+        by_key.setdefault((vote.round_id, voter_key(vote.name)), []).append(vote)
+    if not by_key:
+        return
+
+    existing = {}
+    for round_id in {round_id for round_id, _ in by_key}:
+        names = [name for key_round, name in by_key if key_round == round_id]
+        for aggregate in VoterAggregate.objects.in_round(round_id).filter(name__in=names):
+            existing[round_id, aggregate.name] = aggregate
+    created = []
+    for key, key_votes in by_key.items():
+        aggregate = existing.get(key)
+        if aggregate is None:
+            aggregate = VoterAggregate(round_id=key[0], name=key[1], latest_timestamp=None)
+            created.append(aggregate)
+        for vote in key_votes:
+            _merge(aggregate, vote)
+
+    if created:
+        VoterAggregate.objects.bulk_create(created)
+    if existing:
+        # bulk_update() skips auto_now, so stamp the rows here
+        now = timezone.now()
+        for aggregate in existing.values():
+            aggregate.updated_at = now
+        VoterAggregate.objects.bulk_update(
+            [aggregate for key, aggregate in existing.items() if key in by_key],
+            ['user_team', 'voted_for_teams', 'latest_timestamp', 'ip_address', 'vote_count', 'updated_at']
+        )
+
+
+def rebuild_voter_aggregates(names: Optional[Iterable[str]] = None, round_id: Optional[int] = None):
+    """
+    Recompute aggregates for the given voter keys (all voters when omitted)
+    of a round (the active one by default) from the Vote table
+    """
+    round_id = round_id or active_round_id()
+    if names is None:
+        VoterAggregate.objects.in_round(round_id).delete()
+        votes = Vote.objects.in_round(round_id)
+    else:
+        keys = {voter_key(name) for name in names}
+        if not keys:
+            return
+        VoterAggregate.objects.in_round(round_id).filter(name__in=keys).delete()
+        query = Q(name__in=keys)
+        if VoterAggregate.ANONYMOUS in keys:
+            query |= Q(name__isnull=True) | Q(name='')
+        votes = Vote.objects.in_round(round_id).filter(query)
+
+    record_votes(votes.order_by('id').iterator())
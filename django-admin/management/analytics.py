@@ -0,0 +1,262 @@
+"""
+Vectorized vote analytics.
+
+``VoteFrame`` holds the active round's votes as NumPy arrays, grouped per
+minute by the database: ``minute`` (minutes since the epoch, UTC),
+``user_team`` and ``voted_for`` (small int codes into ``teams``) and
+``count``. Like the ingestion engine, each process loads the arrays once
+and then appends the votes after its primary-key cursor, so a report over a
+million votes costs a few passes over the arrays instead of a table scan.
+
+The reports in ``REPORTS`` are weighted bincounts and cumulative sums over
+those arrays, bucketed so a chart has at most ``ANALYTICS['MAX_POINTS']``
+points. ``report()`` caches them in the stats cache per newest vote and
+data version.
+"""
+import logging
+import math
+import threading
+from datetime import timezone as dt_timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import CharField, Count
+from django.db.models.functions import Substr, Trunc
+
+from .models import Vote, active_round_id
+from .stats_cache import get_stats_cache
+from .teams import get_registry
+
+logger = logging.getLogger(__name__)
+
+TEAM_CODE = np.int16
+EPOCH = np.datetime64(0, 'm')
+
+
+def _minute_expression():
+    if connection.vendor == 'sqlite':
+        # Stored as UTC text: slicing avoids a Python function call per row
+        return Substr('timestamp', 1, 16, output_field=CharField())
+    return Trunc('timestamp', 'minute', tzinfo=dt_timezone.utc)
+
+
+def _to_minutes(values) -> np.ndarray:
+    if isinstance(values[0], str):
+        stamps = np.array(values, dtype='datetime64[m]')
+    else:
+        stamps = np.array([value.replace(tzinfo=None) for value in values], dtype='datetime64[m]')
+    return (stamps - EPOCH).astype(np.int64)
+
+
+class VoteFrame:
+    """A round's votes grouped per minute, as parallel arrays"""
+
+    def __init__(self, round_id: Optional[int], teams: Tuple[str, ...], minute: np.ndarray,
+                 user_team: np.ndarray, voted_for: np.ndarray, count: np.ndarray):
+        self.round_id = round_id
+        self.teams = teams
+        self.minute = minute
+        self.user_team = user_team
+        self.voted_for = voted_for
+        self.count = count
+
+    @classmethod
+    def empty(cls, round_id: Optional[int] = None) -> 'VoteFrame':
+        return cls(round_id, tuple(get_registry()), np.empty(0, np.int64), np.empty(0, TEAM_CODE),
+                   np.empty(0, TEAM_CODE), np.empty(0, np.int64))
+
+    @property
+    def total(self) -> int:
+        return int(self.count.sum())
+
+    def extend(self, rows: List[Tuple]) -> 'VoteFrame':
+        """A new frame with ``(minute, user_team, voted_for, votes)`` rows appended"""
+        if not rows:
+            return self
+        minutes, user_teams, voted_fors, counts = zip(*rows)
+        teams = list(self.teams)
+        codes = {team_id: code for code, team_id in enumerate(teams)}
+
+        def encode(team_ids):
+            for team_id in team_ids:
+                code = codes.get(team_id)
+                if code is None:
+                    # Not in the registry when the frame was started
+                    code = codes[team_id] = len(teams)
+                    teams.append(team_id)
+                yield code
+
+        return VoteFrame(
+            self.round_id,
+            tuple(teams),
+            np.concatenate([self.minute, _to_minutes(minutes)]),
+            np.concatenate([self.user_team, np.fromiter(encode(user_teams), TEAM_CODE, len(rows))]),
+            np.concatenate([self.voted_for, np.fromiter(encode(voted_fors), TEAM_CODE, len(rows))]),
+            np.concatenate([self.count, np.array(counts, dtype=np.int64)]),
+        )
+
+
+class VoteFrameLoader:
+    """The process-wide ``VoteFrame`` of the active round, kept up to date incrementally"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = VoteFrame.empty()
+        self._first_vote_id = None
+        self._last_vote_id = 0
+
+    def frame(self) -> VoteFrame:
+        with self._lock:
+            round_id = active_round_id()
+            votes = Vote.objects.in_round(round_id)
+            ids = votes.order_by('id').values_list('id', flat=True)
+            # Two index lookups; MIN and MAX in one query scan the round
+            first_id, last_id = ids.first(), ids.last()
+            # Within a round votes are only deleted by syncs, so a changed
+            # lowest id means the arrays must be rebuilt
+            if round_id != self._frame.round_id or first_id != self._first_vote_id:
+                if self._frame.round_id is not None:
+                    logger.info("Votes changed underneath the analytics frame, reloading")
+                self._frame = VoteFrame.empty(round_id)
+                self._first_vote_id = first_id
+                self._last_vote_id = 0
+
+            if last_id is not None and last_id > self._last_vote_id:
+                rows = list(votes.filter(id__gt=self._last_vote_id, id__lte=last_id)
+                            .annotate(minute=_minute_expression())
+                            .order_by()
+                            .values_list('minute', 'user_team', 'voted_for')
+                            .annotate(votes=Count('id')))
+                self._frame = self._frame.extend(rows)
+                self._last_vote_id = last_id
+            return self._frame
+
+
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def get_frame() -> VoteFrame:
+    """The active round's votes, refreshed from the database"""
+    global _loader
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = VoteFrameLoader()
+    return _loader.frame()
+
+
+# Reports
+
+def _team_names(frame: VoteFrame) -> List[str]:
+    registry = get_registry()
+    return [registry.name(team_id) for team_id in frame.teams]
+
+
+def _per_bucket(frame: VoteFrame) -> Tuple[List[str], int, np.ndarray]:
+    """Bucket labels, bucket width in minutes and a (buckets x teams) array of votes received"""
+    teams = len(frame.teams)
+    if not len(frame.count):
+        return [], 1, np.zeros((0, teams), dtype=np.int64)
+    first = frame.minute.min()
+    span = int(frame.minute.max() - first) + 1
+    width = max(1, math.ceil(span / settings.ANALYTICS['MAX_POINTS']))
+    bucket = (frame.minute - first) // width
+    buckets = int(bucket.max()) + 1
+    votes = np.bincount(bucket * teams + frame.voted_for, weights=frame.count, minlength=buckets * teams)
+    starts = EPOCH + first + np.arange(buckets) * width
+    labels = np.datetime_as_string(starts.astype('datetime64[m]'), timezone='UTC').tolist()
+    return labels, width, votes.reshape(buckets, teams).astype(np.int64)
+
+
+def votes_per_minute(frame: VoteFrame) -> Dict[str, Any]:
+    labels, width, votes = _per_bucket(frame)
+    return {
+        'bucket_minutes': width,
+        'labels': labels,
+        'teams': _team_names(frame),
+        'votes': votes.sum(axis=1).tolist(),
+        'votes_by_team': votes.T.tolist(),
+    }
+
+
+def cumulative_share(frame: VoteFrame) -> Dict[str, Any]:
+    """Each team's percentage of the votes cast up to the end of every bucket"""
+    labels, width, votes = _per_bucket(frame)
+    cumulative = votes.cumsum(axis=0)
+    totals = cumulative.sum(axis=1, keepdims=True)
+    share = np.divide(cumulative * 100.0, totals, out=np.zeros(cumulative.shape), where=totals > 0)
+    return {
+        'bucket_minutes': width,
+        'labels': labels,
+        'teams': _team_names(frame),
+        'share': share.round(2).T.tolist(),
+    }
+
+
+def team_matrix(frame: VoteFrame) -> Dict[str, Any]:
+    """Votes from each user_team (rows) for each voted_for team (columns)"""
+    teams = len(frame.teams)
+    matrix = np.bincount(frame.user_team.astype(np.int64) * teams + frame.voted_for,
+                         weights=frame.count, minlength=teams * teams)
+    matrix = matrix.reshape(teams, teams).astype(np.int64)
+    return {
+        'teams': _team_names(frame),
+        'matrix': matrix.tolist(),
+        'cast': matrix.sum(axis=1).tolist(),
+        'received': matrix.sum(axis=0).tolist(),
+    }
+
+
+def leader_changes(frame: VoteFrame) -> Dict[str, Any]:
+    """Buckets at whose end a different team leads the cumulative count; ties keep the previous leader"""
+    labels, width, votes = _per_bucket(frame)
+    names = _team_names(frame)
+    if not labels:
+        return {'bucket_minutes': width, 'leader': None, 'changes': []}
+    cumulative = votes.cumsum(axis=0)
+    top = cumulative.max(axis=1)
+    clear = ((cumulative == top[:, None]).sum(axis=1) == 1) & (top > 0)
+    # Index of the latest bucket with a clear leader, -1 before the first
+    latest_clear = np.maximum.accumulate(np.where(clear, np.arange(len(labels)), -1))
+    leader = np.where(latest_clear >= 0, cumulative.argmax(axis=1)[latest_clear.clip(0)], -1)
+    changes = np.flatnonzero(leader != np.concatenate([[-1], leader[:-1]]))
+    return {
+        'bucket_minutes': width,
+        'leader': names[leader[-1]] if leader[-1] >= 0 else None,
+        'changes': [
+            {
+                'at': labels[i],
+                'from': names[leader[i - 1]] if i and leader[i - 1] >= 0 else None,
+                'to': names[leader[i]],
+                'votes': int(top[i]),
+            }
+            for i in changes.tolist()
+        ],
+    }
+
+
+REPORTS: Dict[str, Callable[[VoteFrame], Dict[str, Any]]] = {
+    'votes-per-minute': votes_per_minute,
+    'cumulative-share': cumulative_share,
+    'matrix': team_matrix,
+    'leader-changes': leader_changes,
+}
+
+
+def report(name: str) -> Dict[str, Any]:
+    """A report on the active round, computed once per data version and shared by every worker"""
+    compute = REPORTS[name]
+    stats_cache = get_stats_cache()
+    round_id = active_round_id()
+    # Votes aren't counted in the shared data version (that would put a
+    # locked file write on every vote): the newest id marks new ones instead
+    last_id = Vote.objects.in_round(round_id).order_by('-id').values_list('id', flat=True).first()
+    key = f'analytics:{name}:{round_id}:{last_id}:{stats_cache.version()}'
+
+    def build():
+        frame = get_frame()
+        return {'round': frame.round_id, 'total_votes': frame.total, **compute(frame)}
+    return stats_cache.get_or_compute(key, build)
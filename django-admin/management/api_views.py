@@ -0,0 +1,253 @@
+"""
+Public voting API served by Django.
+
+These endpoints mirror the Express server contract (server/server.js) so the
+Next.js frontend and ``VotingAPIService`` can point at either backend.
+"""
+import json
+import logging
+from datetime import timezone as dt_timezone
+
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
+
+from .ingestion import VoteRejected, get_engine
+from . import ratelimit
+from .logbuffer import write_log
+from .models import Vote
+from .services import invalidate_stats_cache
+from .tallies import percentage
+from .teams import get_registry
+from .views import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(dt):
+    """Format a datetime the way JavaScript's ``Date.toISOString`` does"""
+    if dt is None:
+        return None
+    return dt.astimezone(dt_timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def _parse_json(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _throttled(request, route, identifier=None):
+    """A 429 response if the client address or identifier is over ``route``'s rate limit"""
+    retry_after = ratelimit.check(route, ip=ratelimit.client_address(request), identifier=identifier)
+    if retry_after is None:
+        return None
+    response = JsonResponse({'error': 'Too many requests', 'retryAfter': retry_after}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+@require_http_methods(["GET"])
+def health_check(request):
+    """Health check"""
+    return JsonResponse({'status': 'OK', 'timestamp': _iso(timezone.now())})
+
+
+def _results_etag(request):
+    # The body comes from this worker's tallies, which may trail the shared
+    # data version by a refresh interval: tag what is actually served
+    return get_engine().results_version()
+
+
+@require_http_methods(["GET"])
+@cache_control(no_cache=True)
+@condition(etag_func=_results_etag)
+def get_results(request):
+    """Get current vote results from the in-memory tallies"""
+    tallies, total_votes = get_engine().results()
+    team_names = get_registry().names
+
+    return JsonResponse({
+        'results': [
+            {
+                'teamId': team_id,
+                'teamName': team_names[team_id],
+                'votes': count,
+                'percentage': percentage(count, total_votes),
+            }
+            for team_id, count in tallies.items()
+        ],
+        'totalVotes': total_votes,
+        'timestamp': _iso(timezone.now()),
+    })
+
+
+@require_http_methods(["GET"])
+def vote_status(request, identifier):
+    """Check if a user has voted"""
+    throttled = _throttled(request, 'vote_status', identifier)
+    if throttled:
+        return throttled
+
+    engine = get_engine()
+    return JsonResponse({
+        'hasVoted': engine.has_voted(identifier),
+        'identifier': identifier,
+        'lastDeviceResetTimestamp': _iso(engine.last_device_reset()),
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def submit_vote(request):
+    """Submit a vote"""
+    data = _parse_json(request)
+    identifier = data.get('userIdentifier') if isinstance(data, dict) else None
+    throttled = _throttled(request, 'vote', identifier if isinstance(identifier, str) else None)
+    if throttled:
+        return throttled
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+
+    engine = get_engine()
+    try:
+        vote = engine.submit_vote(
+            user_team=data.get('userTeam'),
+            voted_for=data.get('votedFor'),
+            user_identifier=data.get('userIdentifier'),
+            name=data.get('name'),
+            ip_address=get_client_ip(request)
+        )
+    except VoteRejected as e:
+        return JsonResponse({'error': e.message, **e.extra}, status=e.status)
+    except Exception as e:
+        logger.error(f"Error processing vote: {str(e)}")
+        return JsonResponse({'error': 'Internal server error'}, status=500)
+
+    tallies, total_votes = engine.results()
+
+    return JsonResponse({
+        'success': True,
+        'message': 'Vote recorded successfully',
+        'vote': {
+            'id': vote.vote_id,
+            'userTeam': vote.team_display_name,
+            'votedFor': vote.voted_for_display_name,
+            'timestamp': _iso(vote.timestamp),
+        },
+        'results': tallies,
+        'totalVotes': total_votes,
+    }, status=201)
+
+
+@require_http_methods(["GET"])
+def admin_votes(request):
+    """Get all votes (admin endpoint), optionally only those at or after ``?since=``"""
+    engine = get_engine()
+    votes = Vote.objects.in_round().order_by('id').values_list(
+        'vote_id', 'user_team', 'voted_for', 'timestamp', 'ip_address', 'name'
+    )
+
+    try:
+        since = parse_datetime(request.GET.get('since', ''))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid since timestamp'}, status=400)
+    if since:
+        votes = votes.filter(timestamp__gte=since)
+    teams = get_registry()
+
+    return JsonResponse({
+        'votes': [
+            {
+                'id': vote_id,
+                'userTeam': teams.name(user_team),
+                'votedFor': teams.name(voted_for),
+                'timestamp': _iso(ts),
+                'ipAddress': ip_address,
+                'name': name,
+            }
+            for vote_id, user_team, voted_for, ts, ip_address, name in votes.iterator()
+        ],
+        'totalVotes': engine.results()[1],
+        'uniqueVoters': len(engine.voters()),
+        'since': _iso(since),
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def admin_reset(request):
+    """Reset all votes (admin endpoint)"""
+    data = _parse_json(request) or {}
+    if data.get('confirm') != 'RESET_ALL_VOTES':
+        return JsonResponse({
+            'error': 'Must provide confirmation: { "confirm": "RESET_ALL_VOTES" }'
+        }, status=400)
+
+    get_engine().reset_votes()
+    invalidate_stats_cache()
+
+    write_log(
+        level='WARNING',
+        action_type='ADMIN_ACTION',
+        message="All votes have been reset via API",
+        details={'action': 'api_reset_votes'},
+        ip_address=get_client_ip(request)
+    )
+
+    return JsonResponse({
+        'success': True,
+        'message': 'All votes have been reset',
+        'timestamp': _iso(timezone.now()),
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def admin_reset_devices(request):
+    """Reset all device IDs (admin endpoint) - allows all users to vote again"""
+    data = _parse_json(request) or {}
+    if data.get('confirm') != 'RESET_ALL_DEVICES':
+        return JsonResponse({
+            'error': 'Must provide confirmation: { "confirm": "RESET_ALL_DEVICES" }'
+        }, status=400)
+
+    device_reset = get_engine().reset_devices()
+    invalidate_stats_cache()
+    previous_voter_count = device_reset.previous_voter_count
+    message = (f"All device IDs have been reset. {previous_voter_count} users can now vote again "
+               f"and select teams again.")
+
+    write_log(
+        level='WARNING',
+        action_type='ADMIN_ACTION',
+        message=message,
+        details={'action': 'api_reset_devices', 'previous_voter_count': previous_voter_count},
+        ip_address=get_client_ip(request)
+    )
+
+    return JsonResponse({
+        'success': True,
+        'message': message,
+        'previousVoterCount': previous_voter_count,
+        'resetTimestamp': _iso(device_reset.timestamp),
+        'timestamp': _iso(timezone.now()),
+    })
+
+
+@require_http_methods(["GET"])
+def admin_devices(request):
+    """Get device/voter statistics (admin endpoint)"""
+    engine = get_engine()
+    voters = engine.voters()
+
+    return JsonResponse({
+        'totalUniqueDevices': len(voters),
+        'totalVotes': engine.results()[1],
+        'devicesWithVotes': sorted(voters),
+        'timestamp': _iso(timezone.now()),
+    })
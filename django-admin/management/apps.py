@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class ManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'management'
+
+    def ready(self):
+        from . import metrics, sqlite, teams
+        connection_created.connect(sqlite.apply_pragmas, dispatch_uid='management.sqlite.pragmas')
+        # Time BEGIN IMMEDIATE on every connection: that's where writers wait for the lock
+        connection_created.connect(metrics.install_db_timing, dispatch_uid='management.metrics.db_timing')
+        post_save.connect(teams.teams_changed, sender='management.Team', dispatch_uid='management.teams.saved')
+        post_delete.connect(teams.teams_changed, sender='management.Team', dispatch_uid='management.teams.deleted')
@@ -0,0 +1,92 @@
+"""Shared helpers for the benchmark management commands."""
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Summarize request latencies (seconds) into throughput and percentiles (ms)"""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        'requests': count,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_per_s': round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        'mean_ms': round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+@contextmanager
+def isolated_database():
+    """Run against a freshly migrated throwaway database instead of the configured one"""
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_gunicorn(workdir: str, workers: int, threads: int,
+                   env: Optional[Dict[str, str]] = None) -> Tuple[subprocess.Popen, str]:
+    """
+    Start gunicorn against a fresh SQLite database, stats cache and metrics in ``workdir``
+    so real data is never touched. Returns the process and the app's base URL.
+    """
+    env = dict(os.environ, DATABASE_NAME=os.path.join(workdir, 'bench.sqlite3'),
+               STATS_CACHE_LOCATION=os.path.join(workdir, 'cache'),
+               PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'metrics'), DEBUG='False',
+               # Load generators send everything from one address
+               RATE_LIMIT_ENABLED='False', **(env or {}))
+    manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+    subprocess.run([sys.executable, manage_py, 'migrate', '--noinput', '-v', '0'],
+                   env=env, check=True, cwd=settings.BASE_DIR)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'voting_admin.wsgi:application',
+         '--workers', str(workers), '--threads', str(threads),
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        env=env, cwd=settings.BASE_DIR
+    )
+    base_url = f'http://127.0.0.1:{port}/management'
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f'{base_url}/api/health/', timeout=1)
+            return server, base_url
+        except requests.exceptions.RequestException:
+            if server.poll() is not None:
+                raise CommandError("gunicorn exited during startup")
+            time.sleep(0.2)
+
+    server.terminate()
+    raise CommandError("gunicorn did not become ready within 30s")
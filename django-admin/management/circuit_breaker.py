@@ -0,0 +1,165 @@
+"""
+Circuit breaker around the voting backend, shared by every worker process.
+
+* ``closed``    - calls go through; consecutive failures (connection errors,
+  timeouts, 5xx responses) are counted and ``FAILURE_THRESHOLD`` of them
+  open the circuit
+* ``open``      - calls fail at once with ``CircuitOpenError`` for
+  ``RECOVERY_TIMEOUT`` seconds, so views fall back to local data instead of
+  holding a worker for the whole request timeout
+* ``half_open`` - one caller, in any worker, probes the backend; success
+  closes the circuit, failure opens it again
+
+The state lives in the stats cache (file based, so every gunicorn worker
+sees it) and transitions take the cache's cross-process lock. Transitions
+are written to the system log and counted in Prometheus.
+"""
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .logbuffer import write_log
+from .metrics import record_circuit_transition
+from .stats_cache import get_stats_cache
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the backend while the circuit is open"""
+
+    def __init__(self, name: str, retry_at: Optional[float]):
+        self.name = name
+        self.retry_at = retry_at
+        when = _as_datetime(retry_at).strftime('%H:%M:%S') if retry_at else 'soon'
+        super().__init__(f"Circuit '{name}' is open: backend calls are paused until {when}")
+
+
+def _as_datetime(timestamp: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc) if timestamp else None
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker whose state every worker shares"""
+
+    def __init__(self, name: str = 'voting_backend', failure_threshold: int = None,
+                 recovery_timeout: float = None, probe_timeout: float = None,
+                 on_transition: Callable[[str, str], None] = None):
+        config = settings.VOTING_API_CIRCUIT_BREAKER
+        self.name = name
+        self.enabled = config['ENABLED']
+        self.failure_threshold = failure_threshold or config['FAILURE_THRESHOLD']
+        self.recovery_timeout = config['RECOVERY_TIMEOUT'] if recovery_timeout is None else recovery_timeout
+        self.probe_timeout = config['PROBE_TIMEOUT'] if probe_timeout is None else probe_timeout
+        self.on_transition = on_transition
+        self.key = f'circuit:{name}'
+
+    @property
+    def cache(self):
+        return caches[settings.STATS_CACHE_ALIAS]
+
+    def _read(self) -> Dict[str, Any]:
+        return self.cache.get(self.key) or {'state': CLOSED, 'failures': 0, 'opened_at': None, 'probe_until': 0}
+
+    def _write(self, state: Dict[str, Any]):
+        self.cache.set(self.key, state, timeout=None)
+
+    def _lock(self):
+        return get_stats_cache()._lock(self.key)
+
+    @property
+    def state(self) -> str:
+        return self._read()['state']
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State for the UI and JSON responses"""
+        state = self._read()
+        opened_at = state['opened_at'] if state['state'] != CLOSED else None
+        return {
+            'state': state['state'],
+            'failures': state['failures'],
+            'opened_at': _as_datetime(opened_at),
+            'retry_at': _as_datetime(opened_at + self.recovery_timeout) if state['state'] == OPEN else None,
+        }
+
+    def before_call(self):
+        """Raise ``CircuitOpenError`` unless a backend call may go ahead now"""
+        if not self.enabled:
+            return
+        state = self._read()
+        if state['state'] == CLOSED:
+            return
+        if state['state'] == OPEN and time.time() < state['opened_at'] + self.recovery_timeout:
+            raise CircuitOpenError(self.name, state['opened_at'] + self.recovery_timeout)
+
+        # The recovery timeout has passed: let a single caller probe the backend
+        with self._lock():
+            state = self._read()
+            now = time.time()
+            if state['state'] == CLOSED:
+                return
+            if state['state'] == OPEN and now < state['opened_at'] + self.recovery_timeout:
+                raise CircuitOpenError(self.name, state['opened_at'] + self.recovery_timeout)
+            if state['state'] == HALF_OPEN and now < state['probe_until']:
+                # Another caller is probing; give up on it after PROBE_TIMEOUT
+                raise CircuitOpenError(self.name, state['probe_until'])
+            previous = state['state']
+            state.update(state=HALF_OPEN, probe_until=now + self.probe_timeout)
+            self._write(state)
+        if previous != HALF_OPEN:
+            self._transitioned(previous, HALF_OPEN, state)
+
+    def record_success(self):
+        if not self.enabled:
+            return
+        state = self._read()
+        if state['state'] == CLOSED and not state['failures']:
+            return
+        with self._lock():
+            state = self._read()
+            previous = state['state']
+            state.update(state=CLOSED, failures=0, opened_at=None, probe_until=0)
+            self._write(state)
+        if previous != CLOSED:
+            self._transitioned(previous, CLOSED, state)
+
+    def record_failure(self, error: str = ''):
+        if not self.enabled:
+            return
+        with self._lock():
+            state = self._read()
+            previous = state['state']
+            state['failures'] += 1
+            if previous == HALF_OPEN or (previous == CLOSED and state['failures'] >= self.failure_threshold):
+                state.update(state=OPEN, opened_at=time.time(), probe_until=0)
+            self._write(state)
+        if state['state'] != previous:
+            self._transitioned(previous, state['state'], state, error)
+
+    def reset(self):
+        """Forget all failures and close the circuit"""
+        self.cache.delete(self.key)
+
+    def _transitioned(self, previous: str, current: str, state: Dict[str, Any], error: str = ''):
+        message = f"Circuit '{self.name}' {previous} -> {current}"
+        if current == OPEN:
+            message += f" after {state['failures']} consecutive failures; retrying in {self.recovery_timeout:g}s"
+        logger.warning(message)
+        record_circuit_transition(self.name, current)
+        write_log(
+            level={OPEN: 'ERROR', HALF_OPEN: 'WARNING', CLOSED: 'SUCCESS'}[current],
+            action_type='CIRCUIT_BREAKER',
+            message=message,
+            details={'breaker': self.name, 'from': previous, 'to': current,
+                     'failures': state['failures'], 'error': error or None},
+        )
+        if self.on_transition:
+            self.on_transition(previous, current)
@@ -0,0 +1,9 @@
+from django.core.handlers.asgi import ASGIRequest
+
+
+def live_stream(request):
+    """
+    Whether pages may open the live stream: it needs an ASGI server, a WSGI
+    worker would be held by each open tab without sending anything.
+    """
+    return {'live_stream_available': isinstance(request, ASGIRequest)}
@@ -0,0 +1,126 @@
+"""
+Streaming CSV / NDJSON exports.
+
+Rows come from ``QuerySet.iterator(chunk_size=...)`` and are encoded and
+yielded in small batches, so an export holds one chunk of rows and one
+output buffer in memory however large the table is. ``gzip=True``
+compresses the stream on the fly.
+"""
+import csv
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, Sequence, Tuple
+
+from django.conf import settings
+from django.db.models import Count, QuerySet
+from django.db.models.functions import Trunc
+
+from .teams import get_registry
+
+# format -> (content type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+VOTE_COLUMNS = ('vote_id', 'timestamp', 'name', 'user_team', 'voted_for', 'user_identifier',
+                'ip_address', 'synced_with_backend')
+LOG_COLUMNS = ('id', 'timestamp', 'level', 'action_type', 'message', 'user', 'ip_address', 'details')
+RESULTS_HISTORY_COLUMNS = ('period', 'team_id', 'team_name', 'votes', 'cumulative_votes')
+RESULTS_INTERVALS = ('hour', 'day')
+
+# Yield once this much output has accumulated: fewer, larger writes to the socket
+BUFFER_BYTES = 64 * 1024
+
+# Spreadsheet apps run cells starting with these as formulas
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def queryset_rows(queryset: QuerySet, columns: Sequence[str]) -> Iterator[Tuple]:
+    """Stream ``columns`` of every row, fetching ``EXPORT_CHUNK_SIZE`` rows at a time"""
+    return queryset.values_list(*columns).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def results_history_rows(votes: QuerySet, interval: str = 'hour') -> Iterator[Tuple]:
+    """
+    Votes received per team in each hour (or day), with each team's running total.
+
+    ``VoteResults`` only holds the current tally; the history is rebuilt
+    from the stored votes with one grouped query.
+    """
+    buckets = (votes.annotate(period=Trunc('timestamp', interval))
+               .values_list('period', 'voted_for')
+               .annotate(votes=Count('id'))
+               .order_by('period', 'voted_for'))
+    totals: Dict[str, int] = {}
+    teams = get_registry()
+    for period, team_id, count in buckets.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+        totals[team_id] = totals.get(team_id, 0) + count
+        yield period, team_id, teams.name(team_id), count, totals[team_id]
+
+
+def stream_export(rows: Iterable[Tuple], columns: Sequence[str], fmt: str, gzip: bool = False) -> Iterator[bytes]:
+    """Encode ``rows`` as CSV or NDJSON, optionally gzipped"""
+    encoded = _csv_lines(rows, columns) if fmt == 'csv' else _ndjson_lines(rows, columns)
+    chunks = _buffered(encoded)
+    return _gzipped(chunks) if gzip else chunks
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class _Line:
+    """File-like target for csv.writer that hands back the formatted line"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _csv_cell(value: Any) -> Any:
+    value = _plain(value)
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_lines(rows: Iterable[Tuple], columns: Sequence[str]) -> Iterator[str]:
+    writer = csv.writer(_Line())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def _ndjson_lines(rows: Iterable[Tuple], columns: Sequence[str]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({column: _plain(value) for column, value in zip(columns, row)}) + '\n'
+
+
+def _buffered(lines: Iterable[str]) -> Iterator[bytes]:
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_BYTES:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def _gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,493 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import rounds, tallies
+from .aggregates import record_votes
+from .metrics import VOTES_INGESTED
+from .models import Vote, DeviceReset, active_round_id
+from .teams import get_registry
+
+logger = logging.getLogger(__name__)
+
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+class VoteRejected(Exception):
+    """Raised when a vote submission fails validation"""
+
+    def __init__(self, message: str, status: int = 400, **extra):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.extra = extra
+
+
+class VoteIngestionEngine:
+    """
+    In-memory vote tallies and voter set backed by the ``Vote`` table.
+
+    Every accepted vote is committed to the database before it is counted.
+    Each worker process keeps its own tallies and folds in votes written by
+    other workers through a primary-key cursor, so reading results costs
+    O(new votes) instead of a scan of the whole table. Only the active
+    round's votes count; opening a new round makes every worker reload.
+
+    With ``VOTE_GROUP_COMMIT`` enabled, votes are committed in batches by a
+    ``GroupCommitter`` instead of one transaction each.
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        if refresh_interval is None:
+            refresh_interval = getattr(settings, 'VOTING_ENGINE_REFRESH_INTERVAL', 0.25)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        # Identifiers of votes queued for a group commit
+        self._pending = set()
+        self._committer = None
+        self._committer_pid = None
+        self._clear()
+
+    def _clear(self):
+        self._round_id = None
+        # Votes per team id, for whichever teams have votes
+        self._tallies = {}
+        self._total = 0
+        self._voters = set()
+        self._last_vote_id = 0
+        self._first_vote_id = None
+        self._device_reset_id = 0
+        self._device_reset_at = None
+        self._loaded = False
+        self._last_refresh = 0.0
+
+    def _load(self):
+        """Rebuild state from the database"""
+        self._clear()
+        self._round_id = active_round_id()
+
+        latest_reset = DeviceReset.objects.order_by('-id').values('id', 'timestamp').first()
+        if latest_reset:
+            self._device_reset_id = latest_reset['id']
+            self._device_reset_at = latest_reset['timestamp']
+
+        # Cursor first, and count only up to it: a vote committed by another
+        # worker while loading is then folded in by the next refresh
+        ids = Vote.objects.in_round(self._round_id).order_by('id').values_list('id', flat=True)
+        self._first_vote_id = ids.first()
+        self._last_vote_id = ids.last() or 0
+
+        votes = Vote.objects.in_round(self._round_id).filter(id__lte=self._last_vote_id).order_by()
+        for row in votes.values('voted_for').annotate(count=Count('id')):
+            self._tallies[row['voted_for']] = self._tallies.get(row['voted_for'], 0) + row['count']
+            self._total += row['count']
+
+        self._voters = self._load_voters()
+        self._loaded = True
+
+    def _load_voters(self) -> set:
+        voters = Vote.objects.in_round(self._round_id).filter(id__lte=self._last_vote_id).order_by()
+        if self._device_reset_at:
+            voters = voters.filter(timestamp__gt=self._device_reset_at)
+        return set(voters.values_list('user_identifier', flat=True))
+
+    def _refresh(self, force: bool = False):
+        """Fold in votes and resets written since the last refresh"""
+        now = time.monotonic()
+        if self._loaded and not force and now - self._last_refresh < self.refresh_interval:
+            return
+
+        if not self._loaded:
+            self._load()
+            self._last_refresh = now
+            return
+
+        if active_round_id() != self._round_id:
+            logger.info("A new voting round was opened, reloading ingestion engine")
+            self._load()
+            self._last_refresh = now
+            return
+
+        # Within a round votes are only deleted by syncs, so a changed
+        # lowest id means the round's votes changed and state must be rebuilt
+        first_id = Vote.objects.in_round(self._round_id).order_by('id').values_list('id', flat=True).first()
+        if self._first_vote_id is not None and first_id != self._first_vote_id:
+            logger.info("Vote table changed underneath ingestion engine, reloading")
+            self._load()
+            self._last_refresh = now
+            return
+
+        latest_reset = DeviceReset.objects.order_by('-id').values('id', 'timestamp').first()
+        if latest_reset and latest_reset['id'] != self._device_reset_id:
+            self._device_reset_id = latest_reset['id']
+            self._device_reset_at = latest_reset['timestamp']
+            self._voters = self._load_voters()
+
+        new_votes = (Vote.objects.in_round(self._round_id).filter(id__gt=self._last_vote_id)
+                     .order_by('id')
+                     .values_list('id', 'voted_for', 'user_identifier', 'timestamp'))
+        for vote_pk, voted_for, user_identifier, ts in new_votes:
+            self._tallies[voted_for] = self._tallies.get(voted_for, 0) + 1
+            self._total += 1
+            if self._device_reset_at is None or ts > self._device_reset_at:
+                self._voters.add(user_identifier)
+            if self._first_vote_id is None:
+                self._first_vote_id = vote_pk
+            self._last_vote_id = vote_pk
+
+        self._last_refresh = now
+
+    def submit_vote(self, user_team: str, voted_for: str, user_identifier: str,
+                    name: Optional[str] = None, ip_address: Optional[str] = None) -> Vote:
+        """Validate, persist and count a vote"""
+        if not user_team or not voted_for or not user_identifier:
+            raise VoteRejected('Missing required fields: userTeam, votedFor, userIdentifier')
+
+        teams = get_registry()
+        if user_team not in teams or voted_for not in teams:
+            raise VoteRejected('Invalid team IDs')
+
+        if user_team == voted_for:
+            raise VoteRejected('Cannot vote for your own team')
+
+        name = (name or '').strip() or None
+        # A caller's transaction should contain its vote
+        committer = None if connection.in_atomic_block else self._group_committer()
+        if committer is not None:
+            return self._submit_to_group(committer, user_team, voted_for, user_identifier, name, ip_address)
+
+        with self._lock:
+            self._refresh()
+            if user_identifier in self._voters:
+                raise VoteRejected('User has already voted', status=409, hasVoted=True)
+
+            with transaction.atomic():
+                # Another worker may have accepted this voter, or opened a new
+                # round, since our last refresh
+                round_id = active_round_id()
+                already_voted = Vote.objects.in_round(round_id).filter(user_identifier=user_identifier)
+                if self._device_reset_at:
+                    already_voted = already_voted.filter(timestamp__gt=self._device_reset_at)
+                if already_voted.exists():
+                    self._voters.add(user_identifier)
+                    raise VoteRejected('User has already voted', status=409, hasVoted=True)
+
+                vote = Vote.objects.create(
+                    round_id=round_id,
+                    vote_id=str(uuid.uuid4()),
+                    user_team=user_team,
+                    voted_for=voted_for,
+                    user_identifier=user_identifier,
+                    name=name,
+                    ip_address=ip_address,
+                    # Not from the backend: the sync's high-water mark and reconcile skip it
+                    synced_with_backend=False
+                )
+                record_votes([vote])
+                tallies.increment(voted_for, round_id=round_id)
+
+            VOTES_INGESTED.inc()
+            self._refresh(force=True)
+            return vote
+
+    def _submit_to_group(self, committer: 'GroupCommitter', user_team: str, voted_for: str,
+                         user_identifier: str, name: Optional[str], ip_address: Optional[str]) -> Vote:
+        with self._lock:
+            self._refresh()
+            # Queued votes aren't in _voters yet
+            if user_identifier in self._voters or user_identifier in self._pending:
+                raise VoteRejected('User has already voted', status=409, hasVoted=True)
+            self._pending.add(user_identifier)
+        try:
+            return committer.submit(Vote(
+                round_id=None,  # Set when the batch is written
+                vote_id=str(uuid.uuid4()),
+                user_team=user_team,
+                voted_for=voted_for,
+                user_identifier=user_identifier,
+                name=name,
+                ip_address=ip_address,
+                synced_with_backend=False
+            ))
+        finally:
+            with self._lock:
+                self._pending.discard(user_identifier)
+
+    def _group_committer(self) -> Optional['GroupCommitter']:
+        config = settings.VOTE_GROUP_COMMIT
+        if not config['ENABLED']:
+            return None
+        pid = os.getpid()
+        if self._committer is None or self._committer_pid != pid:
+            with self._lock:
+                if self._committer is None or self._committer_pid != pid:
+                    committer = GroupCommitter(
+                        self,
+                        batch_size=config['BATCH_SIZE'],
+                        flush_interval=config['FLUSH_INTERVAL_MS'] / 1000.0,
+                        max_queue=config['MAX_QUEUE'],
+                        commit_timeout=config['COMMIT_TIMEOUT'],
+                        synchronous=config['SYNCHRONOUS'],
+                    )
+                    committer.start()
+                    atexit.register(committer.stop)
+                    self._committer, self._committer_pid = committer, pid
+        return self._committer
+
+    def _committed(self, count: int):
+        """Called by the group committer after writing ``count`` votes"""
+        VOTES_INGESTED.inc(count)
+        with self._lock:
+            self._refresh(force=True)
+
+    def results(self) -> Tuple[Dict[str, int], int]:
+        """Return per-team tallies and the total vote count"""
+        with self._lock:
+            self._refresh()
+            tallies = self._tallies
+            return {team_id: tallies.get(team_id, 0) for team_id in get_registry()}, self._total
+
+    def results_version(self) -> str:
+        """Identifies what ``results()`` returns; changes whenever this worker's tallies do"""
+        with self._lock:
+            self._refresh()
+            return f'{self._round_id}.{self._first_vote_id}.{self._last_vote_id}.{self._total}'
+
+    def has_voted(self, user_identifier: str) -> bool:
+        """Check whether an identifier has voted since the last device reset"""
+        with self._lock:
+            self._refresh()
+            if user_identifier in self._voters:
+                return True
+            # Misses may be votes another worker accepted moments ago
+            self._refresh(force=True)
+            return user_identifier in self._voters
+
+    def voters(self) -> set:
+        with self._lock:
+            self._refresh()
+            return set(self._voters)
+
+    def last_device_reset(self):
+        with self._lock:
+            self._refresh()
+            return self._device_reset_at
+
+    def reset_votes(self):
+        """Start a new round: no votes or voters; the old round is archived"""
+        with self._lock:
+            rounds.open_round()
+            self._load()
+
+    def reset_devices(self) -> DeviceReset:
+        """Allow every voter to vote again without deleting votes"""
+        with self._lock:
+            self._refresh(force=True)
+            device_reset = DeviceReset.objects.create(previous_voter_count=len(self._voters))
+            self._device_reset_id = device_reset.id
+            self._device_reset_at = device_reset.timestamp
+            self._voters = set()
+            return device_reset
+
+
+class _PendingVote:
+    __slots__ = ('vote', 'error', 'done')
+
+    def __init__(self, vote: Vote):
+        self.vote = vote
+        self.error = None
+        self.done = threading.Event()
+
+
+class GroupCommitter:
+    """
+    Group commit for vote submissions.
+
+    ``submit()`` queues a vote and blocks until the transaction holding it
+    has committed. A flusher thread writes the queue in batches of up to
+    ``batch_size`` votes, one transaction each, starting ``flush_interval``
+    seconds after the first vote of a batch arrives or as soon as
+    ``batch_size`` are waiting. One commit, and one wait for SQLite's write
+    lock, then serves a whole batch.
+
+    Batches are written with SQLite's ``synchronous`` PRAGMA at
+    ``synchronous`` (FULL by default, whatever the connection profile says),
+    so a vote is only acknowledged once its batch has reached the disk: one
+    fsync per batch instead of one per vote.
+
+    Voters already in the database are rejected per vote when the batch is
+    written, and so is a second vote from the same identifier within a
+    batch. The engine rejects identifiers that are still queued.
+
+    When the queue (``max_queue``) is full the caller waits up to
+    ``put_timeout`` seconds and is then turned away with a 503.
+    """
+
+    def __init__(self, engine: VoteIngestionEngine, batch_size: int = 64, flush_interval: float = 0.005,
+                 max_queue: int = 2000, commit_timeout: float = 10.0, put_timeout: float = 1.0,
+                 synchronous: Optional[str] = 'FULL'):
+        if synchronous and synchronous.upper() not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"synchronous must be one of {', '.join(SYNCHRONOUS_LEVELS)}, not {synchronous!r}")
+        self.engine = engine
+        self.synchronous = synchronous.upper() if synchronous else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.commit_timeout = commit_timeout
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._flush_lock = threading.Lock()
+        self._arrived = threading.Event()
+        self._full = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='vote-group-commit', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and write everything still queued"""
+        self._stopping.set()
+        self._arrived.set()
+        self._full.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def submit(self, vote: Vote) -> Vote:
+        """Queue ``vote`` and return it once committed; raises VoteRejected or the commit's error"""
+        pending = _PendingVote(vote)
+        try:
+            self._queue.put(pending, timeout=self.put_timeout)
+        except queue.Full:
+            raise VoteRejected('Too many votes in flight, please retry', status=503)
+        self._arrived.set()
+        if self._queue.qsize() >= self.batch_size:
+            self._full.set()
+
+        if not pending.done.wait(self.commit_timeout):
+            # It may still be written: clients should check vote-status before retrying
+            logger.error(f"Vote {vote.vote_id} not committed within {self.commit_timeout}s")
+            raise VoteRejected('Vote not confirmed in time, check your vote status', status=503)
+        if pending.error is not None:
+            raise pending.error
+        return pending.vote
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> int:
+        """Write all queued votes; returns the number of votes committed"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return written
+                written += self._commit(batch)
+
+    def _commit(self, batch: List[_PendingVote]) -> int:
+        accepted = []
+        try:
+            with self._durable(), transaction.atomic():
+                round_id = active_round_id()
+                already_voted = Vote.objects.in_round(round_id).filter(
+                    user_identifier__in={pending.vote.user_identifier for pending in batch})
+                device_reset_at = self.engine._device_reset_at
+                if device_reset_at:
+                    already_voted = already_voted.filter(timestamp__gt=device_reset_at)
+                voters = set(already_voted.values_list('user_identifier', flat=True))
+
+                for pending in batch:
+                    if pending.vote.user_identifier in voters:
+                        pending.error = VoteRejected('User has already voted', status=409, hasVoted=True)
+                        continue
+                    voters.add(pending.vote.user_identifier)
+                    pending.vote.round_id = round_id
+                    accepted.append(pending)
+
+                votes = Vote.objects.bulk_create([pending.vote for pending in accepted])
+                record_votes(votes)
+                for team_id, count in Counter(vote.voted_for for vote in votes).items():
+                    tallies.increment(team_id, count, round_id=round_id)
+        except Exception as e:
+            logger.error(f"Failed to commit {len(batch)} votes: {str(e)}")
+            # Possibly before any vote was looked at (BEGIN, the round lookup):
+            # every vote not already rejected failed with the batch
+            for pending in batch:
+                if pending.error is None:
+                    pending.error = e
+            accepted = []
+        else:
+            if accepted:
+                try:
+                    self.engine._committed(len(accepted))
+                except Exception as e:
+                    # Committed all the same; the engine catches up on its next refresh
+                    logger.error(f"Failed to refresh after committing votes: {str(e)}")
+        finally:
+            for pending in batch:
+                pending.done.set()
+        return len(accepted)
+
+    @contextmanager
+    def _durable(self):
+        """Run a batch's transaction at ``self.synchronous``, then restore the connection's level"""
+        # Inside a caller's transaction the outer commit is what reaches the disk
+        if not self.synchronous or connection.vendor != 'sqlite' or connection.in_atomic_block:
+            yield
+            return
+        connection.ensure_connection()
+        raw = connection.connection
+        previous = raw.execute('PRAGMA synchronous').fetchone()[0]
+        raw.execute(f'PRAGMA synchronous = {self.synchronous}')
+        try:
+            yield
+        finally:
+            raw.execute(f'PRAGMA synchronous = {previous}')
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                self._arrived.wait()
+                self._arrived.clear()
+                # Give the batch a moment to fill
+                self._full.wait(self.flush_interval)
+                self._full.clear()
+                self.flush()
+        finally:
+            connection.close()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> VoteIngestionEngine:
+    """Return the process-wide ingestion engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = VoteIngestionEngine()
+    return _engine
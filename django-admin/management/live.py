@@ -0,0 +1,243 @@
+"""
+Server-Sent Events fan-out for the admin dashboards.
+
+Every connected dashboard subscribes to one ``LiveBroadcaster`` per event
+loop (one per ASGI worker process). The broadcaster alone polls the cached
+dashboard stats and the local vote table, and pushes only what changed:
+
+* ``snapshot`` - full state, sent once when a client connects
+* ``tally``    - totals plus the teams whose counts changed
+* ``vote``     - a vote that was stored since the previous poll
+* ``health``   - backend connectivity or the circuit breaker state changed
+
+Events are encoded once and the same bytes are queued for every client.
+Clients whose queue fills up are disconnected; ``EventSource`` reconnects
+on its own and starts again from a fresh snapshot.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Vote
+from .services import VotingDataService
+from .teams import get_registry
+
+logger = logging.getLogger(__name__)
+
+
+def encode_event(event: str, data: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n".encode()
+
+
+class Subscriber:
+    """One connected client: a bounded queue of encoded events"""
+
+    def __init__(self, queue_size: int):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def send(self, chunk: bytes) -> bool:
+        """Queue an event; returns False once the client has fallen too far behind"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(chunk)
+            return True
+        except asyncio.QueueFull:
+            self.close()
+            return False
+
+    def close(self):
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        chunk = await self.queue.get()
+        if chunk is None:
+            raise StopAsyncIteration
+        return chunk
+
+
+class LiveBroadcaster:
+    """Single upstream poller shared by all subscribers on an event loop"""
+
+    def __init__(self, poll_interval: float = None, queue_size: int = None, max_votes_per_poll: int = None):
+        config = settings.LIVE_STREAM
+        self.poll_interval = config['POLL_INTERVAL'] if poll_interval is None else poll_interval
+        self.queue_size = queue_size or config['QUEUE_SIZE']
+        self.max_votes_per_poll = max_votes_per_poll or config['MAX_VOTES_PER_POLL']
+        self.polls = 0
+        self._subscribers = set()
+        self._state = None
+        self._vote_cursor = None
+        self._task = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        if self._state is not None:
+            subscriber.send(encode_event('snapshot', self._state))
+        if self._task is None or self._task.done():
+            # Fresh context: the poller outlives the request that started it,
+            # so its ORM calls must not be tied to that request's thread
+            self._task = asyncio.get_running_loop().create_task(self._run(), context=contextvars.Context())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    async def close(self):
+        """Disconnect everyone and stop polling"""
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+        self._subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        try:
+            while self._subscribers:
+                try:
+                    state, votes = await sync_to_async(self._read)()
+                    self.polls += 1
+                    self._publish(state, votes)
+                except Exception as e:
+                    logger.warning(f"Live stream poll failed: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            # Next subscriber starts from a fresh snapshot
+            self._state = None
+            self._vote_cursor = None
+            self._task = None
+
+    def _read(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        stats = VotingDataService().get_dashboard_stats()
+        state = {
+            'total_votes': stats.get('total_votes', 0),
+            'unique_voters': stats.get('unique_voters', 0),
+            'backend_connected': stats.get('backend_connected', False),
+            'circuit_state': stats.get('circuit', {}).get('state', 'closed'),
+            'last_updated': stats.get('last_updated'),
+            'results': {
+                result.get('teamName'): {'votes': result.get('votes', 0), 'percentage': result.get('percentage', 0)}
+                for result in stats.get('results', [])
+            },
+        }
+
+        if self._vote_cursor is None:
+            # Only report votes stored after the stream started
+            self._vote_cursor = Vote.objects.in_round().order_by('-id').values_list('id', flat=True).first() or 0
+            return state, []
+
+        votes = list(Vote.objects.in_round().filter(id__gt=self._vote_cursor).order_by('id')
+                     .values('id', 'name', 'user_team', 'voted_for', 'timestamp', 'ip_address')
+                     [:self.max_votes_per_poll])
+        if votes:
+            self._vote_cursor = votes[-1]['id']
+        teams = get_registry()
+        return state, [
+            {
+                'name': (vote['name'] or '').strip() or 'Anonymous',
+                'team_display_name': teams.name(vote['user_team']),
+                'voted_for_display_name': teams.name(vote['voted_for']),
+                'timestamp': vote['timestamp'],
+                'ip_address': vote['ip_address'],
+            }
+            for vote in votes
+        ]
+
+    def _publish(self, state: Dict[str, Any], votes: List[Dict[str, Any]]):
+        previous, self._state = self._state, state
+        events = []
+        if previous is None:
+            events.append(encode_event('snapshot', state))
+        else:
+            changed = {team: result for team, result in state['results'].items()
+                       if previous['results'].get(team) != result}
+            if (changed or state['total_votes'] != previous['total_votes']
+                    or state['unique_voters'] != previous['unique_voters']):
+                events.append(encode_event('tally', {
+                    'total_votes': state['total_votes'],
+                    'unique_voters': state['unique_voters'],
+                    'last_updated': state['last_updated'],
+                    'results': changed,
+                }))
+            if (state['backend_connected'] != previous['backend_connected']
+                    or state['circuit_state'] != previous['circuit_state']):
+                events.append(encode_event('health', {'backend_connected': state['backend_connected'],
+                                                      'circuit_state': state['circuit_state']}))
+        events.extend(encode_event('vote', vote) for vote in votes)
+
+        for chunk in events:
+            for subscriber in list(self._subscribers):
+                if not subscriber.send(chunk):
+                    self._subscribers.discard(subscriber)
+
+
+_broadcasters = weakref.WeakKeyDictionary()
+
+
+def get_broadcaster() -> LiveBroadcaster:
+    """Return the broadcaster for the running event loop"""
+    loop = asyncio.get_running_loop()
+    broadcaster = _broadcasters.get(loop)
+    if broadcaster is None:
+        broadcaster = _broadcasters[loop] = LiveBroadcaster()
+    return broadcaster
+
+
+class EventStream:
+    """
+    SSE response body for one subscriber.
+
+    Django calls ``close()`` when the response finishes, and cancels the
+    iteration when the client disconnects; either way the subscriber is
+    removed from the broadcaster.
+    """
+
+    def __init__(self, broadcaster: LiveBroadcaster, subscriber: Subscriber, keepalive: Optional[float] = None):
+        self.broadcaster = broadcaster
+        self.subscriber = subscriber
+        self.keepalive = settings.LIVE_STREAM['KEEPALIVE'] if keepalive is None else keepalive
+
+    def __aiter__(self):
+        return self._events()
+
+    def close(self):
+        self.broadcaster.unsubscribe(self.subscriber)
+
+    async def _events(self):
+        try:
+            yield f"retry: {settings.LIVE_STREAM['RETRY_MS']}\n\n".encode()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(self.subscriber.__anext__(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    # Comment line so proxies don't time out an idle stream
+                    yield b': keepalive\n\n'
+                    continue
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            self.close()
@@ -0,0 +1,166 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import SystemLog
+
+logger = logging.getLogger(__name__)
+
+
+class SystemLogWriter:
+    """
+    Buffered writer for ``SystemLog`` rows.
+
+    Records are queued in memory and written with one ``bulk_create`` per
+    batch, every ``batch_size`` records or ``flush_interval`` seconds,
+    whichever comes first. When the queue is full the caller waits up to
+    ``put_timeout`` seconds and then flushes inline, so logs are never
+    dropped and producers slow down instead of growing memory without bound.
+
+    A batch that fails to write (say, the database is briefly locked) is
+    kept and tried again first on the next flush. After ``max_attempts``
+    failures its rows are inserted one by one, so only a row that fails on
+    its own is given up on, and logged.
+
+    ``timestamp`` is ``auto_now_add``, so rows are stamped when flushed,
+    at most ``flush_interval`` after the event.
+    """
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 0.2,
+                 max_queue: int = 10000, put_timeout: float = 0.5, max_attempts: int = 5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_attempts = max_attempts
+        self._queue = queue.Queue(maxsize=max_queue)
+        # (records, failed attempts) of a batch that couldn't be written yet
+        self._failed = None
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='system-log-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and write everything still queued"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def write(self, **fields):
+        record = SystemLog(**fields)
+        try:
+            self._queue.put(record, timeout=self.put_timeout)
+        except queue.Full:
+            logger.warning("SystemLog buffer full, flushing inline")
+            self.flush()
+            self._queue.put(record)
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        failed = self._failed
+        return self._queue.qsize() + (len(failed[0]) if failed else 0)
+
+    def flush(self) -> int:
+        """Write all queued records; returns the number of rows written"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                if self._failed:
+                    batch, attempts = self._failed
+                    self._failed = None
+                else:
+                    batch, attempts = [], 0
+                    while len(batch) < self.batch_size:
+                        try:
+                            batch.append(self._queue.get_nowait())
+                        except queue.Empty:
+                            break
+                if not batch:
+                    return written
+                try:
+                    with transaction.atomic():
+                        SystemLog.objects.bulk_create(batch)
+                    written += len(batch)
+                except Exception as e:
+                    attempts += 1
+                    if attempts < self.max_attempts:
+                        logger.warning(f"Failed to write {len(batch)} system logs (attempt {attempts}), "
+                                       f"retrying on the next flush: {str(e)}")
+                        self._failed = (batch, attempts)
+                        return written
+                    logger.error(f"Failed to write {len(batch)} system logs {attempts} times, "
+                                 f"writing them one by one: {str(e)}")
+                    written += self._write_each(batch)
+
+    def _write_each(self, batch) -> int:
+        written = 0
+        for record in batch:
+            try:
+                with transaction.atomic():
+                    SystemLog.objects.bulk_create([record])
+                written += 1
+            except Exception as e:
+                logger.error(f"Dropped system log [{record.level}] {record.action_type}: "
+                             f"{record.message} ({str(e)})")
+        return written
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                self.flush()
+        finally:
+            connection.close()
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> Optional[SystemLogWriter]:
+    """Return the process-wide writer, or None when buffering is disabled"""
+    global _writer, _writer_pid
+    config = settings.SYSTEM_LOG_BUFFER
+    if not config['ENABLED']:
+        return None
+    pid = os.getpid()
+    if _writer is None or _writer_pid != pid:
+        with _writer_lock:
+            if _writer is None or _writer_pid != pid:
+                writer = SystemLogWriter(
+                    batch_size=config['BATCH_SIZE'],
+                    flush_interval=config['FLUSH_INTERVAL_MS'] / 1000.0,
+                    max_queue=config['MAX_QUEUE'],
+                )
+                writer.start()
+                atexit.register(writer.stop)
+                _writer, _writer_pid = writer, pid
+    return _writer
+
+
+def write_log(**fields):
+    """Queue a SystemLog row; drop-in replacement for ``SystemLog.objects.create``"""
+    writer = get_log_writer()
+    if writer is None:
+        SystemLog.objects.create(**fields)
+    else:
+        writer.write(**fields)
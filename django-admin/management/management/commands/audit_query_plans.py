@@ -0,0 +1,109 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from management.models import Vote, SystemLog, VoteResults, VoterAggregate
+from management.pagination import BACKWARD, FORWARD, KeysetPaginator
+from management.search import fts_available
+from management.views import ResultsView, SystemLogsView, VotesListView
+
+# Plan steps that mean the query reads every row of a table or sorts in a temp B-tree.
+# "SCAN t USING [COVERING] INDEX i" walks an index in order and is allowed, and so
+# is scanning a subquery's already-computed rows. Full-text searches may sort: they
+# only order the rows the FTS5 index matched.
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE')
+
+
+def _page(build_queryset, per_page, **filters):
+    """Run the list views' queries: the capped COUNT, the first page and the next/previous page"""
+    def run():
+        paginator = KeysetPaginator(build_queryset(**filters), per_page, count_limit=settings.LIST_COUNT_LIMIT)
+        paginator.count
+        page = paginator.get_page()
+        if paginator.by_offset:
+            # Ranked searches page by offset, not by seeking
+            paginator.get_page(paginator.encode_offset(per_page))
+            return
+        # An empty table has no cursors; seek from a made-up row so the queries still run
+        row = page[0] if page else _placeholder(paginator)
+        paginator.get_page(paginator.encode_cursor(row, FORWARD))
+        paginator.get_page(paginator.encode_cursor(row, BACKWARD))
+    return run
+
+
+def _placeholder(paginator):
+    row = paginator.queryset.model(id=1, timestamp=timezone.now())
+    row.search_rank, row.search_rowid = 0.0, 1
+    return row
+
+
+# (name, callable running the view's queries, FTS table it needs)
+CASES = [
+    ('VotesListView', _page(VotesListView.build_queryset, 25)),
+    ('VotesListView ?team=', _page(VotesListView.build_queryset, 25, team_filter='team-a')),
+    ('SystemLogsView', _page(SystemLogsView.build_queryset, 50)),
+    ('SystemLogsView ?level=', _page(SystemLogsView.build_queryset, 50, level_filter='ERROR')),
+    ('SystemLogsView ?action=', _page(SystemLogsView.build_queryset, 50, action_filter='API_CALL')),
+    ('SystemLogsView ?level=&action=',
+     _page(SystemLogsView.build_queryset, 50, level_filter='ERROR', action_filter='API_CALL')),
+    ('VotesListView ?search=', _page(VotesListView.build_queryset, 25, search='device'), 'management_vote_fts'),
+    ('SystemLogsView ?search=', _page(SystemLogsView.build_queryset, 50, search='timeout'),
+     'management_systemlog_fts'),
+    ('DashboardView recent voters',
+     lambda: list(VoterAggregate.objects.in_round().order_by('-latest_timestamp')[:10])),
+    ('DashboardView recent logs', lambda: list(SystemLog.objects.order_by('-timestamp')[:10])),
+    ('get_dashboard_stats unique voters',
+     lambda: Vote.objects.in_round().values('user_identifier').distinct().count()),
+    ('ResultsView results', lambda: list(ResultsView.build_queryset())),
+    ('get_dashboard_stats last updated',
+     lambda: VoteResults.objects.in_round().aggregate(latest=Max('last_updated'))),
+    ('Ingestion and live stream vote cursor',
+     lambda: list(Vote.objects.in_round().filter(id__gt=0).order_by('id').values_list('id', flat=True)[:100])),
+]
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN QUERY PLAN on the admin views' queries and fail on full table scans or temp sorts"
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"EXPLAIN QUERY PLAN audit only supports SQLite, not {connection.vendor}")
+
+        tables = set(connection.introspection.table_names())
+        failures = []
+        for name, run, *requires in CASES:
+            if requires and not fts_available(requires[0]):
+                self.stdout.write(self.style.WARNING(f"SKIP {name}: no FTS5 index, search uses icontains"))
+                continue
+            with CaptureQueriesContext(connection) as captured:
+                run()
+
+            for query in captured.captured_queries:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                    steps = [row[-1] for row in cursor.fetchall()]
+
+                full_text = any('VIRTUAL TABLE' in step for step in steps)
+                bad = [step for step in steps
+                       if (TEMP_SORT.search(step) and not full_text) or self._scans_table(step, tables)]
+                status = self.style.ERROR('FAIL') if bad else self.style.SUCCESS('OK  ')
+                self.stdout.write(f"{status} {name}: {query['sql']}")
+                for step in steps:
+                    self.stdout.write(f"       {step}")
+                if bad:
+                    failures.append(f"{name}: {'; '.join(bad)}")
+
+        if failures:
+            raise CommandError("Queries without a usable index:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS(f"All {len(CASES)} view queries use indexes"))
+
+    @staticmethod
+    def _scans_table(step, tables):
+        match = FULL_SCAN.match(step)
+        return bool(match) and match.group(1) in tables
@@ -0,0 +1,84 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from management import analytics
+from management.benchmarking import isolated_database, summarize
+from management.models import Vote
+
+TEAMS = ['team-a', 'team-b', 'team-c', 'team-d']
+
+
+def _votes(start, first, count, spacing):
+    return [
+        Vote(vote_id=f'bench-{i}', user_team=TEAMS[i % len(TEAMS)],
+             voted_for=TEAMS[(i + 1 + (i * 7) % 3) % len(TEAMS)], user_identifier=f'bench-{i}',
+             ip_address='127.0.0.1', timestamp=start + timedelta(seconds=i * spacing))
+        for i in range(first, first + count)
+    ]
+
+
+class Command(BaseCommand):
+    help = ("Measure the vote analytics: loading votes into NumPy arrays, incremental refreshes and each "
+            "report, against a throwaway database")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--votes', type=int, default=200000, help="Votes seeded before the run")
+        parser.add_argument('--hours', type=float, default=24, help="Time span the seeded votes cover")
+        parser.add_argument('--new-votes', type=int, default=1000, help="Votes added before each refresh")
+        parser.add_argument('--refreshes', type=int, default=5)
+        parser.add_argument('--repeats', type=int, default=20, help="Runs of each report")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            report = self._run(options)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        self.stdout.write(f"{options['votes']} votes, {report['frame_rows']} (minute, team, team) rows")
+        self.stdout.write(f"{'cold load':>18}: {report['cold_load_ms']}ms")
+        for name, result in report['timings'].items():
+            self.stdout.write(f"{name:>18}: p50={result['p50_ms']}ms p99={result['p99_ms']}ms")
+
+    def _run(self, options):
+        spacing = options['hours'] * 3600 / max(options['votes'], 1)
+        start = timezone.now() - timedelta(hours=options['hours'])
+        Vote.objects.bulk_create(_votes(start, 0, options['votes'], spacing), batch_size=2000)
+        analytics._loader = None
+
+        began = time.perf_counter()
+        frame = analytics.get_frame()
+        report = {'votes': options['votes'], 'frame_rows': len(frame.count),
+                  'cold_load_ms': round((time.perf_counter() - began) * 1000, 3), 'timings': {}}
+
+        latencies = []
+        for n in range(options['refreshes']):
+            Vote.objects.bulk_create(_votes(start, options['votes'] + n * options['new_votes'],
+                                            options['new_votes'], spacing))
+            began = time.perf_counter()
+            frame = analytics.get_frame()
+            latencies.append(time.perf_counter() - began)
+        report['timings']['refresh'] = summarize(latencies, sum(latencies))
+
+        for name, compute in analytics.REPORTS.items():
+            report['timings'][name] = self._repeat(lambda: compute(frame), options['repeats'])
+        # The database doing the same work as the matrix report
+        report['timings']['matrix (SQL)'] = self._repeat(
+            lambda: list(Vote.objects.in_round().order_by().values('user_team', 'voted_for').annotate(n=Count('id'))),
+            max(1, options['repeats'] // 5))
+        return report
+
+    def _repeat(self, operation, repeats):
+        latencies = []
+        for _ in range(repeats):
+            began = time.perf_counter()
+            operation()
+            latencies.append(time.perf_counter() - began)
+        return summarize(latencies, sum(latencies))
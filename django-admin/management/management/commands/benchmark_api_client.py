@@ -0,0 +1,67 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from management.benchmarking import summarize
+from management.services import get_http_session
+from management.stub_backend import StubVotingBackend
+
+ENDPOINTS = {
+    'health': '/api/health',
+    'results': '/api/results',
+    'votes': '/api/admin/votes',
+}
+
+
+class Command(BaseCommand):
+    help = "Compare per-request connections with the pooled keep-alive session against a stub backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='results')
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per client mode")
+        parser.add_argument('--concurrency', type=int, default=8, help="Concurrent callers")
+        parser.add_argument('--votes', type=int, default=100, help="Votes seeded into the stub backend")
+        parser.add_argument('--latency-ms', type=float, default=0, help="Latency injected by the stub")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        key = options['endpoint']
+        latency = {key: options['latency_ms'] / 1000.0}
+        report = {'endpoint': key, 'concurrency': options['concurrency'], 'latency_ms': options['latency_ms']}
+
+        with StubVotingBackend(votes=options['votes'], latency=latency) as backend:
+            url = backend.base_url + ENDPOINTS[key]
+            session = get_http_session()
+            modes = {
+                'new_connection': lambda: requests.get(url, timeout=(3.05, 30)),
+                'pooled_session': lambda: session.get(url, timeout=(3.05, 30)),
+            }
+            for mode, call in modes.items():
+                connections_before = backend.connections
+                report[mode] = self._measure(call, options['requests'], options['concurrency'])
+                report[mode]['connections_opened'] = backend.connections - connections_before
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        for mode in ('new_connection', 'pooled_session'):
+            result = report[mode]
+            self.stdout.write(
+                f"{mode:>15}: {result['throughput_per_s']} req/s, p50={result['p50_ms']}ms "
+                f"p99={result['p99_ms']}ms, connections opened={result['connections_opened']}"
+            )
+
+    def _measure(self, call, total, concurrency):
+        def timed(_):
+            started = time.perf_counter()
+            call().raise_for_status()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, range(total)))
+        return summarize(latencies, time.perf_counter() - started)
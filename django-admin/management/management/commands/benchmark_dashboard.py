@@ -0,0 +1,71 @@
+import json
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from management.benchmarking import isolated_database, summarize
+from management.services import VotingDataService
+from management.stub_backend import StubVotingBackend
+
+# Process-local stats cache, cleared before every page load so each one reaches the backend
+COLD_STATS_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'stats': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-stats'},
+}
+
+# 'stats' is VotingDataService.get_dashboard_stats alone, the backend-bound part of ResultsView
+TARGETS = ('dashboard', 'stats')
+
+
+class Command(BaseCommand):
+    help = "Measure dashboard and dashboard-stats latency with sequential vs concurrent backend calls"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=TARGETS, default='dashboard')
+        parser.add_argument('--requests', type=int, default=20, help="Page loads per mode")
+        parser.add_argument('--votes', type=int, default=200, help="Votes seeded into the stub backend")
+        parser.add_argument('--results-delay-ms', type=float, default=150)
+        parser.add_argument('--votes-delay-ms', type=float, default=250)
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        latency = {
+            'results': options['results_delay_ms'] / 1000.0,
+            'votes': options['votes_delay_ms'] / 1000.0,
+        }
+        report = {'target': options['target'], 'injected_latency_ms': {k: v * 1000 for k, v in latency.items()}}
+
+        with isolated_database(), StubVotingBackend(votes=options['votes'], latency=latency) as backend:
+            for mode, enabled in (('sequential', False), ('concurrent', True)):
+                fanout = {'ENABLED': enabled, 'MAX_WORKERS': 8,
+                          'TIMEOUTS': {'default': 10, 'get_results': 5, 'get_all_votes': 30}}
+                with override_settings(VOTING_API_BASE_URL=backend.base_url, BACKEND_FANOUT=fanout,
+                                       CACHES=COLD_STATS_CACHE, ALLOWED_HOSTS=['*']):
+                    report[mode] = self._measure(options['target'], options['requests'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        for mode in ('sequential', 'concurrent'):
+            result = report[mode]
+            self.stdout.write(f"{mode:>10}: p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                              f"p99={result['p99_ms']}ms")
+
+    def _measure(self, target, total):
+        client = Client()
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(total):
+            caches['stats'].clear()
+            request_started = time.perf_counter()
+            if target == 'dashboard':
+                response = client.get('/management/')
+                if response.status_code != 200:
+                    self.stderr.write(f"Dashboard returned {response.status_code}")
+            else:
+                VotingDataService().get_dashboard_stats()
+            latencies.append(time.perf_counter() - request_started)
+        return summarize(latencies, time.perf_counter() - started)
@@ -0,0 +1,134 @@
+import json
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from management.benchmarking import spawn_gunicorn, summarize
+
+TEAMS = ['team-a', 'team-b', 'team-c', 'team-d']
+
+
+class Command(BaseCommand):
+    help = "Benchmark vote ingestion (votes/sec and latency percentiles) against gunicorn workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="Base URL of a running server (skips spawning gunicorn)")
+        parser.add_argument('--workers', type=int, default=4, help="gunicorn worker processes to spawn")
+        parser.add_argument('--threads', type=int, default=4, help="Threads per gunicorn worker")
+        parser.add_argument('--concurrency', type=int, default=32, help="Concurrent client connections")
+        parser.add_argument('--votes', type=int, default=5000, help="Votes to submit")
+        parser.add_argument('--batch-sizes',
+                            help="Comma-separated VOTE_GROUP_COMMIT batch sizes to compare, each against its own "
+                                 "server; 0 commits every vote in its own transaction")
+        parser.add_argument('--synchronous', default='FULL',
+                            help="SQLite synchronous level for every mode of --batch-sizes, so each compares "
+                                 "commits that are equally durable")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        if options['batch_sizes']:
+            return self._compare_batch_sizes(options)
+
+        result = self._benchmark(options)
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+        else:
+            self.stdout.write(
+                f"{result['accepted']} votes accepted in {result['elapsed_s']}s "
+                f"({result['throughput_per_s']} votes/sec), errors={result['errors']}\n"
+                f"latency p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+                f"max={result['max_ms']}ms\n"
+                f"server tally: {result['server_total']} votes"
+            )
+
+    def _compare_batch_sizes(self, options):
+        if options['url']:
+            raise CommandError("--batch-sizes spawns its own servers and can't be used with --url")
+        try:
+            batch_sizes = [int(size) for size in options['batch_sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError("--batch-sizes takes comma-separated integers")
+
+        runs = []
+        for batch_size in batch_sizes:
+            env = ({'VOTE_GROUP_COMMIT_ENABLED': 'False'} if batch_size <= 0 else
+                   {'VOTE_GROUP_COMMIT_ENABLED': 'True', 'VOTE_GROUP_COMMIT_BATCH_SIZE': str(batch_size)})
+            env.update(SQLITE_SYNCHRONOUS=options['synchronous'],
+                       VOTE_GROUP_COMMIT_SYNCHRONOUS=options['synchronous'])
+            result = {'batch_size': batch_size, **self._benchmark(options, env)}
+            runs.append(result)
+            if not options['json']:
+                label = 'per vote' if batch_size <= 0 else f'batch {batch_size}'
+                self.stdout.write(
+                    f"{label:>10}: {result['throughput_per_s']:>8} votes/sec  p50={result['p50_ms']}ms "
+                    f"p99={result['p99_ms']}ms  errors={result['errors']}  server tally={result['server_total']}"
+                )
+        if options['json']:
+            self.stdout.write(json.dumps({'workers': options['workers'], 'threads': options['threads'],
+                                          'concurrency': options['concurrency'],
+                                          'synchronous': options['synchronous'], 'runs': runs}))
+
+    def _benchmark(self, options, env=None):
+        server = None
+        tmpdir = None
+        base_url = options['url']
+
+        try:
+            if not base_url:
+                tmpdir = tempfile.TemporaryDirectory()
+                server, base_url = spawn_gunicorn(tmpdir.name, options['workers'], options['threads'], env=env)
+
+            result = self._run(base_url.rstrip('/'), options['concurrency'], options['votes'])
+            result.update({
+                'workers': None if options['url'] else options['workers'],
+                'threads': None if options['url'] else options['threads'],
+                'concurrency': options['concurrency'],
+            })
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=10)
+            if tmpdir:
+                tmpdir.cleanup()
+        return result
+
+    def _run(self, base_url, concurrency, total_votes):
+        local = threading.local()
+        run_id = uuid.uuid4().hex[:8]
+
+        def session():
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+            return local.session
+
+        def submit(i):
+            user_team = TEAMS[i % len(TEAMS)]
+            offset = 1 + (i // len(TEAMS)) % (len(TEAMS) - 1)
+            voted_for = TEAMS[(i + offset) % len(TEAMS)]
+            started = time.perf_counter()
+            response = session().post(f'{base_url}/api/vote/', json={
+                'userTeam': user_team,
+                'votedFor': voted_for,
+                'userIdentifier': f'bench-{run_id}-{i}',
+            }, timeout=30)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(submit, range(total_votes)))
+        elapsed = time.perf_counter() - started
+
+        latencies = [latency for latency, status in outcomes if status == 201]
+        result = summarize(latencies, elapsed)
+        result['accepted'] = len(latencies)
+        result['errors'] = len(outcomes) - len(latencies)
+        # Workers fold in each other's votes at most once per refresh interval
+        time.sleep(settings.VOTING_ENGINE_REFRESH_INTERVAL + 0.1)
+        result['server_total'] = requests.get(f'{base_url}/api/results/', timeout=10).json()['totalVotes']
+        return result
@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from management.benchmarking import summarize
+from management.ratelimit import SlidingWindowLimiter
+
+
+class Command(BaseCommand):
+    help = ("Measure the cost of one rate limit check, alone and with other processes checking the same "
+            "shared counters")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=100000, help="Checks per process")
+        parser.add_argument('--processes', default='1,4', help="Comma-separated process counts to compare")
+        parser.add_argument('--keys', type=int, default=1000, help="Distinct client keys")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+        # Internal: the parent re-runs this command in child processes
+        parser.add_argument('--role', choices=['run', 'check'], default='run', help="Internal")
+        parser.add_argument('--path', help="Internal")
+        parser.add_argument('--start-at', type=float, default=0, help="Internal")
+
+    def handle(self, *args, **options):
+        if options['role'] == 'check':
+            return self._check(options)
+
+        try:
+            counts = [int(count) for count in options['processes'].split(',') if count.strip()]
+        except ValueError:
+            raise CommandError("--processes takes comma-separated integers")
+
+        report = {'checks': options['checks'], 'keys': options['keys'], 'runs': []}
+        for processes in counts:
+            result = self._run(processes, options)
+            report['runs'].append(result)
+            if not options['json']:
+                self.stdout.write(f"{processes:>3} processes: mean={result['mean_us']}us p50={result['p50_us']}us "
+                                  f"p99={result['p99_us']}us  {result['throughput_per_s']} checks/s in total")
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+
+    def _run(self, processes, options):
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, 'ratelimit.bin')
+            manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+            start_at = time.time() + 1 + processes * 0.2
+            children = [
+                subprocess.Popen([sys.executable, manage_py, 'benchmark_ratelimit', '--role', 'check',
+                                  '--path', path, '--checks', str(options['checks']),
+                                  '--keys', str(options['keys']), '--start-at', str(start_at)],
+                                 cwd=settings.BASE_DIR, stdout=subprocess.PIPE, text=True)
+                for _ in range(processes)
+            ]
+            outputs = [(child.communicate()[0], child.returncode) for child in children]
+        if any(returncode for _, returncode in outputs):
+            raise CommandError("A benchmark process failed")
+
+        runs = [json.loads(output) for output, _ in outputs]
+        elapsed = max(run['finished'] for run in runs) - min(run['started'] for run in runs)
+        result = {'processes': processes, 'rejected': sum(run['rejected'] for run in runs),
+                  **summarize([latency for run in runs for latency in run['latencies']], elapsed)}
+        # A check takes microseconds
+        for stat in ('mean', 'p50', 'p95', 'p99', 'max'):
+            result[f'{stat}_us'] = round(result.pop(f'{stat}_ms') * 1000, 2)
+        return result
+
+    def _check(self, options):
+        limiter = SlidingWindowLimiter(options['path'], settings.RATE_LIMIT['SLOTS'])
+        keys = [f'vote:ip:10.0.{i // 256}.{i % 256}' for i in range(options['keys'])]
+        rejected = 0
+        time.sleep(max(0.0, options['start_at'] - time.time()))
+        latencies = []
+        started = time.time()
+        for i in range(options['checks']):
+            began = time.perf_counter()
+            # Some keys go over the limit, so rejections are measured too
+            if limiter.hit(keys[i % len(keys)], 100, 60) is not None:
+                rejected += 1
+            latencies.append(time.perf_counter() - began)
+        limiter.close()
+        self.stdout.write(json.dumps({'started': started, 'finished': time.time(), 'latencies': latencies,
+                                      'rejected': rejected}))
@@ -0,0 +1,89 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import transaction
+
+from management import search
+from management.benchmarking import isolated_database, summarize
+from management.pagination import KeysetPaginator
+from management.models import SystemLog
+
+ENDPOINTS = ['results', 'vote', 'vote-status', 'admin/votes', 'admin/devices', 'admin/reset', 'health']
+USERS = ['alice', 'bob', 'carol', 'dave', 'erin', None]
+# A rare term, common terms, a prefix, a multi-term query, a JSON value and a miss
+QUERIES = ['timeout', 'results', 'admin', 'vot', 'GET results', 'carol', 'nonexistent']
+
+
+class Command(BaseCommand):
+    help = "Compare SystemLogsView search with the FTS5 index vs icontains on a large log table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="SystemLog rows to seed")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs of each query per mode")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        report = {'rows': options['rows'], 'queries': QUERIES}
+
+        with isolated_database():
+            if not search.fts_available('management_systemlog_fts'):
+                self.stderr.write("FTS5 is not available; only the icontains fallback will be measured")
+
+            started = time.perf_counter()
+            self._seed(options['rows'])
+            report['seed_s'] = round(time.perf_counter() - started, 1)
+
+            queryset = SystemLog.objects.all()
+            modes = {
+                'icontains': lambda text: search._icontains(
+                    queryset, text, search.SEARCH_INDEXES['management.systemlog'][1]).order_by('-timestamp', '-id'),
+            }
+            if search.fts_available('management_systemlog_fts'):
+                modes['fts5'] = lambda text: search.search(queryset, text)
+
+            for mode, build in modes.items():
+                report[mode] = self._measure(build, options['repeat'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        self.stdout.write(f"Seeded {report['rows']} rows in {report['seed_s']}s")
+        for mode in modes:
+            result = report[mode]
+            self.stdout.write(f"{mode:>10}: p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                              f"max={result['max_ms']}ms")
+
+    def _seed(self, rows, batch_size=10000):
+        rng = random.Random(42)
+        for start in range(0, rows, batch_size):
+            batch = []
+            for i in range(start, min(start + batch_size, rows)):
+                endpoint = rng.choice(ENDPOINTS)
+                failed = rng.random() < 0.01
+                batch.append(SystemLog(
+                    level='ERROR' if failed else 'INFO',
+                    action_type='API_CALL',
+                    message=(f"GET /api/{endpoint} - {'Request timeout' if failed else 'Success'} "
+                             f"in {rng.randint(1, 900)}ms"),
+                    details={'endpoint': endpoint, 'status': 504 if failed else 200, 'request': i},
+                    user=rng.choice(USERS),
+                ))
+            with transaction.atomic():
+                SystemLog.objects.bulk_create(batch)
+
+    def _measure(self, build, repeat):
+        """Time what SystemLogsView runs per search: the capped COUNT and the first page"""
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for text in QUERIES:
+                query_started = time.perf_counter()
+                paginator = KeysetPaginator(build(text), 50, count_limit=settings.LIST_COUNT_LIMIT)
+                paginator.count
+                paginator.get_page()
+                latencies.append(time.perf_counter() - query_started)
+        return summarize(latencies, time.perf_counter() - started)
@@ -0,0 +1,164 @@
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, transaction
+from django.db.models import Count
+
+from management.benchmarking import summarize
+from management.models import SystemLog, Vote, VoteResults
+from management.sqlite import PROFILES
+
+TEAMS = ['team-a', 'team-b', 'team-c', 'team-d']
+
+
+def _vote(writer, i, run_id):
+    user_team = TEAMS[i % len(TEAMS)]
+    return Vote(vote_id=f'{run_id}-{writer}-{i}', user_team=user_team,
+                voted_for=TEAMS[(i + 1 + writer % 3) % len(TEAMS)],
+                user_identifier=f'bench-{run_id}-{writer}-{i}', ip_address='127.0.0.1')
+
+
+class Command(BaseCommand):
+    help = ("Benchmark SQLite pragma profiles and persistent connections with concurrent reader and writer "
+            "processes, each operation handled like a request, against a throwaway database")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default=','.join(PROFILES),
+                            help=f"Comma-separated SQLITE_PROFILE values to compare: {', '.join(PROFILES)}")
+        parser.add_argument('--conn-max-age', default='0,60',
+                            help="Comma-separated CONN_MAX_AGE values to compare with each profile")
+        parser.add_argument('--readers', type=int, default=4, help="Reader processes (dashboard and log queries)")
+        parser.add_argument('--writers', type=int, default=4, help="Writer processes (a vote and a log entry)")
+        parser.add_argument('--operations', type=int, default=300, help="Operations per process")
+        parser.add_argument('--seed-votes', type=int, default=20000, help="Votes in the database before the run")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+        # Internal: the parent re-runs this command in child processes
+        parser.add_argument('--role', choices=['run', 'seed', 'reader', 'writer'], default='run', help="Internal")
+        parser.add_argument('--process', type=int, default=0, help="Internal")
+        parser.add_argument('--start-at', type=float, default=0, help="Internal")
+
+    def handle(self, *args, **options):
+        role = options['role']
+        if role != 'run':
+            return getattr(self, f'_{role}')(options)
+
+        profiles = [profile.strip() for profile in options['profiles'].split(',') if profile.strip()]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+        try:
+            ages = [int(age) for age in options['conn_max_age'].split(',') if age.strip()]
+        except ValueError:
+            raise CommandError("--conn-max-age takes comma-separated integers")
+
+        report = {'readers': options['readers'], 'writers': options['writers'],
+                  'operations': options['operations'], 'seed_votes': options['seed_votes'], 'runs': []}
+        for profile, age in itertools.product(profiles, ages):
+            result = self._run(profile, age, options)
+            report['runs'].append(result)
+            if not options['json']:
+                self.stdout.write(
+                    f"{profile:>8} CONN_MAX_AGE={age:<3}  "
+                    f"reads {result['reads']['throughput_per_s']:>8}/s p99={result['reads']['p99_ms']}ms  "
+                    f"writes {result['writes']['throughput_per_s']:>7}/s p99={result['writes']['p99_ms']}ms  "
+                    f"locked errors={result['locked_errors']}"
+                )
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+
+    # Parent
+
+    def _run(self, profile, conn_max_age, options):
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(os.environ, DATABASE_NAME=os.path.join(workdir, 'bench.sqlite3'),
+                       STATS_CACHE_LOCATION=os.path.join(workdir, 'cache'),
+                       PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'metrics'),
+                       SQLITE_PROFILE=profile, DATABASE_CONN_MAX_AGE=str(conn_max_age), DEBUG='False')
+            manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+
+            def command(*args):
+                return [sys.executable, manage_py, 'benchmark_sqlite', '--operations', str(options['operations']),
+                        '--seed-votes', str(options['seed_votes']), *args]
+
+            subprocess.run([sys.executable, manage_py, 'migrate', '--noinput', '-v', '0'],
+                           env=env, check=True, cwd=settings.BASE_DIR)
+            subprocess.run(command('--role', 'seed'), env=env, check=True, cwd=settings.BASE_DIR)
+
+            # Start every process at the same moment, after they have all booted
+            roles = ['reader'] * options['readers'] + ['writer'] * options['writers']
+            start_at = time.time() + 2 + len(roles) * 0.2
+            processes = [
+                (role, subprocess.Popen(command('--role', role, '--process', str(number),
+                                                '--start-at', str(start_at)),
+                                        env=env, cwd=settings.BASE_DIR, stdout=subprocess.PIPE, text=True))
+                for number, role in enumerate(roles)
+            ]
+            outputs = [(role, process.communicate()[0], process.returncode) for role, process in processes]
+            if any(returncode for _, _, returncode in outputs):
+                raise CommandError(f"A {profile} benchmark process failed")
+
+        result = {'profile': profile, 'conn_max_age': conn_max_age, 'locked_errors': 0}
+        for role, key in (('reader', 'reads'), ('writer', 'writes')):
+            runs = [json.loads(output) for output_role, output, _ in outputs if output_role == role]
+            if not runs:
+                result[key] = summarize([], 0)
+                continue
+            elapsed = max(run['finished'] for run in runs) - min(run['started'] for run in runs)
+            result[key] = summarize([latency for run in runs for latency in run['latencies']], elapsed)
+            result['locked_errors'] += sum(run['errors'] for run in runs)
+        return result
+
+    # Children
+
+    def _seed(self, options):
+        run_id = uuid.uuid4().hex[:8]
+        Vote.objects.bulk_create([_vote(0, i, run_id) for i in range(options['seed_votes'])], batch_size=1000)
+        VoteResults.objects.bulk_create([VoteResults(team_id=team, team_name=team) for team in TEAMS])
+
+    def _reader(self, options):
+        def read():
+            # What the dashboard and logs pages query
+            list(Vote.objects.values('voted_for').annotate(count=Count('id')))
+            list(Vote.objects.order_by('-timestamp')[:20])
+            list(SystemLog.objects.order_by('-timestamp')[:50])
+            list(VoteResults.objects.all())
+        self._loop(read, options)
+
+    def _writer(self, options):
+        run_id = uuid.uuid4().hex[:8]
+        counter = itertools.count()
+
+        def write():
+            i = next(counter)
+            with transaction.atomic():
+                vote = _vote(options['process'], i, run_id)
+                vote.save()
+                SystemLog.objects.create(level='INFO', action_type='VOTE_SYNC', message=f"Vote {vote.vote_id}",
+                                         details={'vote_id': vote.vote_id}, user='benchmark')
+        self._loop(write, options)
+
+    def _loop(self, operation, options):
+        latencies, errors = [], 0
+        time.sleep(max(0.0, options['start_at'] - time.time()))
+        started = time.time()
+        for _ in range(options['operations']):
+            # Like a request: reuse or reconnect according to CONN_MAX_AGE
+            close_old_connections()
+            began = time.perf_counter()
+            try:
+                operation()
+            except OperationalError:
+                errors += 1  # "database is locked"
+            else:
+                latencies.append(time.perf_counter() - began)
+            close_old_connections()
+        self.stdout.write(json.dumps({'started': started, 'finished': time.time(), 'latencies': latencies,
+                                      'errors': errors}))
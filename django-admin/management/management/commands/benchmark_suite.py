@@ -0,0 +1,191 @@
+import json
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from management.benchmarking import spawn_gunicorn, summarize
+from management.stub_backend import StubVotingBackend
+
+TEAMS = ['team-a', 'team-b', 'team-c', 'team-d']
+
+
+def _vote(run_id):
+    def body(i):
+        user_team = TEAMS[i % len(TEAMS)]
+        voted_for = TEAMS[(i + 1 + (i // len(TEAMS)) % (len(TEAMS) - 1)) % len(TEAMS)]
+        return {'userTeam': user_team, 'votedFor': voted_for, 'userIdentifier': f'bench-{run_id}-{i}'}
+    return body
+
+
+# name -> (method, path, expected status, JSON body builder). Run in this order:
+# the syncs fill the admin's database before the pages that read it.
+SCENARIOS = {
+    'sync_votes': ('POST', '/ajax/sync-votes/', 200, None),
+    'sync_results': ('POST', '/ajax/sync-results/', 200, None),
+    'dashboard': ('GET', '/', 200, None),
+    'results': ('GET', '/results/', 200, None),
+    'votes_list': ('GET', '/votes/', 200, None),
+    'votes_list_search': ('GET', '/votes/?search=voter', 200, None),
+    'dashboard_stats': ('GET', '/ajax/dashboard-stats/', 200, None),
+    'submit_vote': ('POST', '/api/vote/', 201, _vote),
+}
+
+
+class Command(BaseCommand):
+    help = ("Load-test the admin views against a stub voting backend and report throughput and "
+            "latency percentiles per scenario as JSON, for comparison between commits")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                            help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario")
+        parser.add_argument('--sync-requests', type=int, default=20,
+                            help="Requests for the sync scenarios, which reload every backend vote")
+        parser.add_argument('--concurrency', type=int, default=8, help="Concurrent client connections")
+        parser.add_argument('--workers', type=int, default=2, help="gunicorn worker processes")
+        parser.add_argument('--threads', type=int, default=4, help="Threads per gunicorn worker")
+        parser.add_argument('--votes', type=int, default=2000, help="Votes seeded into the stub backend")
+        parser.add_argument('--results-delay-ms', type=float, default=20, help="Stub latency for /api/results")
+        parser.add_argument('--votes-delay-ms', type=float, default=50, help="Stub latency for /api/admin/votes")
+        parser.add_argument('--backend-delay-ms', type=float, default=5, help="Stub latency for other endpoints")
+        parser.add_argument('--output', help="Also write the JSON report to this file")
+        parser.add_argument('--baseline', help="JSON report from an earlier run to compare against")
+        parser.add_argument('--max-regression', type=float, default=None,
+                            help="With --baseline, fail if any scenario's p95 grew by more than this percent")
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = [name for name in SCENARIOS if name in scenarios]
+
+        backend_delay = options['backend_delay_ms'] / 1000.0
+        latency = {key: backend_delay for key in ('health', 'vote', 'vote_status', 'devices')}
+        latency.update(results=options['results_delay_ms'] / 1000.0, votes=options['votes_delay_ms'] / 1000.0)
+
+        report = {
+            'meta': self._meta(options, latency),
+            'scenarios': {},
+        }
+
+        server = None
+        with tempfile.TemporaryDirectory() as workdir, \
+                StubVotingBackend(votes=options['votes'], latency=latency) as backend:
+            try:
+                server, base_url = spawn_gunicorn(workdir, options['workers'], options['threads'],
+                                                  env={'VOTING_API_BASE_URL': backend.base_url})
+                for name in scenarios:
+                    total = options['sync_requests'] if name.startswith('sync_') else options['requests']
+                    report['scenarios'][name] = self._run(base_url, name, total, options['concurrency'])
+                    if not options['json']:
+                        self._print(name, report['scenarios'][name])
+                report['meta']['backend_requests'] = backend.requests
+            finally:
+                if server:
+                    server.terminate()
+                    server.wait(timeout=10)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+
+        if options['baseline']:
+            self._compare(report, options['baseline'], options['max_regression'])
+
+    def _meta(self, options, latency):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                    cwd=settings.BASE_DIR, timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'commit': commit,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'requests': options['requests'],
+            'sync_requests': options['sync_requests'],
+            'concurrency': options['concurrency'],
+            'workers': options['workers'],
+            'threads': options['threads'],
+            'stub_votes': options['votes'],
+            'injected_latency_ms': {key: round(delay * 1000, 3) for key, delay in sorted(latency.items())},
+        }
+
+    def _run(self, base_url, name, total, concurrency):
+        method, path, expected, make_body = SCENARIOS[name]
+        body = make_body(uuid.uuid4().hex[:8]) if make_body else None
+        url = f'{base_url}{path}'
+        local = threading.local()
+
+        def request(i):
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+            started = time.perf_counter()
+            try:
+                response = local.session.request(method, url, json=body(i) if body else None, timeout=60)
+                status = response.status_code
+            except requests.exceptions.RequestException:
+                status = None
+            return time.perf_counter() - started, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(request, range(total)))
+        elapsed = time.perf_counter() - started
+
+        # Percentiles cover successful requests only; failures are counted separately
+        latencies = [latency for latency, status in outcomes if status == expected]
+        result = summarize(latencies, elapsed)
+        result['errors'] = len(outcomes) - len(latencies)
+        statuses = {}
+        for _, status in outcomes:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        result['status_codes'] = statuses
+        return result
+
+    def _print(self, name, result):
+        line = (f"{name:>18}: {result['throughput_per_s']:>8} req/s  p50={result['p50_ms']}ms "
+                f"p95={result['p95_ms']}ms p99={result['p99_ms']}ms")
+        if result['errors']:
+            line += self.style.ERROR(f"  errors={result['errors']} {result['status_codes']}")
+        self.stdout.write(line)
+
+    def _compare(self, report, baseline_path, max_regression):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+        regressions = []
+        self.stdout.write(f"Compared with {baseline_path} (commit {baseline.get('meta', {}).get('commit')}):")
+        for name, result in report['scenarios'].items():
+            before = baseline.get('scenarios', {}).get(name)
+            if not before:
+                self.stdout.write(f"{name:>18}: not in baseline")
+                continue
+            p95_change = _change(before['p95_ms'], result['p95_ms'])
+            throughput_change = _change(before['throughput_per_s'], result['throughput_per_s'])
+            self.stdout.write(f"{name:>18}: p95 {before['p95_ms']} -> {result['p95_ms']}ms ({p95_change:+.1f}%), "
+                              f"throughput {before['throughput_per_s']} -> {result['throughput_per_s']} req/s "
+                              f"({throughput_change:+.1f}%)")
+            if max_regression is not None and p95_change > max_regression:
+                regressions.append(f"{name} p95 {p95_change:+.1f}%")
+
+        if regressions:
+            raise CommandError(f"p95 regressed by more than {max_regression}%: {', '.join(regressions)}")
+
+
+def _change(before, after):
+    return (after - before) / before * 100 if before else 0.0
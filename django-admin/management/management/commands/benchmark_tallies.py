@@ -0,0 +1,180 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, transaction
+from django.db.models import F
+
+from management import tallies
+from management.benchmarking import summarize
+from management.models import VoteResults
+
+TEAMS = ['team-a', 'team-b', 'team-c', 'team-d']
+
+# sharded: increments spread over TALLY_SHARDS rows per team, folded by a concurrent compactor
+# single:  every writer updates the team's one VoteResults row
+MODES = ('sharded', 'single')
+
+
+def _team(writer, i):
+    return TEAMS[(writer + i) % len(TEAMS)]
+
+
+class Command(BaseCommand):
+    help = ("Stress-test vote tally counters from several processes against a throwaway SQLite database: "
+            "check the final counts are exact and compare write throughput of sharded and single-row counters")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8, help="Concurrent writer processes")
+        parser.add_argument('--increments', type=int, default=500, help="Increments (transactions) per writer")
+        parser.add_argument('--shards', type=int, default=settings.TALLY_SHARDS, help="TALLY_SHARDS for sharded mode")
+        parser.add_argument('--modes', default=','.join(MODES), help=f"Comma-separated subset of: {', '.join(MODES)}")
+        parser.add_argument('--compact-interval', type=float, default=0.05,
+                            help="Seconds between compactions while the writers run")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+        # Internal: the parent re-runs this command in child processes
+        parser.add_argument('--role', choices=['run', 'setup', 'writer', 'compactor', 'verify'], default='run',
+                            help="Internal")
+        parser.add_argument('--mode', choices=MODES, default='sharded', help="Internal")
+        parser.add_argument('--writer', type=int, default=0, help="Internal")
+        parser.add_argument('--start-at', type=float, default=0, help="Internal")
+
+    def handle(self, *args, **options):
+        role = options['role']
+        if role != 'run':
+            return getattr(self, f'_{role}')(options)
+
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))}")
+
+        report = {'processes': options['processes'], 'increments': options['increments'],
+                  'shards': options['shards'], 'modes': {}}
+        for mode in modes:
+            report['modes'][mode] = result = self._run(mode, options)
+            if not options['json']:
+                self.stdout.write(f"{mode:>8}: {result['throughput_per_s']:>8} increments/s  "
+                                  f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms  "
+                                  f"lock timeouts={result['lock_timeouts']}  exact={result['exact']}")
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+        failed = [mode for mode, result in report['modes'].items() if not result['exact']]
+        if failed:
+            raise CommandError(f"Final counts were wrong for: {', '.join(failed)}")
+
+    # Parent
+
+    def _run(self, mode, options):
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(os.environ, DATABASE_NAME=os.path.join(workdir, 'tallies.sqlite3'),
+                       STATS_CACHE_LOCATION=os.path.join(workdir, 'cache'),
+                       PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'metrics'),
+                       TALLY_SHARDS=str(options['shards']), DEBUG='False')
+            manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+
+            def command(*args):
+                return [sys.executable, manage_py, 'benchmark_tallies', '--mode', mode,
+                        '--compact-interval', str(options['compact_interval']), *args]
+
+            subprocess.run([sys.executable, manage_py, 'migrate', '--noinput', '-v', '0'],
+                           env=env, check=True, cwd=settings.BASE_DIR)
+            subprocess.run(command('--role', 'setup'), env=env, check=True, cwd=settings.BASE_DIR)
+
+            compactor, writers = None, []
+            try:
+                if mode == 'sharded':
+                    compactor = subprocess.Popen(command('--role', 'compactor'), env=env, cwd=settings.BASE_DIR)
+
+                # Start every writer at the same moment, after they have all booted
+                start_at = time.time() + 2 + options['processes'] * 0.2
+                writers = [
+                    subprocess.Popen(command('--role', 'writer', '--writer', str(writer),
+                                             '--increments', str(options['increments']),
+                                             '--start-at', str(start_at)),
+                                     env=env, cwd=settings.BASE_DIR, stdout=subprocess.PIPE, text=True)
+                    for writer in range(options['processes'])
+                ]
+                outputs = [writer.communicate()[0] for writer in writers]
+                if any(writer.returncode for writer in writers):
+                    raise CommandError(f"A {mode} writer failed")
+                outputs = [json.loads(output) for output in outputs]
+            finally:
+                for process in writers + [compactor]:
+                    if process and process.poll() is None:
+                        process.send_signal(signal.SIGTERM)
+                        process.wait(timeout=30)
+
+            verify = subprocess.run(command('--role', 'verify'), env=env, check=True, cwd=settings.BASE_DIR,
+                                    stdout=subprocess.PIPE, text=True)
+            counts = json.loads(verify.stdout)
+
+        expected = {team: 0 for team in TEAMS}
+        for writer in range(options['processes']):
+            for i in range(options['increments']):
+                expected[_team(writer, i)] += 1
+
+        elapsed = max(out['finished'] for out in outputs) - min(out['started'] for out in outputs)
+        result = summarize([latency for out in outputs for latency in out['latencies']], elapsed)
+        result.update(exact=counts == expected, counts=counts, expected=expected,
+                      lock_timeouts=sum(out['lock_timeouts'] for out in outputs))
+        return result
+
+    # Children
+
+    def _setup(self, options):
+        if options['mode'] == 'single':
+            VoteResults.objects.bulk_create([VoteResults(team_id=team, team_name=team) for team in TEAMS])
+
+    def _writer(self, options):
+        writer, mode = options['writer'], options['mode']
+        latencies, lock_timeouts = [], 0
+        time.sleep(max(0.0, options['start_at'] - time.time()))
+        started = time.time()
+        for i in range(options['increments']):
+            team = _team(writer, i)
+            began = time.perf_counter()
+            while True:
+                try:
+                    with transaction.atomic():
+                        if mode == 'sharded':
+                            tallies.increment(team)
+                        else:
+                            VoteResults.objects.filter(team_id=team).update(vote_count=F('vote_count') + 1)
+                    break
+                except OperationalError:
+                    # Waited longer than the busy timeout for the write lock; nothing was written
+                    lock_timeouts += 1
+            latencies.append(time.perf_counter() - began)
+        self.stdout.write(json.dumps({'started': started, 'finished': time.time(), 'latencies': latencies,
+                                      'lock_timeouts': lock_timeouts}))
+
+    def _compactor(self, options):
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+        while not stopping:
+            try:
+                tallies.compact()
+            except OperationalError:
+                pass  # Lost the race for the write lock; try again next round
+            time.sleep(options['compact_interval'])
+
+    def _verify(self, options):
+        if options['mode'] == 'sharded':
+            # Reads must already include pending shard counts: folding them may not change the totals
+            before = tallies.read_tallies()
+            tallies.compact()
+            after = dict(VoteResults.objects.values_list('team_id', 'vote_count'))
+            if before != after or tallies.pending():
+                raise CommandError(f"Compaction changed the counts: {before} -> {after}")
+            counts = after
+        else:
+            counts = dict(VoteResults.objects.values_list('team_id', 'vote_count'))
+        self.stdout.write(json.dumps(counts))
@@ -0,0 +1,84 @@
+import json
+import time
+from contextlib import ExitStack
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from management import teams
+from management.benchmarking import isolated_database, summarize
+from management.models import Team, Vote
+
+# The list page resolves team names per row and renders every team in the filter
+PAGE = '/management/votes/'
+
+MODES = ('legacy', 'registry')
+
+
+class LegacyTeams(teams.TeamRegistry):
+    """The former lookups: a dict built from the choices list on every access"""
+
+    def __contains__(self, team_id):
+        return team_id in dict(self.choices)
+
+    def name(self, team_id):
+        return dict(self.choices).get(team_id, team_id)
+
+
+class Command(BaseCommand):
+    help = "Measure the votes list page with many teams, using the team registry vs per-access lookups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=500)
+        parser.add_argument('--votes', type=int, default=2000, help="Votes seeded across the teams")
+        parser.add_argument('--requests', type=int, default=50, help="Page loads per mode")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        report = {'teams': options['teams'], 'votes': options['votes']}
+        with isolated_database(), override_settings(ALLOWED_HOSTS=['*']):
+            self._seed(options['teams'], options['votes'])
+            for mode in MODES:
+                with ExitStack() as stack:
+                    if mode == 'legacy':
+                        legacy = LegacyTeams.load()
+                        for target in ('management.models._team_names', 'management.views.get_registry'):
+                            stack.enter_context(mock.patch(target, return_value=legacy))
+                    report[mode] = self._measure(options['requests'])
+            teams.invalidate()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+
+        for mode in MODES:
+            result = report[mode]
+            self.stdout.write(f"{mode:>8}: p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                              f"p99={result['p99_ms']}ms")
+
+    def _seed(self, team_count, vote_count):
+        Team.objects.all().delete()
+        Team.objects.bulk_create([Team(team_id=f't{i:04d}', name=f'Team {i + 1:04d}', position=i)
+                                  for i in range(team_count)])
+        ids = [f't{i:04d}' for i in range(team_count)]
+        Vote.objects.bulk_create([
+            Vote(vote_id=f'bench-{i}', user_team=ids[i % team_count], voted_for=ids[(i * 7 + 1) % team_count],
+                 user_identifier=f'bench-{i}', name=f'Voter {i}', ip_address='127.0.0.1')
+            for i in range(vote_count)
+        ], batch_size=1000)
+        # bulk_create sends no signals
+        teams.invalidate()
+
+    def _measure(self, total):
+        client = Client()
+        client.get(PAGE)  # Warm up templates and the registry
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(total):
+            request_started = time.perf_counter()
+            response = client.get(PAGE)
+            latencies.append(time.perf_counter() - request_started)
+            if response.status_code != 200:
+                self.stderr.write(f"Votes list returned {response.status_code}")
+        return summarize(latencies, time.perf_counter() - started)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from management.rounds import purge_rounds
+
+
+class Command(BaseCommand):
+    help = ("Delete the votes, voters and results of archived voting rounds, keeping the newest "
+            "ROUNDS['KEEP_ARCHIVED'] rounds (the sync worker's 'rounds' task does this periodically)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, default=settings.ROUNDS['KEEP_ARCHIVED'],
+                            help="Archived rounds to keep")
+        parser.add_argument('--batch-size', type=int, default=settings.ROUNDS['PURGE_BATCH_SIZE'],
+                            help="Rows deleted per transaction")
+
+    def handle(self, *args, **options):
+        purged = purge_rounds(keep=options['keep'], batch_size=options['batch_size'], user='purge_rounds')
+        if purged:
+            self.stdout.write(self.style.SUCCESS(f"Purged rounds: {', '.join(map(str, purged))}"))
+        else:
+            self.stdout.write("No archived rounds to purge")
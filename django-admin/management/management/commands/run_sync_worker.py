@@ -0,0 +1,41 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from management.models import SyncStatus
+from management.sync_worker import TASKS, SyncWorker, WorkerAlreadyRunning, worker_lock
+
+
+class Command(BaseCommand):
+    help = ("Keep the local results, votes and device stats in sync with the voting backend, each on its "
+            "own interval (SYNC_WORKER). Only one worker runs at a time.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', default=','.join(TASKS), help=f"Comma-separated subset of: {', '.join(TASKS)}")
+        parser.add_argument('--once', action='store_true', help="Run each task once and exit")
+
+    def handle(self, *args, **options):
+        tasks = [task.strip() for task in options['tasks'].split(',') if task.strip()]
+        unknown = set(tasks) - set(TASKS)
+        if unknown:
+            raise CommandError(f"Unknown tasks: {', '.join(sorted(unknown))}")
+
+        worker = SyncWorker(tasks=tasks)
+        try:
+            with worker_lock(settings.SYNC_WORKER['LOCK_FILE']):
+                if not options['once']:
+                    for signum in (signal.SIGINT, signal.SIGTERM):
+                        signal.signal(signum, lambda *_: worker.stop())
+                    intervals = ', '.join(f"{task} every {worker.intervals[task]:g}s" for task in tasks)
+                    self.stdout.write(f"Sync worker started: {intervals}")
+                worker.run(once=options['once'])
+        except WorkerAlreadyRunning as e:
+            raise CommandError(str(e))
+
+        if options['once']:
+            for status in SyncStatus.objects.filter(task__in=tasks):
+                line = str(status)
+                self.stdout.write(self.style.SUCCESS(line) if status.healthy else self.style.ERROR(line))
+        else:
+            self.stdout.write("Sync worker stopped")
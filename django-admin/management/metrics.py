@@ -0,0 +1,130 @@
+"""
+Prometheus metrics shared by all worker processes.
+
+prometheus_client runs in multiprocess mode: each process records into
+memory-mapped files under ``PROMETHEUS_MULTIPROC_DIR`` (set in settings),
+and ``/management/metrics/`` sums every process's files when scraped.
+Recording is a dict lookup and an mmap write, cheap enough for the hot
+path. gunicorn.conf.py empties the directory when the server starts.
+
+Cache hit ratio, for example::
+
+    sum(rate(voting_stats_cache_requests_total{result="hit"}[5m]))
+      / sum(rate(voting_stats_cache_requests_total[5m]))
+"""
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+API_REQUEST_SECONDS = Histogram(
+    'voting_api_request_duration_seconds',
+    'Latency of calls to the voting backend API',
+    ['endpoint', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+SYNC_SECONDS = Histogram(
+    'voting_sync_duration_seconds',
+    'Duration of backend syncs',
+    ['kind', 'outcome'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+VOTES_SYNCED = Counter(
+    'voting_votes_synced',
+    'Local vote rows changed by backend syncs',
+    ['action'],
+)
+VOTES_INGESTED = Counter(
+    'voting_votes_ingested',
+    'Votes accepted and stored by the local ingestion engine',
+)
+STATS_CACHE_REQUESTS = Counter(
+    'voting_stats_cache_requests',
+    'Stats cache lookups: hit (fresh), stale (served while revalidating), '
+    'coalesced (filled by another caller while waiting) or miss (computed)',
+    ['key', 'result'],
+)
+CIRCUIT_TRANSITIONS = Counter(
+    'voting_circuit_breaker_transitions',
+    'Circuit breaker state changes, by the state entered',
+    ['breaker', 'state'],
+)
+RATE_LIMITED = Counter(
+    'voting_rate_limited',
+    'Requests rejected with 429 by the rate limiter, by route and the limit hit',
+    ['route', 'key'],
+)
+DB_WRITE_LOCK_WAIT_SECONDS = Histogram(
+    'voting_db_write_lock_wait_seconds',
+    'Time spent in BEGIN IMMEDIATE waiting for the SQLite write lock',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+def observe_api_request(endpoint: str, method: str, status: str, seconds: float):
+    API_REQUEST_SECONDS.labels(endpoint, method, status).observe(seconds)
+
+
+@contextmanager
+def timed_sync(kind: str):
+    """Time a sync; usable as a decorator. Outcome is 'error' if it raised"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'success'
+    finally:
+        SYNC_SECONDS.labels(kind, outcome).observe(time.perf_counter() - started)
+
+
+def record_synced_votes(sync_metrics):
+    for action in ('inserted', 'updated', 'deleted'):
+        if sync_metrics.get(action):
+            VOTES_SYNCED.labels(action).inc(sync_metrics[action])
+
+
+def record_cache_lookup(key: str, result: str):
+    STATS_CACHE_REQUESTS.labels(key, result).inc()
+
+
+def record_circuit_transition(breaker: str, state: str):
+    CIRCUIT_TRANSITIONS.labels(breaker, state).inc()
+
+
+def record_rate_limited(route: str, key: str):
+    RATE_LIMITED.labels(route, key).inc()
+
+
+def time_write_lock(execute, sql, params, many, context):
+    """Connection execute wrapper timing how long BEGIN waits for the write lock"""
+    if not sql.startswith('BEGIN'):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_WRITE_LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+def install_db_timing(sender, connection, **kwargs):
+    """connection_created receiver"""
+    if connection.vendor == 'sqlite' and time_write_lock not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_write_lock)
+
+
+def render():
+    """Prometheus text exposition of every process's metrics"""
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def clear_multiprocess_dir():
+    """Delete metric files left by a previous server run"""
+    directory = Path(settings.PROMETHEUS_MULTIPROC_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob('*.db'):
+        path.unlink(missing_ok=True)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='name',
+            field=models.CharField(blank=True, help_text="Voter's name", max_length=100, null=True),
+        ),
+    ]
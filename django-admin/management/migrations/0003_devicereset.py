@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0002_vote_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceReset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('previous_voter_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Device Reset',
+                'verbose_name_plural': 'Device Resets',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['user_identifier', 'timestamp'], name='vote_identifier_ts_idx'),
+        ),
+    ]
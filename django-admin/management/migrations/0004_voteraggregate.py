@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:50
+
+from django.db import migrations, models
+
+
+def backfill_voter_aggregates(apps, schema_editor):
+    Vote = apps.get_model('management', 'Vote')
+    VoterAggregate = apps.get_model('management', 'VoterAggregate')
+
+    aggregates = {}
+    for vote in Vote.objects.order_by('id').iterator():
+        key = (vote.name or '').strip() or 'Anonymous'
+        aggregate = aggregates.setdefault(key, {'teams': set(), 'user_team': '', 'timestamp': None,
+                                                'ip_address': None, 'count': 0})
+        aggregate['teams'].add(vote.voted_for)
+        aggregate['user_team'] = aggregate['user_team'] or vote.user_team
+        if aggregate['timestamp'] is None or vote.timestamp > aggregate['timestamp']:
+            aggregate['timestamp'], aggregate['ip_address'] = vote.timestamp, vote.ip_address
+        aggregate['count'] += 1
+
+    VoterAggregate.objects.bulk_create([
+        VoterAggregate(name=key, user_team=aggregate['user_team'],
+                       voted_for_teams=','.join(sorted(aggregate['teams'])),
+                       latest_timestamp=aggregate['timestamp'], ip_address=aggregate['ip_address'],
+                       vote_count=aggregate['count'])
+        for key, aggregate in aggregates.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0003_devicereset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoterAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="Voter's name, or Anonymous", max_length=100, unique=True)),
+                ('user_team', models.CharField(blank=True, choices=[('team-a', 'Team 01'), ('team-b', 'Team 02'), ('team-c', 'Team 03'), ('team-d', 'Team 04')], max_length=10)),
+                ('voted_for_teams', models.CharField(blank=True, help_text='Comma-separated team IDs this voter voted for', max_length=255)),
+                ('latest_timestamp', models.DateTimeField()),
+                ('ip_address', models.GenericIPAddressField(blank=True, help_text='IP of the latest vote', null=True)),
+                ('vote_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Voter Aggregate',
+                'verbose_name_plural': 'Voter Aggregates',
+                'ordering': ['-latest_timestamp'],
+                'indexes': [models.Index(fields=['-latest_timestamp'], name='voteragg_latest_ts_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_voter_aggregates, migrations.RunPython.noop),
+    ]
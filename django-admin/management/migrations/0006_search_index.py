@@ -0,0 +1,67 @@
+import logging
+
+from django.db import migrations, OperationalError
+
+logger = logging.getLogger(__name__)
+
+# FTS5 external-content tables over the searched columns, kept in sync by triggers
+SEARCH_INDEXES = {
+    'management_vote_fts': ('management_vote', ['vote_id', 'user_identifier', 'ip_address', 'name']),
+    'management_systemlog_fts': ('management_systemlog', ['message', 'user', 'details']),
+}
+
+
+def _triggers(fts_table, table, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{col}' for col in columns)
+    old = ', '.join(f'old.{col}' for col in columns)
+    return [
+        f"""CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new});
+        END""",
+        f"""CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old});
+        END""",
+        f"""CREATE TRIGGER {fts_table}_au AFTER UPDATE ON {table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old});
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new});
+        END""",
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts_table, (table, columns) in SEARCH_INDEXES.items():
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {fts_table} USING fts5("
+                f"{', '.join(columns)}, content='{table}', content_rowid='id')"
+            )
+        except OperationalError as e:
+            # SQLite built without FTS5: management.search falls back to icontains
+            logger.warning(f"Skipping full-text index {fts_table}: {str(e)}")
+            continue
+        for trigger in _triggers(fts_table, table, columns):
+            schema_editor.execute(trigger)
+        schema_editor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts_table in SEARCH_INDEXES:
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts_table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0005_vote_systemlog_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
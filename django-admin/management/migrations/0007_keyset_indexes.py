@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0006_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='systemlog',
+            name='syslog_ts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='systemlog',
+            name='syslog_level_ts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='systemlog',
+            name='syslog_action_ts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='systemlog',
+            name='syslog_level_action_ts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vote',
+            name='vote_ts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vote',
+            name='vote_team_ts_idx',
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['-timestamp', '-id'], name='syslog_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['level', '-timestamp', '-id'], name='syslog_level_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['action_type', '-timestamp', '-id'], name='syslog_action_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['level', 'action_type', '-timestamp', '-id'], name='syslog_level_action_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['-timestamp', '-id'], name='vote_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['user_team', '-timestamp', '-id'], name='vote_team_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0007_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='systemlog',
+            name='action_type',
+            field=models.CharField(choices=[('API_CALL', 'API Call'), ('VOTE_SYNC', 'Vote Sync'), ('RESULTS_SYNC', 'Results Sync'), ('ADMIN_ACTION', 'Admin Action'), ('CIRCUIT_BREAKER', 'Circuit Breaker'), ('ERROR', 'Error')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0008_systemlog_circuit_breaker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=20, unique=True)),
+                ('data', models.JSONField(blank=True, help_text='Latest backend payload, served to local reads', null=True)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('last_success_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('consecutive_failures', models.IntegerField(default=0)),
+                ('next_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Sync Status',
+                'verbose_name_plural': 'Sync Statuses',
+                'ordering': ['task'],
+            },
+        ),
+    ]
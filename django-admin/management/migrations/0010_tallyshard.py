@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0009_syncstatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TallyShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_id', models.CharField(max_length=10)),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Tally Shard',
+                'verbose_name_plural': 'Tally Shards',
+                'constraints': [models.UniqueConstraint(fields=('team_id', 'shard'), name='tally_shard_team_shard_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,157 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:54
+
+from importlib import import_module
+
+import django.db.models.deletion
+import django.utils.timezone
+import management.models
+from django.db import migrations, models
+
+search_index = import_module('management.migrations.0006_search_index')
+
+ROUND_SCOPED = ['vote', 'voteraggregate', 'voteresults', 'tallyshard']
+
+
+def assign_first_round(apps, schema_editor):
+    """Put everything recorded so far into round 1"""
+    Round = apps.get_model('management', 'Round')
+    Vote = apps.get_model('management', 'Vote')
+    first_vote_at = Vote.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+    first_round = Round.objects.create(started_at=first_vote_at or django.utils.timezone.now())
+    for model_name in ROUND_SCOPED:
+        apps.get_model('management', model_name).objects.update(round=first_round)
+
+
+def restore_vote_search_triggers(apps, schema_editor):
+    """Recreate the full-text index's triggers on management_vote after SQLite rebuilt the table"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    fts_table = 'management_vote_fts'
+    table, columns = search_index.SEARCH_INDEXES[fts_table]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [fts_table])
+        if cursor.fetchone() is None:
+            return  # No FTS5
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}")
+    for trigger in search_index._triggers(fts_table, table, columns):
+        schema_editor.execute(trigger)
+    schema_editor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+
+def round_field(related_name, db_index=False, null=False):
+    return models.ForeignKey(db_index=db_index, null=null, default=None if null else management.models.active_round_id,
+                             on_delete=django.db.models.deletion.PROTECT, related_name=related_name,
+                             to='management.round')
+
+
+RELATED_NAMES = {
+    'vote': 'votes',
+    'voteraggregate': 'voter_aggregates',
+    'voteresults': 'results',
+    'tallyshard': 'tally_shards',
+}
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0010_tallyshard'),
+    ]
+
+    operations = [
+        # Rebuilding management_vote (forwards or backwards) drops the full-text index's triggers
+        migrations.RunPython(migrations.RunPython.noop, restore_vote_search_triggers),
+        migrations.CreateModel(
+            name='Round',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('purged_at', models.DateTimeField(blank=True, help_text="When the round's votes were deleted", null=True)),
+                ('summary', models.JSONField(blank=True, help_text='Final results, kept after purging', null=True)),
+            ],
+            options={
+                'verbose_name': 'Round',
+                'verbose_name_plural': 'Rounds',
+                'ordering': ['-id'],
+            },
+        ),
+        # Nullable first so existing rows can be assigned to round 1
+        *[
+            migrations.AddField(
+                model_name=model_name,
+                name='round',
+                field=round_field(related_name, db_index=model_name == 'vote', null=True),
+            )
+            for model_name, related_name in RELATED_NAMES.items()
+        ],
+        migrations.RunPython(assign_first_round, migrations.RunPython.noop),
+        *[
+            migrations.AlterField(
+                model_name=model_name,
+                name='round',
+                field=round_field(related_name, db_index=model_name == 'vote'),
+            )
+            for model_name, related_name in RELATED_NAMES.items()
+        ],
+        migrations.RemoveConstraint(
+            model_name='tallyshard',
+            name='tally_shard_team_shard_uniq',
+        ),
+        migrations.RemoveIndex(
+            model_name='vote',
+            name='vote_identifier_ts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vote',
+            name='vote_ts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vote',
+            name='vote_team_ts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='voteraggregate',
+            name='voteragg_latest_ts_idx',
+        ),
+        migrations.AlterField(
+            model_name='voteraggregate',
+            name='name',
+            field=models.CharField(help_text="Voter's name, or Anonymous", max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='voteresults',
+            name='team_id',
+            field=models.CharField(max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['round', 'user_identifier', 'timestamp'], name='vote_round_identifier_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['round', '-timestamp', '-id'], name='vote_round_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['round', 'user_team', '-timestamp', '-id'], name='vote_round_team_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voteraggregate',
+            index=models.Index(fields=['round', '-latest_timestamp'], name='voteragg_round_latest_ts_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tallyshard',
+            constraint=models.UniqueConstraint(fields=('round', 'team_id', 'shard'), name='tally_shard_round_team_shard_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='voteraggregate',
+            constraint=models.UniqueConstraint(fields=('round', 'name'), name='voteragg_round_name_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='voteresults',
+            constraint=models.UniqueConstraint(fields=('round', 'team_id'), name='voteresults_round_team_uniq'),
+        ),
+        migrations.RunPython(restore_vote_search_triggers, migrations.RunPython.noop),
+    ]
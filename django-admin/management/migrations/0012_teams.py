@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:06
+
+from django.db import migrations, models
+
+# Formerly Vote.TEAM_CHOICES
+TEAMS = [
+    ('team-a', 'Team 01'),
+    ('team-b', 'Team 02'),
+    ('team-c', 'Team 03'),
+    ('team-d', 'Team 04'),
+]
+
+
+def seed_teams(apps, schema_editor):
+    Team = apps.get_model('management', 'Team')
+    Team.objects.bulk_create([Team(team_id=team_id, name=name, position=position)
+                              for position, (team_id, name) in enumerate(TEAMS)])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0011_rounds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_id', models.CharField(max_length=10, unique=True)),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.PositiveIntegerField(default=0, help_text='Display order')),
+            ],
+            options={
+                'verbose_name': 'Team',
+                'verbose_name_plural': 'Teams',
+                'ordering': ['position', 'team_id'],
+            },
+        ),
+        migrations.RunPython(seed_teams, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='vote',
+            name='user_team',
+            field=models.CharField(max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='vote',
+            name='voted_for',
+            field=models.CharField(max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='voteraggregate',
+            name='user_team',
+            field=models.CharField(blank=True, max_length=10),
+        ),
+    ]
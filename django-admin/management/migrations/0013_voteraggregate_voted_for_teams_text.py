@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0012_teams'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='voteraggregate',
+            name='voted_for_teams',
+            field=models.TextField(blank=True, help_text='Comma-separated team IDs this voter voted for'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0013_voteraggregate_voted_for_teams_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='voteresults',
+            index=models.Index(fields=['round', '-vote_count'], name='voteresults_round_count_idx'),
+        ),
+    ]
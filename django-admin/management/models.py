@@ -2,19 +2,74 @@ from django.db import models
 from django.utils import timezone
 
 
+class Round(models.Model):
+    """A voting round: resets open a new one, old rounds are purged later (see rounds.py)"""
+    
+    started_at = models.DateTimeField(default=timezone.now)
+    ended_at = models.DateTimeField(null=True, blank=True)
+    purged_at = models.DateTimeField(null=True, blank=True, help_text="When the round's votes were deleted")
+    summary = models.JSONField(null=True, blank=True, help_text="Final results, kept after purging")
+    
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Round'
+        verbose_name_plural = 'Rounds'
+    
+    @property
+    def status(self):
+        if self.purged_at:
+            return 'purged'
+        return 'archived' if self.ended_at else 'active'
+    
+    def __str__(self):
+        return f"Round {self.pk} ({self.status}, started {self.started_at:%Y-%m-%d %H:%M})"
+
+
+def active_round_id() -> int:
+    """The round new rows belong to: the newest one"""
+    # MAX(id) reads one entry at the end of the primary key
+    round_id = Round.objects.aggregate(active=models.Max('id'))['active']
+    if round_id is None:
+        round_id = Round.objects.create().id
+    return round_id
+
+
+class Team(models.Model):
+    """A team votes can be cast by and for; looked up through teams.get_registry()"""
+    
+    team_id = models.CharField(max_length=10, unique=True)
+    name = models.CharField(max_length=50, unique=True)
+    position = models.PositiveIntegerField(default=0, help_text="Display order")
+    
+    class Meta:
+        ordering = ['position', 'team_id']
+        verbose_name = 'Team'
+        verbose_name_plural = 'Teams'
+    
+    def __str__(self):
+        return self.name
+
+
+def _team_names():
+    from .teams import get_registry
+    return get_registry()
+
+
+class RoundQuerySet(models.QuerySet):
+    def in_round(self, round_id=None):
+        """Rows of ``round_id``, by default the active round"""
+        return self.filter(round_id=round_id or active_round_id())
+
+
 class Vote(models.Model):
     """Model to represent a vote (for local tracking/caching)"""
     
-    TEAM_CHOICES = [
-        ('team-a', 'Team 01'),
-        ('team-b', 'Team 02'),
-        ('team-c', 'Team 03'),
-        ('team-d', 'Team 04'),
-    ]
-    
+    # Also indexed on its own: (round_id, id) seeks for the primary-key cursors
+    round = models.ForeignKey(Round, on_delete=models.PROTECT, default=active_round_id, related_name='votes')
     vote_id = models.CharField(max_length=100, unique=True, help_text="UUID from backend")
-    user_team = models.CharField(max_length=10, choices=TEAM_CHOICES)
-    voted_for = models.CharField(max_length=10, choices=TEAM_CHOICES)
+    # Team ids (Team.team_id)
+    user_team = models.CharField(max_length=10)
+    voted_for = models.CharField(max_length=10)
     timestamp = models.DateTimeField(default=timezone.now)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_identifier = models.CharField(max_length=100, help_text="User identifier from frontend")
@@ -25,28 +80,87 @@ class Vote(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = RoundQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-timestamp']
         verbose_name = 'Vote'
         verbose_name_plural = 'Votes'
+        indexes = [
+            # Every query is scoped to a round, so each index leads with it.
+            # Duplicate-vote check in the ingestion engine; also covers distinct voter counts
+            models.Index(fields=['round', 'user_identifier', 'timestamp'], name='vote_round_identifier_ts_idx'),
+            # VotesListView: newest first, optionally filtered by team. id breaks
+            # timestamp ties so keyset pages seek without a sort
+            models.Index(fields=['round', '-timestamp', '-id'], name='vote_round_ts_idx'),
+            models.Index(fields=['round', 'user_team', '-timestamp', '-id'], name='vote_round_team_ts_idx'),
+        ]
     
     def __str__(self):
         name_part = f"{self.name} - " if self.name else ""
-        return f"{name_part}{self.get_user_team_display()} voted for {self.get_voted_for_display()}"
+        return f"{name_part}{self.team_display_name} voted for {self.voted_for_display_name}"
+    
+    @property
+    def team_display_name(self):
+        return _team_names().name(self.user_team)
+    
+    @property
+    def voted_for_display_name(self):
+        return _team_names().name(self.voted_for)
+
+
+class VoterAggregate(models.Model):
+    """Model to keep one row per voter name for the dashboard voters table"""
+    
+    ANONYMOUS = 'Anonymous'
+    
+    round = models.ForeignKey(Round, on_delete=models.PROTECT, default=active_round_id, db_index=False,
+                              related_name='voter_aggregates')
+    name = models.CharField(max_length=100, help_text="Voter's name, or Anonymous")
+    user_team = models.CharField(max_length=10, blank=True)
+    # Unbounded: the shared Anonymous row can list every team
+    voted_for_teams = models.TextField(blank=True, help_text="Comma-separated team IDs this voter voted for")
+    latest_timestamp = models.DateTimeField()
+    ip_address = models.GenericIPAddressField(null=True, blank=True, help_text="IP of the latest vote")
+    vote_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = RoundQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['-latest_timestamp']
+        verbose_name = 'Voter Aggregate'
+        verbose_name_plural = 'Voter Aggregates'
+        constraints = [
+            models.UniqueConstraint(fields=['round', 'name'], name='voteragg_round_name_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['round', '-latest_timestamp'], name='voteragg_round_latest_ts_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name}: {self.voted_for_display_name}"
+    
+    @property
+    def timestamp(self):
+        return self.latest_timestamp
     
     @property
     def team_display_name(self):
-        return dict(self.TEAM_CHOICES).get(self.user_team, self.user_team)
+        return _team_names().name(self.user_team)
     
     @property
     def voted_for_display_name(self):
-        return dict(self.TEAM_CHOICES).get(self.voted_for, self.voted_for)
+        teams = _team_names()
+        return ', '.join(sorted(teams.name(team) for team in self.voted_for_teams.split(',') if team))
 
 
 class VoteResults(models.Model):
     """Model to cache vote results from backend"""
     
-    team_id = models.CharField(max_length=10, unique=True)
+    round = models.ForeignKey(Round, on_delete=models.PROTECT, default=active_round_id, db_index=False,
+                              related_name='results')
+    team_id = models.CharField(max_length=10)
     team_name = models.CharField(max_length=50)
     vote_count = models.IntegerField(default=0)
     percentage = models.FloatField(default=0.0)
@@ -55,15 +169,61 @@ class VoteResults(models.Model):
     total_votes = models.IntegerField(default=0)
     last_updated = models.DateTimeField(auto_now=True)
     
+    objects = RoundQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Vote Result'
         verbose_name_plural = 'Vote Results'
         ordering = ['-vote_count']
+        constraints = [
+            models.UniqueConstraint(fields=['round', 'team_id'], name='voteresults_round_team_uniq'),
+        ]
+        indexes = [
+            # ResultsView: most votes first without a sort
+            models.Index(fields=['round', '-vote_count'], name='voteresults_round_count_idx'),
+        ]
     
     def __str__(self):
         return f"{self.team_name}: {self.vote_count} votes ({self.percentage}%)"
 
 
+class TallyShard(models.Model):
+    """One of a team's counter slots holding votes not yet folded into VoteResults (see tallies.py)"""
+    
+    round = models.ForeignKey(Round, on_delete=models.PROTECT, default=active_round_id, db_index=False,
+                              related_name='tally_shards')
+    team_id = models.CharField(max_length=10)
+    shard = models.PositiveSmallIntegerField()
+    count = models.BigIntegerField(default=0)
+    
+    objects = RoundQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = 'Tally Shard'
+        verbose_name_plural = 'Tally Shards'
+        constraints = [
+            models.UniqueConstraint(fields=['round', 'team_id', 'shard'], name='tally_shard_round_team_shard_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.team_id}[{self.shard}]: {self.count}"
+
+
+class DeviceReset(models.Model):
+    """Model to record device ID resets (voters may vote again after a reset)"""
+    
+    timestamp = models.DateTimeField(default=timezone.now)
+    previous_voter_count = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-timestamp']
+        verbose_name = 'Device Reset'
+        verbose_name_plural = 'Device Resets'
+    
+    def __str__(self):
+        return f"Device reset at {self.timestamp} ({self.previous_voter_count} voters)"
+
+
 class SystemLog(models.Model):
     """Model to log system activities and API interactions"""
     
@@ -79,6 +239,7 @@ class SystemLog(models.Model):
         ('VOTE_SYNC', 'Vote Sync'),
         ('RESULTS_SYNC', 'Results Sync'),
         ('ADMIN_ACTION', 'Admin Action'),
+        ('CIRCUIT_BREAKER', 'Circuit Breaker'),
         ('ERROR', 'Error'),
     ]
     
@@ -94,6 +255,38 @@ class SystemLog(models.Model):
         ordering = ['-timestamp']
         verbose_name = 'System Log'
         verbose_name_plural = 'System Logs'
+        indexes = [
+            # SystemLogsView and the dashboard: newest first, optionally filtered;
+            # id breaks timestamp ties for keyset pagination
+            models.Index(fields=['-timestamp', '-id'], name='syslog_ts_idx'),
+            models.Index(fields=['level', '-timestamp', '-id'], name='syslog_level_ts_idx'),
+            models.Index(fields=['action_type', '-timestamp', '-id'], name='syslog_action_ts_idx'),
+            models.Index(fields=['level', 'action_type', '-timestamp', '-id'], name='syslog_level_action_ts_idx'),
+        ]
+    
+    def __str__(self):
+        return f"[{self.level}] {self.action_type}: {self.message[:50]}"
+
+class SyncStatus(models.Model):
+    """Latest run of each background sync task (manage.py run_sync_worker)"""
+    
+    task = models.CharField(max_length=20, unique=True)
+    data = models.JSONField(null=True, blank=True, help_text="Latest backend payload, served to local reads")
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    consecutive_failures = models.IntegerField(default=0)
+    next_run_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['task']
+        verbose_name = 'Sync Status'
+        verbose_name_plural = 'Sync Statuses'
+    
+    @property
+    def healthy(self):
+        return self.last_success_at is not None and self.consecutive_failures == 0
     
     def __str__(self):
-        return f"[{self.level}] {self.action_type}: {self.message[:50]}"
\ No newline at end of file
+        state = 'ok' if self.healthy else f"{self.consecutive_failures} failures"
+        return f"{self.task}: {state} (last success {self.last_success_at})"
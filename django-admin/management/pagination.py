@@ -0,0 +1,224 @@
+"""
+Keyset (cursor) pagination for the admin list views.
+
+Django's ``Paginator`` runs ``COUNT(*)`` over the whole filtered queryset
+and fetches pages with ``OFFSET``, so every page costs as much as all the
+rows before it. ``KeysetPaginator`` instead remembers the ordering values
+of the first/last row shown and asks for the rows just before/after them,
+which an index on the ordering columns answers with a seek. Page 1 and
+page 10,000 cost the same.
+
+The queryset must be explicitly ordered by plain field or annotation names
+whose combination is unique, e.g. ``order_by('-timestamp', '-id')``.
+Cursors are opaque URL-safe tokens; a malformed or stale one (for another
+ordering) just returns the first page, like ``Paginator.get_page``.
+
+Orderings on a float annotation (a search rank) page by ``OFFSET`` instead:
+the value is recomputed by every query, so seeking past it can skip or
+repeat rows. Such result sets are small (``SEARCH_RANK_MAX_MATCHES``).
+"""
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import FloatField, Q, QuerySet
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by its ordering.
+
+    ``count_limit`` caps the total count: counting stops after that many
+    rows and ``count_is_exact`` is False, so the templates can show
+    "10,000+" instead of paying for an exact count of a large table.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, count_limit: Optional[int] = None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.count_limit = count_limit
+        self.ordering = self._keys(queryset)
+        self.by_offset = any(isinstance(getattr(queryset.query.annotations.get(name), 'output_field', None),
+                                        FloatField)
+                             for name, _ in self.ordering)
+        self._count = None
+
+    @staticmethod
+    def _keys(queryset: QuerySet) -> List[Tuple[str, bool]]:
+        """(name, descending) for each ordering term"""
+        if not queryset.query.order_by:
+            raise ValueError("KeysetPaginator needs an explicit, unique order_by()")
+        keys = []
+        for term in queryset.query.order_by:
+            if not isinstance(term, str) or term == '?':
+                raise ValueError(f"KeysetPaginator can only order by field names, not {term!r}")
+            keys.append((term.lstrip('-'), term.startswith('-')))
+        return keys
+
+    @property
+    def count(self) -> int:
+        """Matching rows, up to ``count_limit`` + 1"""
+        if self._count is None:
+            queryset = self.queryset.order_by()
+            if self.count_limit is not None:
+                queryset = queryset[:self.count_limit + 1]
+            self._count = queryset.count()
+        return self._count
+
+    @property
+    def count_is_exact(self) -> bool:
+        return self.count_limit is None or self.count <= self.count_limit
+
+    def get_page(self, cursor: Optional[str] = None) -> 'KeysetPage':
+        """Return the page a cursor points to; the first page for no (or a bad) cursor"""
+        if cursor:
+            try:
+                direction, values = self.decode_cursor(cursor)
+            except InvalidCursor:
+                pass
+            else:
+                if self.by_offset:
+                    return self._page_at(values)
+                if direction == FORWARD:
+                    return self._page_after(values)
+                page = self._page_before(values)
+                # Went back past the start (rows were deleted): show a full first page
+                if page.has_previous:
+                    return page
+        return self._page_at(0) if self.by_offset else self._page_after(None)
+
+    def _page_at(self, offset: int) -> 'KeysetPage':
+        rows = list(self.queryset[offset:offset + self.per_page + 1])
+        return KeysetPage(rows[:self.per_page], self,
+                          has_next=len(rows) > self.per_page, has_previous=offset > 0, offset=offset)
+
+    def _page_after(self, values: Optional[List[Any]]) -> 'KeysetPage':
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward=True))
+        rows = list(queryset[:self.per_page + 1])
+        return KeysetPage(rows[:self.per_page], self,
+                          has_next=len(rows) > self.per_page, has_previous=values is not None)
+
+    def _page_before(self, values: List[Any]) -> 'KeysetPage':
+        queryset = self.queryset.filter(self._seek(values, forward=False)).reverse()
+        rows = list(queryset[:self.per_page + 1])
+        return KeysetPage(rows[:self.per_page][::-1], self,
+                          has_next=True, has_previous=len(rows) > self.per_page)
+
+    def _seek(self, values: List[Any], forward: bool, keys: List[Tuple[str, bool]] = None) -> Q:
+        """
+        Rows strictly after (or before) ``values`` in the ordering.
+
+        Written as ``a <= x AND (a < x OR (b < y))`` rather than
+        ``a < x OR (a = x AND b < y)`` so SQLite can use the leading
+        column as an index range.
+        """
+        keys = self.ordering if keys is None else keys
+        (name, descending), value = keys[0], values[0]
+        op = 'lt' if descending == forward else 'gt'
+        strictly = Q(**{f'{name}__{op}': value})
+        if len(keys) == 1:
+            return strictly
+        return Q(**{f'{name}__{op}e': value}) & (strictly | self._seek(values[1:], forward, keys[1:]))
+
+    def encode_cursor(self, row: Any, direction: str) -> str:
+        values = []
+        for name, _ in self.ordering:
+            value = getattr(row, name)
+            values.append(value.isoformat() if isinstance(value, (date, datetime)) else value)
+        return self._encode({'d': direction, 'k': [name for name, _ in self.ordering], 'v': values})
+
+    def encode_offset(self, offset: int) -> str:
+        return self._encode({'d': FORWARD, 'k': [name for name, _ in self.ordering], 'o': offset})
+
+    @staticmethod
+    def _encode(cursor: dict) -> str:
+        payload = json.dumps(cursor, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> Tuple[str, Any]:
+        """(direction, ordering values), or (direction, offset) when paging by offset"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            direction, names, values = payload['d'], payload['k'], payload['o' if self.by_offset else 'v']
+        except (binascii.Error, ValueError, TypeError, KeyError) as e:
+            raise InvalidCursor(f"Malformed cursor: {e}")
+        if direction not in (FORWARD, BACKWARD) or names != [name for name, _ in self.ordering]:
+            raise InvalidCursor("Cursor is for a different ordering")
+        if self.by_offset:
+            if not isinstance(values, int) or isinstance(values, bool) or values < 0:
+                raise InvalidCursor("Cursor has a bad offset")
+            return direction, values
+        if not isinstance(values, list) or len(values) != len(names):
+            raise InvalidCursor("Cursor has the wrong number of values")
+        return direction, [self._to_python(name, value) for name, value in zip(names, values)]
+
+    def _to_python(self, name: str, value: Any) -> Any:
+        opts = self.queryset.model._meta
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            # Annotation (e.g. a search rank): JSON round-trips numbers exactly
+            return value
+        try:
+            return field.to_python(value)
+        except ValidationError as e:
+            raise InvalidCursor(f"Bad cursor value for {name}: {e}")
+
+
+class KeysetPage(Sequence):
+    """One page of rows, with cursors to the neighbouring pages"""
+
+    def __init__(self, object_list: List[Any], paginator: KeysetPaginator, has_next: bool, has_previous: bool,
+                 offset: Optional[int] = None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.offset = offset
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} rows>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self._has_next:
+            return None
+        if self.offset is not None:
+            return self.paginator.encode_offset(self.offset + len(self.object_list))
+        return self.paginator.encode_cursor(self.object_list[-1], FORWARD)
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not self._has_previous:
+            return None
+        if self.offset is not None:
+            return self.paginator.encode_offset(max(self.offset - self.paginator.per_page, 0))
+        return self.paginator.encode_cursor(self.object_list[0], BACKWARD)
@@ -0,0 +1,249 @@
+"""
+Opt-in per-request profiling (``REQUEST_PROFILING['ENABLED']``).
+
+``RequestProfilingMiddleware`` records, for each request, the database
+query count and time, the backend API calls and time per endpoint, and
+template render time. It reports them in a ``Server-Timing`` header (shown
+in the browser dev tools' timing tab) and keeps the slowest requests of
+this worker process for the profiling page.
+
+When disabled the middleware removes itself at startup, and the hooks in
+``VotingAPIService`` and the cursor cost one context variable lookup.
+"""
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends import utils as db_utils
+from django.template.backends import django as django_backend
+from django.utils import timezone
+
+_current: contextvars.ContextVar[Optional['RequestProfile']] = contextvars.ContextVar('request_profile',
+                                                                                      default=None)
+
+
+class RequestProfile:
+    """Timings for one request; backend calls may be recorded from fan-out threads"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = timezone.now()
+        self.status = None
+        self.total = 0.0
+        self.db_count = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.backend: Dict[str, List[float]] = {}  # endpoint -> [calls, seconds]
+        self._lock = threading.Lock()
+
+    def record_query(self, duration: float):
+        with self._lock:
+            self.db_count += 1
+            self.db_time += duration
+
+    def record_backend(self, endpoint: str, duration: float):
+        with self._lock:
+            calls = self.backend.setdefault(endpoint, [0, 0.0])
+            calls[0] += 1
+            calls[1] += duration
+
+    @property
+    def backend_count(self) -> int:
+        return sum(calls for calls, _ in self.backend.values())
+
+    @property
+    def backend_time(self) -> float:
+        # Fan-out calls overlap, so this can exceed the wall time they took
+        return sum(seconds for _, seconds in self.backend.values())
+
+    def server_timing(self) -> str:
+        metrics = [
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries"',
+        ]
+        for endpoint, (calls, seconds) in sorted(self.backend.items()):
+            metrics.append(f'backend-{endpoint};dur={seconds * 1000:.1f};desc="{calls} calls"')
+        if self.render_time:
+            metrics.append(f'render;dur={self.render_time * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'method': self.method,
+            'path': self.path,
+            'status': self.status,
+            'started_at': self.started_at,
+            'total_ms': round(self.total * 1000, 1),
+            'db_count': self.db_count,
+            'db_ms': round(self.db_time * 1000, 1),
+            'backend_count': self.backend_count,
+            'backend_ms': round(self.backend_time * 1000, 1),
+            'backend': {endpoint: {'calls': calls, 'ms': round(seconds * 1000, 1)}
+                        for endpoint, (calls, seconds) in sorted(self.backend.items())},
+            'render_ms': round(self.render_time * 1000, 1),
+        }
+
+
+class SlowestRequests:
+    """Bounded min-heap keeping the ``size`` slowest requests seen by this process"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        entry = (profile.total, next(self._counter), profile)
+        with self._lock:
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, entry)
+            elif entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def snapshot(self) -> List[RequestProfile]:
+        """Slowest first"""
+        with self._lock:
+            return [profile for _, _, profile in sorted(self._heap, reverse=True)]
+
+    def clear(self):
+        with self._lock:
+            self._heap = []
+
+
+_slowest = None
+_slowest_lock = threading.Lock()
+_slowest_pid = None
+
+
+def get_slowest_requests() -> SlowestRequests:
+    """Return this process's slowest-request buffer"""
+    global _slowest, _slowest_pid
+    pid = os.getpid()
+    if _slowest is None or _slowest_pid != pid:
+        with _slowest_lock:
+            if _slowest is None or _slowest_pid != pid:
+                _slowest = SlowestRequests(settings.REQUEST_PROFILING['SLOWEST'])
+                _slowest_pid = pid
+    return _slowest
+
+
+def record_backend(endpoint: str, duration: float):
+    """Attribute a backend API call to the request being profiled, if any"""
+    profile = _current.get()
+    if profile is not None:
+        profile.record_backend(endpoint, duration)
+
+
+_render_timing_installed = False
+
+
+def _install_render_timing():
+    """
+    Time top-level template renders. Only the backend's Template wrapper is
+    patched, so ``{% include %}`` and ``{% extends %}`` aren't counted twice.
+    """
+    global _render_timing_installed
+    if _render_timing_installed:
+        return
+    render = django_backend.Template.render
+
+    def timed_render(self, *args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return render(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            profile.render_time += time.perf_counter() - started
+
+    django_backend.Template.render = timed_render
+    _render_timing_installed = True
+
+
+_query_timing_installed = False
+
+
+def _install_query_timing():
+    """
+    Time every query run while a request is profiled. The cursor class is
+    patched rather than one connection, because under ASGI a sync view runs
+    its queries on an executor thread's connection, not the event loop's.
+    """
+    global _query_timing_installed
+    if _query_timing_installed:
+        return
+
+    def timed(method):
+        def timed_method(self, sql, params=None):
+            profile = _current.get()
+            if profile is None:
+                return method(self, sql, params)
+            started = time.perf_counter()
+            try:
+                return method(self, sql, params)
+            finally:
+                profile.record_query(time.perf_counter() - started)
+        return timed_method
+
+    db_utils.CursorWrapper.execute = timed(db_utils.CursorWrapper.execute)
+    db_utils.CursorWrapper.executemany = timed(db_utils.CursorWrapper.executemany)
+    _query_timing_installed = True
+
+
+class RequestProfilingMiddleware:
+    """Add a Server-Timing breakdown to every response and remember the slowest requests"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Stay async under ASGI so the SSE stream isn't adapted to sync
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        _install_query_timing()
+        _install_render_timing()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        profile, token = self._start(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.total = time.perf_counter() - started
+            _current.reset(token)
+        return self._finish(profile, response)
+
+    async def _acall(self, request):
+        profile, token = self._start(request)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profile.total = time.perf_counter() - started
+            _current.reset(token)
+        return self._finish(profile, response)
+
+    def _start(self, request):
+        profile = RequestProfile(request.method, request.get_full_path())
+        return profile, _current.set(profile)
+
+    def _finish(self, profile, response):
+        profile.status = response.status_code
+        response['Server-Timing'] = profile.server_timing()
+        get_slowest_requests().add(profile)
+        return response
@@ -0,0 +1,190 @@
+"""
+Sliding-window rate limits for the public voting API, shared by every worker.
+
+Each route limits requests per client address and per ``userIdentifier``
+(``RATE_LIMIT['ROUTES']``). Counts live in a small memory-mapped file, a
+table of ``RATE_LIMIT['SLOTS']`` slots each holding a window number and the
+counts of the current and previous window. A request is admitted while
+
+    previous * (1 - elapsed fraction of the current window) + current < limit
+
+which approximates a true sliding window without keeping timestamps. Keys
+are hashed onto two slots and the lower estimate is used (a count-min
+sketch), so unrelated keys only collide if both their slots do. A check is
+a few struct reads and writes under ``lockf`` byte-range locks on the two
+slots: microseconds, without the stats cache's file I/O. ``manage.py
+benchmark_ratelimit`` measures it.
+
+Clients are counted by ``client_address()``: ``X-Forwarded-For`` is set by
+the client, so it is only believed when the request came through one of
+``RATE_LIMIT['TRUSTED_PROXIES']``.
+"""
+import functools
+import ipaddress
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple, Union
+
+from django.conf import settings
+
+from .metrics import record_rate_limited
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+# window number, current count, previous count
+SLOT = struct.Struct('<qqq')
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class SlidingWindowLimiter:
+    """Approximate sliding-window counters in a memory-mapped file"""
+
+    def __init__(self, path: str, slots: int):
+        self.path = path
+        self.slots = slots
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * SLOT.size
+        # Only ever grow it: another worker may have it mapped
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        # lockf locks are per process; threads of one worker also take this
+        self._thread_lock = threading.Lock()
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    def _offsets(self, key: str) -> Tuple[int, int]:
+        data = key.encode()
+        first = zlib.crc32(data) % self.slots
+        second = zlib.adler32(data) % self.slots
+        if second == first:
+            second = (first + 1) % self.slots
+        return tuple(sorted((first * SLOT.size, second * SLOT.size)))
+
+    def hit(self, key: str, limit: int, window: float, now: Optional[float] = None) -> Optional[int]:
+        """Count a request for ``key``; returns None if admitted, else seconds until it would be"""
+        now = time.time() if now is None else now
+        current_window, into = divmod(now, window)
+        current_window = int(current_window)
+        offsets = self._offsets(key)
+
+        with self._thread_lock:
+            for offset in offsets:
+                self._lock(offset, fcntl.LOCK_EX if fcntl else None)
+            try:
+                slots = [self._read(offset, current_window) for offset in offsets]
+                weight = 1 - into / window
+                current, previous = min(slots, key=lambda counts: counts[1] * weight + counts[0])
+                if previous * weight + current >= limit:
+                    return _retry_after(current, previous, limit, window, into)
+                for offset, (count, prior) in zip(offsets, slots):
+                    SLOT.pack_into(self._map, offset, current_window, count + 1, prior)
+                return None
+            finally:
+                for offset in offsets:
+                    self._lock(offset, fcntl.LOCK_UN if fcntl else None)
+
+    def _read(self, offset: int, current_window: int) -> Tuple[int, int]:
+        """(current, previous) counts of a slot, rolled forward to ``current_window``"""
+        slot_window, current, previous = SLOT.unpack_from(self._map, offset)
+        if slot_window == current_window:
+            return current, previous
+        if slot_window == current_window - 1:
+            return 0, current
+        return 0, 0
+
+    def _lock(self, offset: int, operation):
+        if operation is not None:
+            fcntl.lockf(self._fd, operation, SLOT.size, offset)
+
+
+def _retry_after(current: int, previous: int, limit: int, window: float, into: float) -> int:
+    """Whole seconds until the estimate drops below ``limit`` again"""
+    if current >= limit:
+        # Next window: this one's count becomes the decaying previous count
+        wait = window - into + window * (1 - limit / current)
+    else:
+        wait = window * (1 - (limit - current) / previous) - into
+    # Strictly after: at exactly ``wait`` the estimate still equals the limit
+    return max(1, math.floor(wait) + 1)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> SlidingWindowLimiter:
+    """Return the process-wide limiter, reopened if its settings changed"""
+    global _limiter
+    config = settings.RATE_LIMIT
+    limiter = _limiter
+    if limiter is None or limiter.path != config['PATH'] or limiter.slots != config['SLOTS']:
+        with _limiter_lock:
+            if _limiter is None or _limiter.path != config['PATH'] or _limiter.slots != config['SLOTS']:
+                _limiter = SlidingWindowLimiter(config['PATH'], config['SLOTS'])
+            limiter = _limiter
+    return limiter
+
+
+@functools.lru_cache(maxsize=8)
+def _networks(proxies: Tuple[str, ...]) -> Tuple[Network, ...]:
+    return tuple(ipaddress.ip_network(proxy.strip(), strict=False) for proxy in proxies if proxy.strip())
+
+
+def _is_trusted(address: str, networks: Tuple[Network, ...]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address.strip())
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_address(request) -> Optional[str]:
+    """
+    The address to count a request against: ``REMOTE_ADDR``, or behind a
+    trusted proxy the rightmost ``X-Forwarded-For`` hop that isn't one. Hops
+    further left were added by the client and are ignored.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR')
+    networks = _networks(tuple(settings.RATE_LIMIT['TRUSTED_PROXIES']))
+    if not networks or not remote_addr or not _is_trusted(remote_addr, networks):
+        return remote_addr
+    hops = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, networks):
+            return hop
+    # Only proxies: the leftmost is as close to the client as we know
+    return hops[0] if hops else remote_addr
+
+
+def check(route: str, **values: Optional[str]) -> Optional[int]:
+    """
+    Count a request to ``route`` against its limit for each of ``values``
+    (``ip=``, ``identifier=``); returns None if admitted, else Retry-After seconds.
+    """
+    config = settings.RATE_LIMIT
+    limits: Dict[str, Tuple[int, float]] = config['ROUTES'].get(route, {})
+    if not config['ENABLED'] or not limits:
+        return None
+    limiter = get_limiter()
+    for kind, (limit, window) in limits.items():
+        value = values.get(kind)
+        if not value:
+            continue
+        retry_after = limiter.hit(f'{route}:{kind}:{value}', limit, window)
+        if retry_after is not None:
+            record_rate_limited(route, kind)
+            return retry_after
+    return None
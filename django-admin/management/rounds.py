@@ -0,0 +1,92 @@
+"""
+Voting rounds.
+
+Votes, voter aggregates, results and tally shards belong to a ``Round``.
+The newest round is the active one, and the pages, APIs and stats read only
+its rows through indexes that lead with ``round``. Resetting the votes
+opens a new round (an UPDATE and an INSERT) instead of deleting every row
+while holding the database's write lock, and the previous round stays in
+the database, archived.
+
+``purge_rounds()`` (the sync worker's ``rounds`` task, or ``manage.py
+purge_rounds``) later deletes the rows of all but the newest
+``ROUNDS['KEEP_ARCHIVED']`` archived rounds, ``ROUNDS['PURGE_BATCH_SIZE']``
+rows per transaction. A round's final results are kept in ``Round.summary``.
+"""
+import logging
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import tallies
+from .logbuffer import write_log
+from .models import Round, TallyShard, Vote, VoteResults, VoterAggregate, active_round_id
+
+logger = logging.getLogger(__name__)
+
+__all__ = ['active_round_id', 'active_round', 'open_round', 'purge_round', 'purge_rounds']
+
+# Shards first, so the compactor can't fold counts into results being deleted
+PURGE_ORDER = (TallyShard, VoteResults, VoterAggregate, Vote)
+
+
+def active_round() -> Round:
+    return Round.objects.get(pk=active_round_id())
+
+
+def open_round() -> Round:
+    """Archive the active round and start a new, empty one"""
+    with transaction.atomic():
+        previous = active_round()
+        counts = tallies.read_tallies(previous.pk)
+        now = timezone.now()
+        previous.ended_at = now
+        previous.summary = {'total_votes': sum(counts.values()), 'results': counts}
+        previous.save(update_fields=['ended_at', 'summary'])
+        return Round.objects.create(started_at=now)
+
+
+def purge_round(round_obj: Round, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """Delete an archived round's rows in short transactions; returns rows deleted per model"""
+    if round_obj.ended_at is None:
+        raise ValueError(f"Round {round_obj.pk} is active and can't be purged")
+    batch_size = batch_size or settings.ROUNDS['PURGE_BATCH_SIZE']
+
+    deleted = {}
+    for model in PURGE_ORDER:
+        deleted[model._meta.model_name] = 0
+        while True:
+            # Each batch takes the write lock only briefly, so votes keep flowing
+            with transaction.atomic():
+                ids = list(model.objects.in_round(round_obj.pk).order_by('id')
+                           .values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                deleted[model._meta.model_name] += model.objects.filter(id__in=ids).delete()[0]
+
+    round_obj.purged_at = timezone.now()
+    round_obj.save(update_fields=['purged_at'])
+    return deleted
+
+
+def purge_rounds(keep: Optional[int] = None, batch_size: Optional[int] = None,
+                 user: Optional[str] = None) -> List[int]:
+    """Purge every archived round except the newest ``keep``; returns the purged round ids"""
+    keep = settings.ROUNDS['KEEP_ARCHIVED'] if keep is None else keep
+    archived = Round.objects.filter(ended_at__isnull=False).order_by('-id')
+    kept = list(archived.values_list('pk', flat=True)[:keep]) if keep else []
+    purged = []
+    for round_obj in archived.filter(purged_at__isnull=True).exclude(pk__in=kept):
+        deleted = purge_round(round_obj, batch_size)
+        purged.append(round_obj.pk)
+        logger.info(f"Purged round {round_obj.pk}: {deleted}")
+        write_log(
+            level='INFO',
+            action_type='ADMIN_ACTION',
+            message=f"Purged archived round {round_obj.pk} ({deleted['vote']} votes)",
+            details={'action': 'purge_round', 'round': round_obj.pk, 'deleted': deleted},
+            user=user,
+        )
+    return purged
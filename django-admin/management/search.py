@@ -0,0 +1,92 @@
+"""
+Full-text search over votes and system logs.
+
+On SQLite with FTS5 the ``management_vote_fts`` and ``management_systemlog_fts``
+external-content tables (created by migration 0005 and kept in sync by
+triggers) answer searches with ranked prefix matching. Elsewhere, or when
+FTS5 is not compiled in, searches fall back to ``icontains`` filters.
+"""
+import logging
+import re
+from typing import Dict, Sequence
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, IntegerField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+# Model -> (FTS5 table, fields searched by the icontains fallback)
+SEARCH_INDEXES = {
+    'management.vote': ('management_vote_fts', ('user_identifier', 'vote_id', 'ip_address', 'name')),
+    'management.systemlog': ('management_systemlog_fts', ('message', 'user', 'details')),
+}
+
+_TERM = re.compile(r'\S+')
+_available: Dict[tuple, bool] = {}
+
+
+def fts_available(table: str, using: str = 'default') -> bool:
+    """Whether the FTS table exists on this database (checked once per process)"""
+    connection = connections[using]
+    key = (using, connection.settings_dict['NAME'], table)
+    if key not in _available:
+        if connection.vendor != 'sqlite':
+            _available[key] = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+                _available[key] = cursor.fetchone() is not None
+            if not _available[key]:
+                logger.warning(f"Full-text index {table} not found, searching with icontains")
+    return _available[key]
+
+
+def match_expression(search: str) -> str:
+    """Turn user input into an FTS5 query: every term must match as a token prefix"""
+    terms = [term.replace('"', '""') for term in _TERM.findall(search) if any(c.isalnum() for c in term)]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Filter ``queryset`` to rows matching ``text``.
+
+    Up to ``SEARCH_RANK_MAX_MATCHES`` matches (after the queryset's own
+    filters) are ordered by bm25 relevance, then newest first, and paged by
+    offset. Broader searches are ordered newest first only, which FTS5 can
+    return straight from its index. Ranking tens of thousands of matches
+    would cost more than scanning the table.
+    """
+    table, fallback_fields = SEARCH_INDEXES[queryset.model._meta.label_lower]
+    expression = match_expression(text)
+
+    if fts_available(table, queryset.db):
+        if not expression:
+            return queryset.none()
+        db_table = queryset.model._meta.db_table
+        # Join on rowid so MATCH drives the query; bm25 rank is lower for better matches.
+        # Annotations rather than extra(select=) so keyset pagination can filter on them
+        matches = queryset.extra(
+            tables=[table],
+            where=[f'"{table}".rowid = "{db_table}".id', f'"{table}" MATCH %s'],
+            params=[expression],
+        ).annotate(
+            search_rank=RawSQL(f'"{table}".rank', (), output_field=FloatField()),
+            search_rowid=RawSQL(f'"{table}".rowid', (), output_field=IntegerField()),
+        )
+        # Count with the caller's filters: a narrow search within a broad match set is still ranked
+        limit = settings.SEARCH_RANK_MAX_MATCHES
+        if matches.order_by()[:limit + 1].count() <= limit:
+            return matches.order_by('search_rank', '-search_rowid')
+        return matches.order_by('-search_rowid')
+
+    return _icontains(queryset, text, fallback_fields).order_by('-timestamp', '-id')
+
+
+def _icontains(queryset: QuerySet, text: str, fields: Sequence[str]) -> QuerySet:
+    query = Q()
+    for field in fields:
+        query |= Q(**{f'{field}__icontains': text})
+    return queryset.filter(query)
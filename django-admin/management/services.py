@@ -1,64 +1,236 @@
+import contextvars
+import os
+import time
 import requests
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any
+from urllib.parse import urlencode
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
 from django.utils import timezone
-from .models import Vote, VoteResults, SystemLog
+from django.utils.dateparse import parse_datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from . import profiling, rounds, tallies
+from .aggregates import rebuild_voter_aggregates, record_votes
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .logbuffer import write_log
+from .metrics import observe_api_request, record_synced_votes, timed_sync
+from .models import SyncStatus, Vote, VoteResults, active_round_id
+from .stats_cache import get_stats_cache
+from .teams import get_registry
 
 logger = logging.getLogger(__name__)
 
+# Stats cache entries derived from backend data, dropped after syncs and resets
+STATS_CACHE_KEYS = ('backend_results', 'backend_votes', 'dashboard_stats')
+
+# When deletions were last reconciled against the backend's full vote list
+RECONCILED_AT_KEY = 'vote_sync:reconciled_at'
+
+# Sync worker tasks that call the backend; their SyncStatus rows tell its health
+BACKEND_SYNC_TASKS = ('results', 'votes', 'devices')
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive session for backend calls.
+
+    Up to ``VOTING_API_POOL_SIZE`` connections are kept alive; calls beyond
+    that open a short-lived connection rather than wait for a free one.
+    Idempotent GETs are retried with jittered backoff after connection errors
+    and 502/503/504, never after a read timeout (that would multiply a hung
+    call's timeout); POSTs are never retried. A new session is created after
+    a fork so gunicorn workers never share sockets.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                retry = Retry(
+                    total=settings.VOTING_API_RETRIES,
+                    read=0,
+                    other=0,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset(['GET']),
+                    backoff_factor=0.1,
+                    backoff_jitter=0.1,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=settings.VOTING_API_POOL_SIZE,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session, _session_pid = session, pid
+    return _session
+
+
+_fanout_executor = None
+_fanout_pid = None
+
+
+def get_fanout_executor() -> ThreadPoolExecutor:
+    """Return the bounded per-process pool used for concurrent backend calls"""
+    global _fanout_executor, _fanout_pid
+    pid = os.getpid()
+    if _fanout_executor is None or _fanout_pid != pid:
+        with _session_lock:
+            if _fanout_executor is None or _fanout_pid != pid:
+                _fanout_executor = ThreadPoolExecutor(
+                    max_workers=settings.BACKEND_FANOUT['MAX_WORKERS'],
+                    thread_name_prefix='backend-fanout'
+                )
+                _fanout_pid = pid
+    return _fanout_executor
+
+
+def invalidate_stats_cache():
+    """Drop cached backend data and bump the data version after syncs and resets"""
+    stats_cache = get_stats_cache()
+    stats_cache.invalidate(*STATS_CACHE_KEYS)
+    stats_cache.bump_version()
+
+
+def _circuit_transitioned(previous: str, current: str):
+    # Cached stats were computed under the old state: opening must stop
+    # serving backend data as current, closing must stop serving the fallback
+    invalidate_stats_cache()
+
+
+def fetch_concurrently(calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Run independent backend calls at the same time.
+
+    Each call gets its own deadline from ``BACKEND_FANOUT['TIMEOUTS']`` (keyed
+    like ``VOTING_API_TIMEOUTS``). The result for each name is the call's
+    return value, or the exception it raised (``TimeoutError`` when it missed
+    its deadline), so callers can degrade per endpoint. Only submit leaf calls
+    here; a task that fans out again could exhaust the pool.
+    """
+    config = settings.BACKEND_FANOUT
+    results = {}
+    
+    if not config['ENABLED'] or len(calls) < 2:
+        for name, call in calls.items():
+            try:
+                results[name] = call()
+            except Exception as e:
+                results[name] = e
+        return results
+    
+    executor = get_fanout_executor()
+    started = time.monotonic()
+    # Copy the context so profiling still attributes the calls to this request
+    futures = {name: executor.submit(contextvars.copy_context().run, call) for name, call in calls.items()}
+    for name, future in futures.items():
+        deadline = config['TIMEOUTS'].get(name, config['TIMEOUTS']['default'])
+        try:
+            results[name] = future.result(timeout=max(0, deadline - (time.monotonic() - started)))
+        except FutureTimeoutError:
+            results[name] = TimeoutError(f"{name} did not finish within {deadline}s")
+        except Exception as e:
+            results[name] = e
+    return results
+
 
 class VotingAPIService:
     """Service to interact with the Express.js voting backend API"""
     
-    def __init__(self):
+    def __init__(self, log_calls: bool = True):
         self.base_url = settings.VOTING_API_BASE_URL
-        self.timeout = 30
+        # The sync worker polls every few seconds; it only logs failures
+        self.log_calls = log_calls
+        self.timeouts = settings.VOTING_API_TIMEOUTS
+        self.session = get_http_session()
+        self.breaker = CircuitBreaker('voting_backend', on_transition=_circuit_transitioned)
+    
+    def _timeout(self, name: str):
+        """(connect, read) timeout for an endpoint, falling back to the default"""
+        return tuple(self.timeouts.get(name, self.timeouts['default']))
     
     def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
-                     user: Optional[str] = None, ip_address: Optional[str] = None) -> Dict[str, Any]:
-        """Make HTTP request to the voting API with logging"""
+                     user: Optional[str] = None, ip_address: Optional[str] = None,
+                     timeout_name: str = 'default') -> Dict[str, Any]:
+        """Make HTTP request to the voting API with logging; fails fast while the circuit is open"""
         url = f"{self.base_url}{endpoint}"
+        timeout = self._timeout(timeout_name)
+        
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            observe_api_request(timeout_name, method.upper(), 'circuit_open', 0)
+            raise
         
         try:
             # Log the API call
-            SystemLog.objects.create(
-                level='INFO',
-                action_type='API_CALL',
-                message=f"{method} {endpoint}",
-                details={'url': url, 'data': data},
-                user=user,
-                ip_address=ip_address
-            )
+            if self.log_calls:
+                write_log(
+                    level='INFO',
+                    action_type='API_CALL',
+                    message=f"{method} {endpoint}",
+                    details={'url': url, 'data': data},
+                    user=user,
+                    ip_address=ip_address
+                )
             
-            if method.upper() == 'GET':
-                response = requests.get(url, timeout=self.timeout)
-            elif method.upper() == 'POST':
-                response = requests.post(url, json=data, timeout=self.timeout)
+            started = time.perf_counter()
+            status = 'error'
+            try:
+                if method.upper() == 'GET':
+                    response = self.session.get(url, timeout=timeout)
+                elif method.upper() == 'POST':
+                    response = self.session.post(url, json=data, timeout=timeout)
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+                status = str(response.status_code)
+            finally:
+                elapsed = time.perf_counter() - started
+                profiling.record_backend(timeout_name, elapsed)
+                observe_api_request(timeout_name, method.upper(), status, elapsed)
+            
+            # 4xx means the backend is up and answering; only 5xx counts against it
+            if response.status_code >= 500:
+                self.breaker.record_failure(f"HTTP {response.status_code}")
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+                self.breaker.record_success()
             
             response.raise_for_status()
             result = response.json()
             
             # Log successful response
-            SystemLog.objects.create(
-                level='SUCCESS',
-                action_type='API_CALL',
-                message=f"API call successful: {method} {endpoint}",
-                details={'status_code': response.status_code, 'response': result},
-                user=user,
-                ip_address=ip_address
-            )
+            if self.log_calls:
+                write_log(
+                    level='SUCCESS',
+                    action_type='API_CALL',
+                    message=f"API call successful: {method} {endpoint}",
+                    details={'status_code': response.status_code, 'response': result},
+                    user=user,
+                    ip_address=ip_address
+                )
             
             return result
             
         except requests.exceptions.RequestException as e:
+            if e.response is None:
+                self.breaker.record_failure(str(e))
             error_msg = f"API request failed: {method} {endpoint} - {str(e)}"
             logger.error(error_msg)
             
             # Log the error
-            SystemLog.objects.create(
+            write_log(
                 level='ERROR',
                 action_type='API_CALL',
                 message=error_msg,
@@ -71,17 +243,18 @@ class VotingAPIService:
     
     def health_check(self) -> Dict[str, Any]:
         """Check if the voting API is healthy"""
-        return self._make_request('GET', '/api/health')
+        return self._make_request('GET', '/api/health', timeout_name='health_check')
     
     def get_results(self, user: Optional[str] = None, ip_address: Optional[str] = None) -> Dict[str, Any]:
         """Get current vote results from the API"""
-        return self._make_request('GET', '/api/results', user=user, ip_address=ip_address)
+        return self._make_request('GET', '/api/results', user=user, ip_address=ip_address,
+                                  timeout_name='get_results')
     
     def get_vote_status(self, identifier: str, user: Optional[str] = None, 
                        ip_address: Optional[str] = None) -> Dict[str, Any]:
         """Check if a user has voted"""
         return self._make_request('GET', f'/api/vote-status/{identifier}', 
-                                user=user, ip_address=ip_address)
+                                user=user, ip_address=ip_address, timeout_name='get_vote_status')
     
     def submit_vote(self, user_team: str, voted_for: str, user_identifier: str,
                    user: Optional[str] = None, ip_address: Optional[str] = None) -> Dict[str, Any]:
@@ -91,75 +264,123 @@ class VotingAPIService:
             'votedFor': voted_for,
             'userIdentifier': user_identifier
         }
-        return self._make_request('POST', '/api/vote', data=data, user=user, ip_address=ip_address)
+        return self._make_request('POST', '/api/vote', data=data, user=user, ip_address=ip_address,
+                                  timeout_name='submit_vote')
     
-    def get_all_votes(self, user: Optional[str] = None, ip_address: Optional[str] = None) -> Dict[str, Any]:
-        """Get all votes (admin endpoint)"""
-        return self._make_request('GET', '/api/admin/votes', user=user, ip_address=ip_address)
+    def get_all_votes(self, user: Optional[str] = None, ip_address: Optional[str] = None,
+                      since: Optional[datetime] = None) -> Dict[str, Any]:
+        """Get all votes (admin endpoint), optionally only those at or after ``since``"""
+        endpoint = '/api/admin/votes'
+        if since:
+            endpoint = f"{endpoint}?{urlencode({'since': since.isoformat()})}"
+        return self._make_request('GET', endpoint, user=user, ip_address=ip_address,
+                                  timeout_name='get_all_votes')
     
     def reset_votes(self, user: Optional[str] = None, ip_address: Optional[str] = None) -> Dict[str, Any]:
         """Reset all votes (admin endpoint)"""
         data = {'confirm': 'RESET_ALL_VOTES'}
-        return self._make_request('POST', '/api/admin/reset', data=data, user=user, ip_address=ip_address)
+        return self._make_request('POST', '/api/admin/reset', data=data, user=user, ip_address=ip_address,
+                                  timeout_name='reset_votes')
     
     def reset_devices(self, user: Optional[str] = None, ip_address: Optional[str] = None) -> Dict[str, Any]:
         """Reset all device IDs (admin endpoint) - allows all users to vote again"""
         data = {'confirm': 'RESET_ALL_DEVICES'}
-        return self._make_request('POST', '/api/admin/reset-devices', data=data, user=user, ip_address=ip_address)
+        return self._make_request('POST', '/api/admin/reset-devices', data=data, user=user, ip_address=ip_address,
+                                  timeout_name='reset_devices')
     
     def get_device_stats(self, user: Optional[str] = None, ip_address: Optional[str] = None) -> Dict[str, Any]:
         """Get device/voter statistics (admin endpoint)"""
-        return self._make_request('GET', '/api/admin/devices', user=user, ip_address=ip_address)
+        return self._make_request('GET', '/api/admin/devices', user=user, ip_address=ip_address,
+                                  timeout_name='get_device_stats')
 
 
 class VotingDataService:
     """Service to manage voting data synchronization and local storage"""
     
-    def __init__(self):
-        self.api = VotingAPIService()
+    def __init__(self, api: Optional[VotingAPIService] = None):
+        self.api = api or VotingAPIService()
     
-    def sync_votes_from_backend(self, user: Optional[str] = None, ip_address: Optional[str] = None) -> int:
-        """Sync votes from backend API to local database"""
+    @timed_sync('votes')
+    def sync_votes_from_backend(self, user: Optional[str] = None, ip_address: Optional[str] = None,
+                                full: bool = False, log_unchanged: bool = True) -> Dict[str, int]:
+        """
+        Sync votes from backend API to local database.
+
+        By default only votes at or after the local high-water mark (newest
+        synced timestamp) are fetched and upserted in batches keyed on
+        ``vote_id``. The round is reconciled with the complete backend vote
+        list by comparing vote ids: whenever the backend returns that list
+        anyway, when the vote counts differ, and at least every
+        ``VOTE_SYNC_RECONCILE_INTERVAL`` seconds, since a deletion plus a
+        backfilled vote leaves the counts equal. The stats cache is only
+        invalidated when votes were added or deleted. New votes go into the
+        active round.
+        """
         try:
-            # Get all votes from backend
-            response = self.api.get_all_votes(user=user, ip_address=ip_address)
+            metrics = {'fetched': 0, 'inserted': 0, 'updated': 0, 'skipped': 0, 'deleted': 0}
+            round_id = active_round_id()
+            since = None if full else self._vote_high_water_mark(round_id)
+
+            response = self.api.get_all_votes(user=user, ip_address=ip_address, since=since)
             votes_data = response.get('votes', [])
-            
-            # Clear existing votes and sync new ones
-            Vote.objects.all().delete()
-            
-            synced_count = 0
+            backend_total = response.get('totalVotes', len(votes_data))
+            # Backends that ignore ``since`` (the Express server) return every vote
+            is_full_list = response.get('since') is None
+            metrics['fetched'] = len(votes_data)
+
+            new_votes = []
             for vote_data in votes_data:
-                # Map backend data to our model
-                vote = Vote.objects.create(
-                    vote_id=vote_data.get('id', ''),
-                    user_team=self._map_team_name_to_id(vote_data.get('userTeam', '')),
-                    voted_for=self._map_team_name_to_id(vote_data.get('votedFor', '')),
-                    timestamp=vote_data.get('timestamp', timezone.now()),
-                    ip_address=vote_data.get('ipAddress'),
-                    user_identifier=f"backend-{vote_data.get('id', '')[:8]}",  # Placeholder
-                    name=vote_data.get('name'),  # Include name field from backend
-                    synced_with_backend=True
-                )
-                synced_count += 1
-            
+                vote = self._vote_from_backend(vote_data, round_id)
+                if not vote.vote_id or (since and vote.timestamp < since):
+                    metrics['skipped'] += 1
+                else:
+                    new_votes.append(vote)
+
+            self._upsert_votes(new_votes, metrics)
+
+            reconcile = is_full_list or since is None or self._reconcile_due()
+            if not reconcile:
+                local_total = Vote.objects.in_round(round_id).filter(synced_with_backend=True).count()
+                reconcile = local_total != backend_total
+            if reconcile:
+                if not is_full_list:
+                    response = self.api.get_all_votes(user=user, ip_address=ip_address)
+                    votes_data = response.get('votes', [])
+                    metrics['fetched'] += len(votes_data)
+                self._reconcile_votes(votes_data, round_id, metrics)
+                get_stats_cache().cache.set(RECONCILED_AT_KEY, time.time(), None)
+
+            synced_count = metrics['inserted'] + metrics['updated']
+            # Backend votes are immutable, so re-fetched votes change nothing
+            changed = metrics['inserted'] or metrics['deleted']
+            if changed:
+                self.invalidate_stats_cache()
+
             # Log sync operation
-            SystemLog.objects.create(
-                level='SUCCESS',
-                action_type='VOTE_SYNC',
-                message=f"Successfully synced {synced_count} votes from backend",
-                details={'synced_count': synced_count, 'total_backend_votes': len(votes_data)},
-                user=user,
-                ip_address=ip_address
-            )
+            if changed or log_unchanged:
+                write_log(
+                    level='SUCCESS',
+                    action_type='VOTE_SYNC',
+                    message=f"Successfully synced {synced_count} votes from backend",
+                    details={
+                        'synced_count': synced_count,
+                        'total_backend_votes': backend_total,
+                        'mode': 'full' if since is None else 'incremental',
+                        'high_water_mark': since.isoformat() if since else None,
+                        **metrics
+                    },
+                    user=user,
+                    ip_address=ip_address
+                )
             
-            return synced_count
+            record_synced_votes(metrics)
+            return metrics
             
         except Exception as e:
             error_msg = f"Failed to sync votes from backend: {str(e)}"
             logger.error(error_msg)
             
-            SystemLog.objects.create(
+            write_log(
                 level='ERROR',
                 action_type='VOTE_SYNC',
                 message=error_msg,
@@ -170,37 +391,132 @@ class VotingDataService:
             
             raise Exception(error_msg)
     
-    def sync_results_from_backend(self, user: Optional[str] = None, ip_address: Optional[str] = None) -> int:
-        """Sync vote results from backend API to local database"""
+    def _reconcile_due(self) -> bool:
+        reconciled_at = get_stats_cache().cache.get(RECONCILED_AT_KEY)
+        return reconciled_at is None or time.time() - reconciled_at >= settings.VOTE_SYNC_RECONCILE_INTERVAL
+
+    def _vote_high_water_mark(self, round_id: int):
+        """Timestamp of the round's newest vote already synced from the backend"""
+        return (Vote.objects.in_round(round_id).filter(synced_with_backend=True)
+                .order_by('-timestamp')
+                .values_list('timestamp', flat=True)
+                .first())
+    
+    def _vote_from_backend(self, vote_data: Dict[str, Any], round_id: int) -> Vote:
+        """Map backend vote data to an unsaved Vote"""
+        vote_id = vote_data.get('id', '')
+        timestamp = vote_data.get('timestamp')
+        teams = get_registry()
+        return Vote(
+            round_id=round_id,
+            vote_id=vote_id,
+            user_team=teams.id_for(vote_data.get('userTeam', '')),
+            voted_for=teams.id_for(vote_data.get('votedFor', '')),
+            timestamp=(parse_datetime(timestamp) if isinstance(timestamp, str) else timestamp) or timezone.now(),
+            ip_address=vote_data.get('ipAddress'),
+            user_identifier=f"backend-{vote_id[:8]}",  # Placeholder
+            name=(vote_data.get('name') or '').strip() or None,  # Include name field from backend
+            synced_with_backend=True
+        )
+    
+    def _upsert_votes(self, votes: List[Vote], metrics: Dict[str, int]):
+        """Insert or update votes in batched transactions keyed on vote_id"""
+        batch_size = settings.VOTE_SYNC_BATCH_SIZE
+        now = timezone.now()
+        for start in range(0, len(votes), batch_size):
+            batch = votes[start:start + batch_size]
+            for vote in batch:
+                # bulk_create skips auto_now/auto_now_add handling on conflict updates
+                vote.created_at = vote.updated_at = now
+            with transaction.atomic():
+                existing = set(
+                    Vote.objects.filter(vote_id__in=[vote.vote_id for vote in batch])
+                    .values_list('vote_id', flat=True)
+                )
+                Vote.objects.bulk_create(
+                    batch,
+                    update_conflicts=True,
+                    unique_fields=['vote_id'],
+                    update_fields=['user_team', 'voted_for', 'timestamp', 'ip_address', 'name',
+                                   'synced_with_backend', 'updated_at'],
+                )
+                # Backend votes are immutable, so only new rows change the voter aggregates
+                record_votes(vote for vote in batch if vote.vote_id not in existing)
+            metrics['updated'] += len(existing)
+            metrics['inserted'] += len(batch) - len(existing)
+    
+    def _reconcile_votes(self, votes_data: List[Dict[str, Any]], round_id: int, metrics: Dict[str, int]):
+        """
+        Match the round's synced votes to the backend's full vote list by id:
+        delete the ones it no longer has and insert the ones missing locally
+        (e.g. backfilled with a timestamp before the high-water mark).
+        """
+        backend_ids = {vote_data.get('id') for vote_data in votes_data}
+        local_ids = set(Vote.objects.in_round(round_id).filter(synced_with_backend=True)
+                        .values_list('vote_id', flat=True).iterator())
+        stale_ids = [vote_id for vote_id in local_ids if vote_id not in backend_ids]
+
+        batch_size = settings.VOTE_SYNC_BATCH_SIZE
+        for start in range(0, len(stale_ids), batch_size):
+            with transaction.atomic():
+                stale = Vote.objects.filter(vote_id__in=stale_ids[start:start + batch_size])
+                names = set(stale.values_list('name', flat=True))
+                metrics['deleted'] += stale.delete()[0]
+                rebuild_voter_aggregates(names, round_id)
+
+        self._upsert_votes([self._vote_from_backend(vote_data, round_id) for vote_data in votes_data
+                            if vote_data.get('id') and vote_data['id'] not in local_ids], metrics)
+    
+    @timed_sync('results')
+    def sync_results_from_backend(self, user: Optional[str] = None, ip_address: Optional[str] = None,
+                                  log_unchanged: bool = True) -> int:
+        """Sync vote results from backend API to local database (rewritten only when they changed)"""
         try:
             # Get results from backend
             response = self.api.get_results(user=user, ip_address=ip_address)
             results_data = response.get('results', [])
             total_votes = response.get('totalVotes', 0)
-            
-            # Clear existing results and sync new ones
-            VoteResults.objects.all().delete()
-            
-            synced_count = 0
-            for result_data in results_data:
-                result = VoteResults.objects.create(
-                    team_id=result_data.get('teamId', ''),
-                    team_name=result_data.get('teamName', ''),
-                    vote_count=result_data.get('votes', 0),
-                    percentage=result_data.get('percentage', 0.0),
-                    total_votes=total_votes
-                )
-                synced_count += 1
+            rows = sorted(
+                (result_data.get('teamId', ''), result_data.get('teamName', ''), result_data.get('votes', 0),
+                 float(result_data.get('percentage', 0.0)), total_votes)
+                for result_data in results_data
+            )
+            synced_count = len(rows)
+            
+            # Clear existing results and sync new ones, in one transaction so
+            # concurrent syncs can't interleave and collide on team_id. The
+            # backend's snapshot replaces any locally counted pending votes.
+            with transaction.atomic():
+                round_id = active_round_id()
+                existing = list(VoteResults.objects.in_round(round_id).order_by('team_id').values_list(
+                    'team_id', 'team_name', 'vote_count', 'percentage', 'total_votes'))
+                changed = existing != rows or bool(tallies.pending(round_id))
+                if changed:
+                    tallies.discard_pending(round_id)
+                    VoteResults.objects.in_round(round_id).delete()
+                    for team_id, team_name, vote_count, percentage, total in rows:
+                        VoteResults.objects.create(
+                            round_id=round_id,
+                            team_id=team_id,
+                            team_name=team_name,
+                            vote_count=vote_count,
+                            percentage=percentage,
+                            total_votes=total
+                        )
+            
+            if changed:
+                self.invalidate_stats_cache()
             
             # Log sync operation
-            SystemLog.objects.create(
-                level='SUCCESS',
-                action_type='RESULTS_SYNC',
-                message=f"Successfully synced results for {synced_count} teams",
-                details={'synced_count': synced_count, 'total_votes': total_votes},
-                user=user,
-                ip_address=ip_address
-            )
+            if changed or log_unchanged:
+                write_log(
+                    level='SUCCESS',
+                    action_type='RESULTS_SYNC',
+                    message=f"Successfully synced results for {synced_count} teams",
+                    details={'synced_count': synced_count, 'total_votes': total_votes, 'changed': changed},
+                    user=user,
+                    ip_address=ip_address
+                )
             
             return synced_count
             
@@ -208,7 +524,7 @@ class VotingDataService:
             error_msg = f"Failed to sync results from backend: {str(e)}"
             logger.error(error_msg)
             
-            SystemLog.objects.create(
+            write_log(
                 level='ERROR',
                 action_type='RESULTS_SYNC',
                 message=error_msg,
@@ -219,79 +535,152 @@ class VotingDataService:
             
             raise Exception(error_msg)
     
-    def _map_team_name_to_id(self, team_name: str) -> str:
-        """Map team display name back to team ID"""
-        if not team_name:
-            return ''
-            
-        # If it's already a team ID, return as is
-        valid_team_ids = ['team-a', 'team-b', 'team-c', 'team-d']
-        if team_name in valid_team_ids:
-            return team_name
-            
-        # Map display names to team IDs
-        team_mapping = {
-            'Team 01': 'team-a',
-            'Team 02': 'team-b',
-            'Team 03': 'team-c',
-            'Team 04': 'team-d',
-        }
-        return team_mapping.get(team_name, team_name.lower().replace(' ', '-'))
+    def get_backend_results(self) -> Dict[str, Any]:
+        """Get results from the backend through the shared stats cache"""
+        return get_stats_cache().get_or_compute('backend_results', self.api.get_results)
+    
+    def get_backend_votes(self) -> Dict[str, Any]:
+        """Get all votes from the backend through the shared stats cache"""
+        return get_stats_cache().get_or_compute('backend_votes', self.api.get_all_votes)
+    
+    def invalidate_stats_cache(self):
+        """Drop cached backend data after syncs and resets"""
+        invalidate_stats_cache()
     
     def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Get dashboard statistics"""
-        try:
-            # Try to get fresh data from backend
-            results_response = self.api.get_results()
-            votes_response = self.api.get_all_votes()
+        """Get dashboard statistics (cached, see ``STATS_CACHE_TTL``)"""
+        return get_stats_cache().get_or_compute('dashboard_stats', self._compute_versioned_dashboard_stats)
+    
+    def _compute_versioned_dashboard_stats(self) -> Dict[str, Any]:
+        stats = self._compute_dashboard_stats()
+        # Votes cast directly on the backend only show up here, so a changed
+        # recompute must change the data version too
+        get_stats_cache().bump_version_if_changed(
+            'dashboard_stats', {key: value for key, value in stats.items() if key != 'last_updated'}
+        )
+        return stats
+    
+    def _compute_dashboard_stats(self) -> Dict[str, Any]:
+        if settings.SYNC_WORKER['LOCAL_READS']:
+            # The sync worker keeps the local tables current; never wait on the backend
+            return self._local_dashboard_stats()
+        
+        # Fetch results and votes from the backend at the same time
+        responses = fetch_concurrently({
+            'get_results': self.get_backend_results,
+            'get_all_votes': self.get_backend_votes,
+        })
+        results_response = responses['get_results']
+        votes_response = responses['get_all_votes']
+        
+        if not isinstance(results_response, Exception):
+            if isinstance(votes_response, Exception):
+                # Results are enough for the headline numbers; count voters locally
+                logger.warning(f"Backend votes unavailable, using local voter count: {str(votes_response)}")
+                unique_voters = Vote.objects.in_round().values('user_identifier').distinct().count()
+            else:
+                unique_voters = votes_response.get('uniqueVoters', 0)
             
             return {
                 'total_votes': results_response.get('totalVotes', 0),
-                'unique_voters': votes_response.get('uniqueVoters', 0),
+                'unique_voters': unique_voters,
                 'results': results_response.get('results', []),
                 'last_updated': timezone.now(),
-                'backend_connected': True
+                'backend_connected': True,
+                'stale': False,
+                'circuit': self.api.breaker.snapshot(),
             }
+        
+        else:
+            # Fallback to the last synced local data if the backend is unavailable
+            # (immediately, without a request, while the circuit is open)
+            logger.warning(f"Backend unavailable, using local data: {str(results_response)}")
             
-        except Exception as e:
-            # Fallback to local data if backend is unavailable
-            logger.warning(f"Backend unavailable, using local data: {str(e)}")
-            
-            local_results = VoteResults.objects.all()
-            total_votes = local_results.first().total_votes if local_results.exists() else 0
-            
-            return {
-                'total_votes': total_votes,
-                'unique_voters': Vote.objects.values('user_identifier').distinct().count(),
-                'results': [
-                    {
-                        'teamId': result.team_id,
-                        'teamName': result.team_name,
-                        'votes': result.vote_count,
-                        'percentage': result.percentage
-                    }
-                    for result in local_results
-                ],
-                'last_updated': local_results.first().last_updated if local_results.exists() else None,
-                'backend_connected': False
-            }
+            return self._local_dashboard_stats(backend_connected=False)
+    
+    def _local_dashboard_stats(self, backend_connected: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Dashboard statistics from the local tables only. Connectivity comes
+        from the sync worker's last runs unless ``backend_connected`` is given.
+        """
+        results, total_votes = tallies.current_results()
+        statuses = {status.task: status for status in SyncStatus.objects.all()}
+        
+        devices = statuses.get('devices')
+        if devices and devices.data and 'totalUniqueDevices' in devices.data:
+            unique_voters = devices.data['totalUniqueDevices']
+        else:
+            unique_voters = Vote.objects.in_round().values('user_identifier').distinct().count()
+        
+        if backend_connected is None:
+            health = self._local_backend_health(
+                status for task, status in statuses.items() if task in BACKEND_SYNC_TASKS
+            )
+            backend_connected, stale = health['backend_connected'], health['stale']
+        else:
+            stale = not backend_connected
+        
+        results_status = statuses.get('results')
+        if results_status and results_status.last_success_at:
+            last_updated = results_status.last_success_at
+        else:
+            last_updated = VoteResults.objects.in_round().aggregate(latest=Max('last_updated'))['latest']
+        
+        return {
+            'total_votes': total_votes,
+            'unique_voters': unique_voters,
+            'results': results,
+            'last_updated': last_updated,
+            'backend_connected': backend_connected,
+            'stale': stale,
+            'circuit': self.api.breaker.snapshot(),
+        }
+    
+    def get_backend_health(self) -> Dict[str, Any]:
+        """Backend health as last seen by the sync worker, read from the local table"""
+        return self._local_backend_health(SyncStatus.objects.filter(task__in=BACKEND_SYNC_TASKS))
+    
+    def _local_backend_health(self, statuses) -> Dict[str, Any]:
+        statuses = [status for status in statuses if status.last_attempt_at]
+        latest = max(statuses, key=lambda status: status.last_attempt_at, default=None)
+        successes = [status.last_success_at for status in statuses if status.last_success_at]
+        # No task has run for a while: the worker is down and the data is stale
+        worker_running = bool(latest) and (
+            timezone.now() - latest.last_attempt_at
+        ).total_seconds() < settings.SYNC_WORKER['STALE_AFTER']
+        return {
+            'backend_connected': worker_running and latest.consecutive_failures == 0,
+            'stale': not worker_running or latest.consecutive_failures > 0,
+            'sync_worker_running': worker_running,
+            'last_checked': latest.last_attempt_at if latest else None,
+            'last_success': max(successes, default=None),
+            'error': (latest.last_error or None) if latest else None,
+            'tasks': {
+                status.task: {
+                    'last_success_at': status.last_success_at,
+                    'consecutive_failures': status.consecutive_failures,
+                    'next_run_at': status.next_run_at,
+                }
+                for status in statuses
+            },
+        }
     
     def reset_all_data(self, user: Optional[str] = None, ip_address: Optional[str] = None) -> bool:
-        """Reset all voting data both locally and on backend"""
+        """Reset all voting data on the backend and start a new local round (the old one is archived)"""
         try:
             # Reset backend data
             self.api.reset_votes(user=user, ip_address=ip_address)
             
-            # Reset local data
-            Vote.objects.all().delete()
-            VoteResults.objects.all().delete()
+            # Reset local data: the previous round's rows are purged later, in batches
+            new_round = rounds.open_round()
+            self.invalidate_stats_cache()
             
             # Log the reset action
-            SystemLog.objects.create(
+            write_log(
                 level='WARNING',
                 action_type='ADMIN_ACTION',
                 message="All voting data has been reset",
-                details={'action': 'reset_all_data'},
+                details={'action': 'reset_all_data', 'round': new_round.pk},
                 user=user,
                 ip_address=ip_address
             )
@@ -302,7 +691,7 @@ class VotingDataService:
             error_msg = f"Failed to reset voting data: {str(e)}"
             logger.error(error_msg)
             
-            SystemLog.objects.create(
+            write_log(
                 level='ERROR',
                 action_type='ADMIN_ACTION',
                 message=error_msg,
@@ -318,9 +707,10 @@ class VotingDataService:
         try:
             # Reset device IDs on backend
             response = self.api.reset_devices(user=user, ip_address=ip_address)
+            self.invalidate_stats_cache()
             
             # Log the reset action
-            SystemLog.objects.create(
+            write_log(
                 level='WARNING',
                 action_type='ADMIN_ACTION',
                 message=f"All device IDs have been reset. {response.get('previousVoterCount', 0)} users can now vote again.",
@@ -335,7 +725,7 @@ class VotingDataService:
             error_msg = f"Failed to reset device IDs: {str(e)}"
             logger.error(error_msg)
             
-            SystemLog.objects.create(
+            write_log(
                 level='ERROR',
                 action_type='ADMIN_ACTION',
                 message=error_msg,
@@ -347,11 +737,18 @@ class VotingDataService:
             return False
     
     def get_device_statistics(self, user: Optional[str] = None, ip_address: Optional[str] = None) -> Dict[str, Any]:
-        """Get device/voter statistics from backend"""
+        """Get device/voter statistics from backend (from the sync worker's copy with local reads on)"""
+        if settings.SYNC_WORKER['LOCAL_READS']:
+            devices = SyncStatus.objects.filter(task='devices').first()
+            if devices and devices.data:
+                return devices.data
+            return {'totalUniqueDevices': 0, 'totalVotes': 0, 'devicesWithVotes': [],
+                    'error': 'Device statistics have not been synced yet'}
+        
         try:
             response = self.api.get_device_stats(user=user, ip_address=ip_address)
             
-            SystemLog.objects.create(
+            write_log(
                 level='INFO',
                 action_type='API_CALL',
                 message="Retrieved device statistics",
@@ -366,7 +763,7 @@ class VotingDataService:
             error_msg = f"Failed to get device statistics: {str(e)}"
             logger.error(error_msg)
             
-            SystemLog.objects.create(
+            write_log(
                 level='ERROR',
                 action_type='API_CALL',
                 message=error_msg,
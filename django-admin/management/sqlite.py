@@ -0,0 +1,77 @@
+"""
+SQLite connection tuning.
+
+Every new SQLite connection runs the PRAGMAs of ``SQLITE_PROFILE``, with
+``SQLITE_PRAGMAS`` overriding single values:
+
+* ``tuned``   - WAL journal, so readers never block the writer nor it them;
+  ``synchronous=NORMAL`` (safe with WAL, may lose the last commits on power
+  loss, never corrupts); a busy timeout so writers queue for the lock;
+  a larger page cache, memory-mapped reads and in-memory temp tables
+* ``default`` - SQLite's own settings, kept for comparison
+
+``journal_mode=WAL`` is stored in the database file, so switching back to
+``default`` leaves an existing database in WAL mode. Together with
+``CONN_MAX_AGE`` the PRAGMAs run once per connection rather than once per
+request. ``manage.py benchmark_sqlite`` compares the profiles.
+"""
+import logging
+import re
+from typing import Dict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+PROFILES = {
+    'default': {},
+    'tuned': {
+        # First, so switching the journal mode waits for other connections
+        'busy_timeout': 5000,               # ms
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -32000,               # negative: KiB, so ~32 MB per connection
+        'mmap_size': 256 * 1024 * 1024,     # bytes
+        'temp_store': 'MEMORY',
+    },
+}
+
+_NAME = re.compile(r'^[a-z_]+$')
+_VALUE = re.compile(r'^(-?\d+|[A-Za-z_]+)$')
+
+
+def get_pragmas(profile: str = None) -> Dict[str, str]:
+    """The PRAGMAs for ``profile`` (default ``SQLITE_PROFILE``) with ``SQLITE_PRAGMAS`` applied"""
+    profile = profile or settings.SQLITE_PROFILE
+    if profile not in PROFILES:
+        raise ImproperlyConfigured(f"Unknown SQLITE_PROFILE '{profile}', expected one of: {', '.join(PROFILES)}")
+    pragmas = {**PROFILES[profile], **settings.SQLITE_PRAGMAS}
+    for name, value in pragmas.items():
+        # Interpolated into the statement, so only plain names and numbers
+        if not _NAME.match(name) or not _VALUE.match(str(value)):
+            raise ImproperlyConfigured(f"Invalid SQLite PRAGMA {name}={value!r}")
+    return {name: str(value) for name, value in pragmas.items()}
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """connection_created receiver"""
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in get_pragmas().items():
+        # The raw connection: no execute wrappers or debug query log for setup
+        result = connection.connection.execute(f'PRAGMA {name} = {value}').fetchone()
+        if name == 'journal_mode' and result and result[0].lower() != value.lower():
+            # In-memory databases (the test database) have no WAL
+            logger.debug(f"SQLite journal_mode is {result[0]}, not {value}")
+
+
+def current_pragmas(connection, names=None) -> Dict[str, str]:
+    """Read back PRAGMA values from a Django connection"""
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names or PROFILES['tuned']:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = str(row[0]) if row else None
+    return values
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from .metrics import record_cache_lookup
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightCache:
+    """
+    TTL cache for backend data shared by every worker process.
+
+    Values live in the ``STATS_CACHE_ALIAS`` Django cache (file based by
+    default, so all gunicorn workers see the same entries). Entries are fresh
+    for ``STATS_CACHE_TTL`` seconds and may then be served stale for
+    ``STATS_CACHE_STALE_TTL`` more seconds while one background refresh runs.
+    Concurrent misses for the same key, in any thread or process, wait on a
+    lock so only one of them calls the backend.
+
+    The cache also holds the shared data version used for ETags: a number
+    that only grows, bumped whenever votes, results or cached backend data
+    change. It starts from the current time in microseconds, so it keeps
+    growing even if the cache is wiped.
+    """
+
+    VERSION_KEY = 'data_version'
+
+    def __init__(self, alias: str = None, ttl: float = None, stale_ttl: float = None, lock_dir: str = None):
+        self.alias = alias or settings.STATS_CACHE_ALIAS
+        self.ttl = settings.STATS_CACHE_TTL if ttl is None else ttl
+        self.stale_ttl = settings.STATS_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        self.lock_dir = lock_dir or settings.STATS_CACHE_LOCK_DIR
+        self._thread_locks = {}
+        self._thread_locks_guard = threading.Lock()
+        self._refreshing = set()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        entry = self.cache.get(key)
+        now = time.time()
+        if entry and now < entry['fresh_until']:
+            record_cache_lookup(key, 'hit')
+            return entry['value']
+
+        if entry and now < entry['stale_until']:
+            record_cache_lookup(key, 'stale')
+            self._revalidate_in_background(key, compute)
+            return entry['value']
+
+        with self._lock(key):
+            # Another thread or worker may have filled the entry while we waited
+            entry = self.cache.get(key)
+            if entry and time.time() < entry['fresh_until']:
+                record_cache_lookup(key, 'coalesced')
+                return entry['value']
+            record_cache_lookup(key, 'miss')
+            return self._compute_and_store(key, compute)
+
+    def invalidate(self, *keys: str):
+        """Drop entries and stop in-flight refreshes from storing older data"""
+        for key in keys:
+            self.cache.set(f'{key}:generation', uuid.uuid4().hex, timeout=None)
+            self.cache.delete(key)
+
+    def is_fresh(self, key: str) -> bool:
+        entry = self.cache.get(key)
+        return bool(entry) and time.time() < entry['fresh_until']
+
+    def version(self) -> int:
+        """Current data version, shared by every worker"""
+        value = self.cache.get(self.VERSION_KEY)
+        if value is None:
+            self.cache.add(self.VERSION_KEY, int(time.time() * 1e6), timeout=None)
+            value = self.cache.get(self.VERSION_KEY)
+        return value
+
+    def bump_version(self) -> int:
+        with self._lock(self.VERSION_KEY):
+            value = max((self.cache.get(self.VERSION_KEY) or 0) + 1, int(time.time() * 1e6))
+            self.cache.set(self.VERSION_KEY, value, timeout=None)
+        return value
+
+    def bump_version_if_changed(self, key: str, value: Any):
+        """Bump the data version when ``value`` differs from the last value seen for ``key``"""
+        digest = hashlib.sha1(json.dumps(value, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+        if self.cache.get(f'{key}:digest') != digest:
+            self.cache.set(f'{key}:digest', digest, timeout=None)
+            self.bump_version()
+
+    def _compute_and_store(self, key, compute):
+        generation = self.cache.get(f'{key}:generation')
+        value = compute()
+        if self.cache.get(f'{key}:generation') == generation:
+            now = time.time()
+            self.cache.set(key, {
+                'value': value,
+                'fresh_until': now + self.ttl,
+                'stale_until': now + self.ttl + self.stale_ttl,
+            }, timeout=self.ttl + self.stale_ttl)
+        return value
+
+    def _revalidate_in_background(self, key, compute):
+        with self._thread_locks_guard:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._lock(key, blocking=False) as acquired:
+                    entry = self.cache.get(key)
+                    if acquired and not (entry and time.time() < entry['fresh_until']):
+                        self._compute_and_store(key, compute)
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed: {str(e)}")
+            finally:
+                with self._thread_locks_guard:
+                    self._refreshing.discard(key)
+                connection.close()
+
+        threading.Thread(target=refresh, name=f'stats-cache-{key}', daemon=True).start()
+
+    @contextmanager
+    def _lock(self, key, blocking=True):
+        """Per-key lock held across threads (threading.Lock) and processes (flock)"""
+        with self._thread_locks_guard:
+            thread_lock = self._thread_locks.setdefault(key, threading.Lock())
+        if not thread_lock.acquire(blocking):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            os.makedirs(self.lock_dir, exist_ok=True)
+            with open(os.path.join(self.lock_dir, f'{key}.lock'), 'a') as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            thread_lock.release()
+
+
+_stats_cache = None
+_stats_cache_lock = threading.Lock()
+
+
+def get_stats_cache() -> SingleFlightCache:
+    """Return the process-wide stats cache"""
+    global _stats_cache
+    if _stats_cache is None:
+        with _stats_cache_lock:
+            if _stats_cache is None:
+                _stats_cache = SingleFlightCache()
+    return _stats_cache
@@ -0,0 +1,226 @@
+"""
+Local stub of the Express voting API (server/server.js) for benchmarks.
+
+Serves the same JSON contract from a threaded HTTP/1.1 server with keep-alive,
+a configurable number of pre-generated votes and injectable per-endpoint
+latency, so backend-bound code paths can be measured without the real server.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+TEAM_NAMES = {
+    'team-a': 'Team 01',
+    'team-b': 'Team 02',
+    'team-c': 'Team 03',
+    'team-d': 'Team 04',
+}
+
+
+def _iso(dt):
+    return dt.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class StubVotingBackend:
+    """
+    In-memory voting backend listening on 127.0.0.1.
+
+    ``latency`` maps an endpoint key (``health``, ``results``, ``votes``,
+    ``vote``, ``vote_status``, ``devices``, ``reset``, ``reset_devices``) to
+    seconds of delay injected before responding.
+    """
+
+    def __init__(self, votes: int = 0, latency: Optional[Dict[str, float]] = None, port: int = 0):
+        self.latency = dict(latency or {})
+        self.lock = threading.Lock()
+        self.votes = []
+        self.voters = set()
+        self.requests = 0
+        self.connections = 0
+        self._seed(votes)
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'StubVotingBackend':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _seed(self, count: int):
+        rng = random.Random(42)
+        teams = list(TEAM_NAMES)
+        started = datetime.now(timezone.utc) - timedelta(seconds=count)
+        for i in range(count):
+            user_team, voted_for = rng.sample(teams, 2)
+            self._add_vote(user_team, voted_for, f'seed-{i}', started + timedelta(seconds=i),
+                           name=f'Voter {i}' if i % 3 else None)
+
+    def _add_vote(self, user_team, voted_for, identifier, timestamp=None, name=None):
+        vote = {
+            'id': str(uuid.uuid4()),
+            'userTeam': user_team,
+            'votedFor': voted_for,
+            'timestamp': timestamp or datetime.now(timezone.utc),
+            'ipAddress': '127.0.0.1',
+            'name': name,
+        }
+        self.votes.append(vote)
+        self.voters.add(identifier)
+        return vote
+
+    def _results(self):
+        counts = {team_id: 0 for team_id in TEAM_NAMES}
+        for vote in self.votes:
+            counts[vote['votedFor']] += 1
+        return counts
+
+    # Request handling
+
+    def _route(self, method, path, body):
+        if method == 'GET' and path == '/api/health':
+            return 'health', 200, {'status': 'OK', 'timestamp': _iso(datetime.now(timezone.utc))}
+
+        if method == 'GET' and path == '/api/results':
+            with self.lock:
+                counts = self._results()
+                total = len(self.votes)
+            return 'results', 200, {
+                'results': [
+                    {'teamId': team_id, 'teamName': TEAM_NAMES[team_id], 'votes': count,
+                     'percentage': int(count * 100 / total + 0.5) if total else 0}
+                    for team_id, count in counts.items()
+                ],
+                'totalVotes': total,
+                'timestamp': _iso(datetime.now(timezone.utc)),
+            }
+
+        if method == 'GET' and path.startswith('/api/vote-status/'):
+            identifier = path.rsplit('/', 1)[-1]
+            return 'vote_status', 200, {'hasVoted': identifier in self.voters, 'identifier': identifier,
+                                        'lastDeviceResetTimestamp': None}
+
+        if method == 'POST' and path == '/api/vote':
+            user_team, voted_for = body.get('userTeam'), body.get('votedFor')
+            identifier = body.get('userIdentifier')
+            if user_team not in TEAM_NAMES or voted_for not in TEAM_NAMES or not identifier:
+                return 'vote', 400, {'error': 'Invalid vote'}
+            if user_team == voted_for:
+                return 'vote', 400, {'error': 'Cannot vote for your own team'}
+            with self.lock:
+                if identifier in self.voters:
+                    return 'vote', 409, {'error': 'User has already voted', 'hasVoted': True}
+                vote = self._add_vote(user_team, voted_for, identifier, name=body.get('name'))
+                counts = self._results()
+                total = len(self.votes)
+            return 'vote', 201, {
+                'success': True,
+                'message': 'Vote recorded successfully',
+                'vote': {'id': vote['id'], 'userTeam': TEAM_NAMES[user_team],
+                         'votedFor': TEAM_NAMES[voted_for], 'timestamp': _iso(vote['timestamp'])},
+                'results': counts,
+                'totalVotes': total,
+            }
+
+        if method == 'GET' and path == '/api/admin/votes':
+            with self.lock:
+                votes = list(self.votes)
+                voters = len(self.voters)
+            return 'votes', 200, {
+                'votes': [
+                    {'id': v['id'], 'userTeam': TEAM_NAMES[v['userTeam']], 'votedFor': TEAM_NAMES[v['votedFor']],
+                     'timestamp': _iso(v['timestamp']), 'ipAddress': v['ipAddress'], 'name': v['name']}
+                    for v in votes
+                ],
+                'totalVotes': len(votes),
+                'uniqueVoters': voters,
+            }
+
+        if method == 'GET' and path == '/api/admin/devices':
+            with self.lock:
+                voters = sorted(self.voters)
+            return 'devices', 200, {'totalUniqueDevices': len(voters), 'totalVotes': len(self.votes),
+                                    'devicesWithVotes': voters,
+                                    'timestamp': _iso(datetime.now(timezone.utc))}
+
+        if method == 'POST' and path == '/api/admin/reset':
+            with self.lock:
+                self.votes, self.voters = [], set()
+            return 'reset', 200, {'success': True, 'message': 'All votes have been reset'}
+
+        if method == 'POST' and path == '/api/admin/reset-devices':
+            with self.lock:
+                previous = len(self.voters)
+                self.voters = set()
+            return 'reset_devices', 200, {'success': True, 'previousVoterCount': previous,
+                                          'resetTimestamp': _iso(datetime.now(timezone.utc))}
+
+        return None, 404, {'error': 'Endpoint not found', 'path': path}
+
+    def _handler_class(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are separate writes; avoid Nagle/delayed-ACK stalls on keep-alive
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with backend.lock:
+                    backend.connections += 1
+
+            def _handle(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {}
+
+                path = self.path.split('?', 1)[0]
+                key, status, payload = backend._route(method, path, body)
+                delay = backend.latency.get(key, 0)
+                if delay:
+                    time.sleep(delay)
+
+                with backend.lock:
+                    backend.requests += 1
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,175 @@
+"""
+Background sync from the voting backend (``manage.py run_sync_worker``).
+
+Each task runs on its own interval from ``SYNC_WORKER['INTERVALS']``:
+
+* ``results`` - current tallies into ``VoteResults``
+* ``votes``   - new votes into ``Vote`` (incremental, see ``sync_votes_from_backend``)
+* ``devices`` - device statistics, kept in ``SyncStatus.data``
+* ``tallies`` - folds locally counted votes into ``VoteResults`` (no backend call)
+* ``rounds``  - purges archived voting rounds (no backend call)
+
+Syncs invalidate the stats cache, bumping the shared data version, only when
+local data changed. Every run is recorded in ``SyncStatus``, which is where
+the views read backend health from when ``SYNC_WORKER['LOCAL_READS']`` is on.
+A failing task backs off exponentially with jitter, and while the circuit
+breaker is open it waits for the breaker's retry time. An flock on
+``SYNC_WORKER['LOCK_FILE']`` stops a second worker from starting.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from . import rounds, tallies
+from .circuit_breaker import OPEN
+from .models import SyncStatus
+from .services import BACKEND_SYNC_TASKS, VotingAPIService, VotingDataService, invalidate_stats_cache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TASKS = BACKEND_SYNC_TASKS + ('tallies', 'rounds')
+WORKER_USER = 'sync-worker'
+
+
+class WorkerAlreadyRunning(Exception):
+    pass
+
+
+@contextmanager
+def worker_lock(path: str):
+    """Hold an exclusive flock on ``path`` for the worker's lifetime"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a+') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.seek(0)
+            holder = lock_file.read().strip() or 'unknown'
+            raise WorkerAlreadyRunning(f"Another sync worker holds {path} (pid {holder})")
+        try:
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(str(os.getpid()))
+            lock_file.flush()
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SyncWorker:
+    """Runs the sync tasks on independent schedules until stopped"""
+
+    def __init__(self, tasks: Optional[Iterable[str]] = None, intervals: Optional[Dict[str, float]] = None,
+                 jitter: float = None, max_backoff: float = None):
+        config = settings.SYNC_WORKER
+        self.tasks = list(tasks or TASKS)
+        self.intervals = {**config['INTERVALS'], **(intervals or {})}
+        self.jitter = config['JITTER'] if jitter is None else jitter
+        self.max_backoff = config['MAX_BACKOFF'] if max_backoff is None else max_backoff
+        self.service = VotingDataService(VotingAPIService(log_calls=False))
+        self._next_run = {task: 0.0 for task in self.tasks}  # time.monotonic() values
+        self._failures = {task: 0 for task in self.tasks}
+        self._stop = threading.Event()
+
+    def run(self, once: bool = False):
+        """Run tasks as they fall due until ``stop()``; with ``once``, run each task one time"""
+        while not self._stop.is_set():
+            self.run_due()
+            # Drop the connection while sleeping if it broke or outlived CONN_MAX_AGE
+            close_old_connections()
+            if once:
+                return
+            self._stop.wait(max(0.0, min(self._next_run.values()) - time.monotonic()))
+
+    def stop(self):
+        self._stop.set()
+
+    def run_due(self) -> Dict[str, bool]:
+        """Run every task that is due; returns whether each one succeeded"""
+        outcomes = {}
+        for task in self.tasks:
+            if self._stop.is_set():
+                break
+            if time.monotonic() >= self._next_run[task]:
+                outcomes[task] = self.run_task(task)
+        return outcomes
+
+    def run_task(self, task: str) -> bool:
+        attempted_at = timezone.now()
+        data = None
+        try:
+            data = getattr(self, f'_sync_{task}')()
+        except Exception as e:
+            self._failures[task] += 1
+            delay = self._delay(task)
+            logger.warning(f"Sync task {task} failed ({self._failures[task]} in a row), "
+                           f"retrying in {delay:.1f}s: {str(e)}")
+            self._record(task, attempted_at, delay, error=str(e))
+            return False
+
+        self._failures[task] = 0
+        self._record(task, attempted_at, self._delay(task), data=data)
+        return True
+
+    def _delay(self, task: str) -> float:
+        """Seconds until the task's next run: its interval, or backoff after failures"""
+        failures = self._failures[task]
+        delay = self.intervals[task]
+        if failures:
+            delay = min(delay * 2 ** failures, self.max_backoff)
+            circuit = self.service.api.breaker.snapshot()
+            if circuit['state'] == OPEN and circuit['retry_at']:
+                delay = max(delay, (circuit['retry_at'] - timezone.now()).total_seconds())
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._next_run[task] = time.monotonic() + delay
+        return delay
+
+    def _record(self, task, attempted_at, delay, data=None, error=''):
+        defaults = {
+            'last_attempt_at': attempted_at,
+            'last_error': error,
+            'consecutive_failures': self._failures[task],
+            'next_run_at': timezone.now() + timedelta(seconds=delay),
+        }
+        if not error:
+            defaults['last_success_at'] = timezone.now()
+        if data is not None:
+            defaults['data'] = data
+        SyncStatus.objects.update_or_create(task=task, defaults=defaults)
+
+    def _sync_results(self):
+        self.service.sync_results_from_backend(user=WORKER_USER, log_unchanged=False)
+
+    def _sync_votes(self):
+        self.service.sync_votes_from_backend(user=WORKER_USER, log_unchanged=False)
+
+    def _sync_devices(self):
+        data = self.service.api.get_device_stats(user=WORKER_USER)
+        previous = SyncStatus.objects.filter(task='devices').values_list('data', flat=True).first() or {}
+        # The dashboard's unique voter count comes from here
+        if previous.get('totalUniqueDevices') != data.get('totalUniqueDevices'):
+            invalidate_stats_cache()
+        return data
+
+    def _sync_tallies(self):
+        tallies.compact()
+
+    def _sync_rounds(self):
+        rounds.purge_rounds(user=WORKER_USER)
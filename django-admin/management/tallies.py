@@ -0,0 +1,127 @@
+"""
+Sharded vote tally counters.
+
+Bumping ``VoteResults.vote_count`` for every vote would make concurrent
+writers queue on four hot rows. Instead each team has ``TALLY_SHARDS``
+counter rows and a vote increments one of them, picked at random, with an
+``F()`` update inside the vote's own transaction, so the count commits or
+rolls back with the vote.
+
+Shards hold counts not yet folded into ``VoteResults``. ``read_tallies()``
+and ``current_results()`` add them to the stored results, so reads are exact
+at any time. Like the votes they count, shards and results belong to a
+voting round (see rounds.py); reads default to the active round.
+``compact()`` (run by the sync worker's ``tallies`` task) periodically
+moves them into ``VoteResults`` and recomputes ``percentage`` and
+``total_votes``.
+
+SQLite allows one writer at a time whatever rows it touches, so here the
+shards keep each write transaction short rather than removing the lock;
+on a row-locking database they also remove the contention.
+``manage.py benchmark_tallies`` compares both approaches across processes.
+"""
+import random
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import TallyShard, VoteResults, active_round_id
+from .teams import get_registry
+
+
+def percentage(count: int, total: int) -> int:
+    # Math.round semantics (half up) to match the Express server
+    return int(count * 100 / total + 0.5) if total > 0 else 0
+
+
+def increment(team_id: str, amount: int = 1, round_id: Optional[int] = None):
+    """Add ``amount`` to one of the team's shards; call inside the vote's transaction"""
+    round_id = round_id or active_round_id()
+    shard = random.randrange(settings.TALLY_SHARDS)
+    shard_row = TallyShard.objects.filter(round_id=round_id, team_id=team_id, shard=shard)
+    with transaction.atomic(savepoint=False):
+        if not shard_row.update(count=F('count') + amount):
+            # First vote on this shard; another writer may create it at the same time
+            TallyShard.objects.bulk_create([TallyShard(round_id=round_id, team_id=team_id, shard=shard)],
+                                           ignore_conflicts=True)
+            shard_row.update(count=F('count') + amount)
+
+
+def pending(round_id: Optional[int] = None) -> Dict[str, int]:
+    """Per-team counts not yet folded into ``VoteResults``"""
+    rows = TallyShard.objects.in_round(round_id).order_by().values('team_id').annotate(total=Sum('count'))
+    return {row['team_id']: row['total'] for row in rows if row['total']}
+
+
+def read_tallies(round_id: Optional[int] = None) -> Dict[str, int]:
+    """Exact per-team vote counts of a round (the active one by default): stored results plus pending counts"""
+    round_id = round_id or active_round_id()
+    tallies = dict(VoteResults.objects.in_round(round_id).values_list('team_id', 'vote_count'))
+    for team_id, count in pending(round_id).items():
+        tallies[team_id] = tallies.get(team_id, 0) + count
+    return tallies
+
+
+def current_results() -> Tuple[List[Dict], int]:
+    """The active round's results in the backend's JSON shape, most votes first, and the total"""
+    tallies = read_tallies()
+    total = sum(tallies.values())
+    teams = get_registry()
+    results = [
+        {
+            'teamId': team_id,
+            'teamName': teams.name(team_id),
+            'votes': count,
+            'percentage': percentage(count, total),
+        }
+        for team_id, count in tallies.items()
+    ]
+    results.sort(key=lambda result: result['votes'], reverse=True)
+    return results, total
+
+
+def compact() -> Dict[str, int]:
+    """Fold pending shard counts of every round into ``VoteResults``; returns the counts folded per team"""
+    with transaction.atomic():
+        shards = list(TallyShard.objects.select_for_update().exclude(count=0)
+                      .values_list('id', 'round_id', 'team_id', 'count'))
+        if not shards:
+            return {}
+
+        folded, by_round = {}, {}
+        for pk, round_id, team_id, count in shards:
+            # Subtract what was read rather than zeroing, so no increment is lost
+            TallyShard.objects.filter(pk=pk).update(count=F('count') - count)
+            round_counts = by_round.setdefault(round_id, {})
+            round_counts[team_id] = round_counts.get(team_id, 0) + count
+            folded[team_id] = folded.get(team_id, 0) + count
+
+        now = timezone.now()
+        for round_id, counts in by_round.items():
+            _fold(round_id, counts, now)
+    return folded
+
+
+def _fold(round_id: int, counts: Dict[str, int], now):
+    results = {result.team_id: result for result in VoteResults.objects.in_round(round_id).select_for_update()}
+    teams = get_registry()
+    for team_id in counts.keys() - results.keys():
+        results[team_id] = VoteResults.objects.create(round_id=round_id, team_id=team_id,
+                                                      team_name=teams.name(team_id))
+    for team_id, count in counts.items():
+        results[team_id].vote_count += count
+
+    total = sum(result.vote_count for result in results.values())
+    for result in results.values():
+        result.total_votes = total
+        result.percentage = percentage(result.vote_count, total)
+        result.last_updated = now  # bulk_update skips auto_now
+    VoteResults.objects.bulk_update(results.values(), ['vote_count', 'total_votes', 'percentage', 'last_updated'])
+
+
+def discard_pending(round_id: Optional[int] = None):
+    """Drop pending counts; a full results snapshot from the backend already includes them"""
+    TallyShard.objects.in_round(round_id).exclude(count=0).update(count=0)
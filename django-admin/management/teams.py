@@ -0,0 +1,101 @@
+"""
+Process-wide registry of the ``Team`` table.
+
+Votes store team ids. Pages, exports and API responses show team names, and
+backend payloads may carry either. ``get_registry()`` returns an immutable
+snapshot of the table with O(1) lookups both ways, loaded on first use.
+
+Saving or deleting a ``Team`` drops this process's snapshot at once (a
+post_save/post_delete receiver) and bumps a version in the shared stats
+cache. Other worker processes compare that version at most every
+``TEAM_REGISTRY_RECHECK_INTERVAL`` seconds and reload when it moved.
+``bulk_create``/``update`` send no signals, so call ``invalidate()`` after
+them.
+"""
+import threading
+import time
+from types import MappingProxyType
+from typing import Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Team
+
+VERSION_KEY = 'teams:version'
+
+
+class TeamRegistry:
+    """Immutable id <-> name lookup over every team"""
+
+    def __init__(self, teams: Tuple[Tuple[str, str], ...], version=None):
+        self.choices = teams
+        self.names = MappingProxyType(dict(teams))
+        self.ids = MappingProxyType({name: team_id for team_id, name in teams})
+        self.version = version
+
+    @classmethod
+    def load(cls, version=None) -> 'TeamRegistry':
+        return cls(tuple(Team.objects.order_by('position', 'team_id').values_list('team_id', 'name')), version)
+
+    def __contains__(self, team_id) -> bool:
+        return team_id in self.names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def name(self, team_id: Optional[str]) -> str:
+        """Display name of ``team_id``, or the id itself for unknown teams"""
+        return self.names.get(team_id, team_id)
+
+    def id_for(self, value: Optional[str]) -> str:
+        """Team id for a display name or id, as the backend may send either"""
+        if not value:
+            return ''
+        if value in self.names:
+            return value
+        team_id = self.ids.get(value)
+        if team_id is not None:
+            return team_id
+        # Unknown team: keep something id-shaped
+        return value.lower().replace(' ', '-')
+
+
+_registry: Optional[TeamRegistry] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _shared_version():
+    return caches[settings.STATS_CACHE_ALIAS].get(VERSION_KEY)
+
+
+def get_registry() -> TeamRegistry:
+    global _registry, _checked_at
+    registry = _registry
+    if registry is not None and time.monotonic() - _checked_at < settings.TEAM_REGISTRY_RECHECK_INTERVAL:
+        return registry
+    with _lock:
+        version = _shared_version()
+        if _registry is None or _registry.version != version:
+            _registry = TeamRegistry.load(version)
+        _checked_at = time.monotonic()
+        return _registry
+
+
+def invalidate():
+    """Reload the registry here now, and in other processes on their next check"""
+    global _registry
+    _registry = None
+    caches[settings.STATS_CACHE_ALIAS].set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def teams_changed(sender, **kwargs):
+    """post_save/post_delete receiver for Team"""
+    invalidate()
+    # Readers before the commit may have loaded the old rows again
+    transaction.on_commit(invalidate)
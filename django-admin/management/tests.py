@@ -1,3 +1,1818 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from prometheus_client.parser import text_string_to_metric_families
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import caches
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.urls import reverse
+
+from . import analytics, ingestion, live, profiling, ratelimit, rounds, search, services, sqlite, tallies, teams
+from .aggregates import record_votes
+from .circuit_breaker import CircuitOpenError
+from .sync_worker import SyncWorker, WorkerAlreadyRunning, worker_lock
+from .logbuffer import SystemLogWriter
+from .models import Round, Team, Vote, SystemLog, SyncStatus, TallyShard, VoterAggregate, VoteResults
+from .pagination import KeysetPaginator
+from .services import VotingAPIService, VotingDataService, fetch_concurrently
+from .stats_cache import SingleFlightCache
+from .stub_backend import StubVotingBackend
+from .views import SystemLogsView
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'stats': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-stats'},
+}
+
+# Both write from a background thread by default; tests asserting on the rows
+# right away (or timing inline commits) write synchronously instead
+INLINE_LOGS = {**settings.SYSTEM_LOG_BUFFER, 'ENABLED': False}
+INLINE_VOTES = {**settings.VOTE_GROUP_COMMIT, 'ENABLED': False}
+
+
+@override_settings(CACHES=TEST_CACHES, SYSTEM_LOG_BUFFER=INLINE_LOGS)
+class VotingAPITests(TestCase):
+    """Tests for the public voting API (management/api_views.py)"""
+
+    def setUp(self):
+        # Fresh engine per test so state never leaks between test transactions
+        self._previous_engine = ingestion._engine
+        ingestion._engine = ingestion.VoteIngestionEngine(refresh_interval=0)
+        # Empty rate limit counters
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        rate_limit = override_settings(RATE_LIMIT={**settings.RATE_LIMIT,
+                                                   'PATH': os.path.join(workdir, 'ratelimit.bin')})
+        rate_limit.enable()
+        self.addCleanup(rate_limit.disable)
+
+    def tearDown(self):
+        ingestion._engine = self._previous_engine
+
+    def vote(self, user_team='team-a', voted_for='team-b', identifier='device-1', **extra):
+        payload = {'userTeam': user_team, 'votedFor': voted_for, 'userIdentifier': identifier, **extra}
+        return self.client.post(reverse('management:api_vote'), data=json.dumps(payload),
+                                content_type='application/json')
+
+    def test_votes_committed_while_loading_are_counted_once(self):
+        Vote.objects.create(vote_id='v-1', user_team='team-a', voted_for='team-b', user_identifier='device-1')
+        engine = ingestion.get_engine()
+        load_voters = engine._load_voters
+
+        def another_worker_votes():
+            voters = load_voters()
+            if not Vote.objects.filter(vote_id='v-2').exists():
+                Vote.objects.create(vote_id='v-2', user_team='team-a', voted_for='team-c', user_identifier='device-2')
+            return voters
+
+        with mock.patch.object(engine, '_load_voters', another_worker_votes):
+            engine.results()
+        self.assertEqual(engine.results(), ({'team-a': 0, 'team-b': 1, 'team-c': 1, 'team-d': 0}, 2))
+        self.assertTrue(engine.has_voted('device-2'))
+
+    def test_vote_is_persisted_and_counted(self):
+        response = self.vote(name='Alice')
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(body['vote']['votedFor'], 'Team 02')
+        self.assertEqual(body['results']['team-b'], 1)
+        self.assertEqual(body['totalVotes'], 1)
+        self.assertEqual(Vote.objects.get().name, 'Alice')
+
+    def test_invalid_votes_are_rejected(self):
+        self.assertEqual(self.vote(voted_for='team-a').status_code, 400)
+        self.assertEqual(self.vote(voted_for='team-z').status_code, 400)
+        self.assertEqual(self.vote(identifier='').status_code, 400)
+        self.assertFalse(Vote.objects.exists())
+
+    def test_duplicate_voter_is_rejected(self):
+        self.vote()
+        response = self.vote(voted_for='team-c')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.json()['hasVoted'])
+        self.assertEqual(Vote.objects.count(), 1)
+
+    def test_results_include_votes_from_other_workers(self):
+        self.vote()
+        # Simulate another worker writing directly to the database
+        Vote.objects.create(vote_id='other-worker', user_team='team-c', voted_for='team-b',
+                            user_identifier='device-2')
+
+        body = self.client.get(reverse('management:api_results')).json()
+
+        self.assertEqual(body['totalVotes'], 2)
+        team_b = next(r for r in body['results'] if r['teamId'] == 'team-b')
+        self.assertEqual(team_b['votes'], 2)
+        self.assertEqual(team_b['percentage'], 100)
+
+    def test_vote_status_and_device_reset(self):
+        self.vote()
+        status_url = reverse('management:api_vote_status', args=['device-1'])
+        self.assertTrue(self.client.get(status_url).json()['hasVoted'])
+
+        response = self.client.post(reverse('management:api_admin_reset_devices'),
+                                    data=json.dumps({'confirm': 'RESET_ALL_DEVICES'}),
+                                    content_type='application/json')
+        self.assertEqual(response.json()['previousVoterCount'], 1)
+
+        status = self.client.get(status_url).json()
+        self.assertFalse(status['hasVoted'])
+        self.assertIsNotNone(status['lastDeviceResetTimestamp'])
+        self.assertEqual(self.vote(voted_for='team-c').status_code, 201)
+
+    def test_votes_and_status_checks_are_rate_limited(self):
+        routes = {'vote': {'ip': (4, 60), 'identifier': (2, 60)}, 'vote_status': {'ip': (2, 60)}}
+        with self.settings(RATE_LIMIT={**settings.RATE_LIMIT, 'ROUTES': routes}):
+            self.assertEqual(self.vote().status_code, 201)
+            self.assertEqual(self.vote().status_code, 409)
+            response = self.vote()
+            self.assertEqual(response.status_code, 429)
+            self.assertGreaterEqual(int(response['Retry-After']), 1)
+            self.assertEqual(response.json()['retryAfter'], int(response['Retry-After']))
+
+            # Another identifier from the same address still has one request left
+            self.assertEqual(self.vote(identifier='device-2', voted_for='team-c').status_code, 201)
+            self.assertEqual(self.vote(identifier='device-3').status_code, 429)
+
+            status_url = reverse('management:api_vote_status', args=['device-1'])
+            self.assertEqual(self.client.get(status_url).status_code, 200)
+            self.assertEqual(self.client.get(status_url, REMOTE_ADDR='10.0.0.9').status_code, 200)
+            self.assertEqual(self.client.get(status_url).status_code, 200)
+            self.assertEqual(self.client.get(status_url).status_code, 429)
+
+        self.assertEqual(Vote.objects.count(), 2)
+
+    def test_reset_requires_confirmation(self):
+        self.vote()
+        url = reverse('management:api_admin_reset')
+
+        self.assertEqual(self.client.post(url, data='{}', content_type='application/json').status_code, 400)
+        self.client.post(url, data=json.dumps({'confirm': 'RESET_ALL_VOTES'}), content_type='application/json')
+
+        self.assertFalse(Vote.objects.in_round().exists())
+        self.assertEqual(self.client.get(reverse('management:api_results')).json()['totalVotes'], 0)
+
+
+@override_settings(CACHES=TEST_CACHES, SYSTEM_LOG_BUFFER=INLINE_LOGS)
+class VoteSyncTests(TestCase):
+    """Tests for incremental vote sync (VotingDataService.sync_votes_from_backend)"""
+
+    def backend_vote(self, vote_id, timestamp, voted_for='Team 02', name=None):
+        return {'id': vote_id, 'userTeam': 'Team 01', 'votedFor': voted_for,
+                'timestamp': timestamp, 'name': name}
+
+    def setUp(self):
+        caches['stats'].clear()
+
+    def sync(self, backend_votes, full=False):
+        def get_all_votes(user=None, ip_address=None, since=None):
+            # Behave like the Express server: ``since`` is ignored
+            return {'votes': backend_votes, 'totalVotes': len(backend_votes)}
+
+        service = VotingDataService()
+        with mock.patch.object(service.api, 'get_all_votes', side_effect=get_all_votes) as api:
+            metrics = service.sync_votes_from_backend(full=full)
+        return metrics, api
+
+    def test_only_new_votes_are_inserted(self):
+        votes = [self.backend_vote('v1', '2025-01-01T10:00:00.000Z'),
+                 self.backend_vote('v2', '2025-01-01T10:01:00.000Z')]
+        metrics, _ = self.sync(votes)
+        self.assertEqual(metrics['inserted'], 2)
+
+        votes.append(self.backend_vote('v3', '2025-01-01T10:02:00.000Z', name='Bob'))
+        metrics, api = self.sync(votes)
+
+        self.assertEqual(api.call_args.kwargs['since'].isoformat(), '2025-01-01T10:01:00+00:00')
+        self.assertEqual(metrics['fetched'], 3)
+        self.assertEqual(metrics['skipped'], 1)
+        self.assertEqual(metrics['inserted'], 1)
+        self.assertEqual(metrics['updated'], 1)
+        self.assertEqual(Vote.objects.get(vote_id='v3').name, 'Bob')
+        self.assertEqual(Vote.objects.count(), 3)
+
+    def test_deleted_backend_votes_are_reconciled(self):
+        votes = [self.backend_vote('v1', '2025-01-01T10:00:00.000Z'),
+                 self.backend_vote('v2', '2025-01-01T10:01:00.000Z')]
+        self.sync(votes)
+
+        metrics, _ = self.sync(votes[1:])
+
+        self.assertEqual(metrics['deleted'], 1)
+        self.assertEqual(list(Vote.objects.values_list('vote_id', flat=True)), ['v2'])
+
+    def test_deletion_plus_insertion_is_reconciled(self):
+        def incremental(backend_votes):
+            def get_all_votes(user=None, ip_address=None, since=None):
+                # A backend that honours ``since``
+                votes = [vote for vote in backend_votes if not since or parse_datetime(vote['timestamp']) >= since]
+                return {'votes': votes, 'totalVotes': len(backend_votes), 'since': since and since.isoformat()}
+            return mock.patch.object(VotingAPIService, 'get_all_votes', side_effect=get_all_votes)
+
+        votes = [self.backend_vote('v1', '2025-01-01T10:00:00.000Z'),
+                 self.backend_vote('v2', '2025-01-01T10:01:00.000Z')]
+        with incremental(votes):
+            VotingDataService().sync_votes_from_backend()
+        # v1 deleted and v0 backfilled before the high-water mark: the counts still match
+        votes = [self.backend_vote('v0', '2025-01-01T09:00:00.000Z')] + votes[1:]
+
+        with incremental(votes) as api:
+            metrics = VotingDataService().sync_votes_from_backend()
+        self.assertEqual((metrics['inserted'], metrics['deleted'], api.call_count), (0, 0, 1))
+
+        with incremental(votes), self.settings(VOTE_SYNC_RECONCILE_INTERVAL=0):
+            metrics = VotingDataService().sync_votes_from_backend()
+        self.assertEqual((metrics['inserted'], metrics['deleted']), (1, 1))
+        self.assertEqual(sorted(Vote.objects.values_list('vote_id', flat=True)), ['v0', 'v2'])
+
+    def test_locally_ingested_votes_are_left_alone(self):
+        votes = [self.backend_vote('v1', '2025-01-01T10:00:00.000Z')]
+        self.sync(votes)
+        local = ingestion.VoteIngestionEngine(refresh_interval=0).submit_vote('team-a', 'team-b', 'device-1')
+
+        _, api = self.sync(votes)
+        metrics, _ = self.sync(votes, full=True)
+
+        # The local vote is newer, but it isn't the backend's high-water mark
+        self.assertEqual(api.call_args.kwargs['since'].isoformat(), '2025-01-01T10:00:00+00:00')
+        self.assertEqual(metrics['deleted'], 0)
+        self.assertTrue(Vote.objects.filter(pk=local.pk, synced_with_backend=False).exists())
+
+    def test_sync_metrics_are_logged(self):
+        self.sync([self.backend_vote('v1', '2025-01-01T10:00:00.000Z')], full=True)
+
+        log = SystemLog.objects.get(action_type='VOTE_SYNC')
+        self.assertEqual(log.details['mode'], 'full')
+        self.assertEqual(log.details['inserted'], 1)
+
+
+@override_settings(CACHES=TEST_CACHES, SYSTEM_LOG_BUFFER=INLINE_LOGS)
+class VoterAggregateTests(TestCase):
+    """Tests for the incrementally maintained voter aggregates"""
+
+    def setUp(self):
+        self._previous_engine = ingestion._engine
+        ingestion._engine = ingestion.VoteIngestionEngine(refresh_interval=0)
+
+    def tearDown(self):
+        ingestion._engine = self._previous_engine
+
+    def test_votes_are_merged_per_name(self):
+        engine = ingestion.get_engine()
+        engine.submit_vote('team-a', 'team-b', 'device-1', name=' Alice ', ip_address='10.0.0.1')
+        engine.submit_vote('team-a', 'team-c', 'device-2', name='Alice', ip_address='10.0.0.2')
+        engine.submit_vote('team-b', 'team-c', 'device-3')
+
+        alice = VoterAggregate.objects.get(name='Alice')
+        self.assertEqual(alice.vote_count, 2)
+        self.assertEqual(alice.voted_for_display_name, 'Team 02, Team 03')
+        self.assertEqual(alice.ip_address, '10.0.0.2')
+        self.assertEqual(VoterAggregate.objects.get(name=VoterAggregate.ANONYMOUS).vote_count, 1)
+
+    def test_merges_update_the_modification_time(self):
+        engine = ingestion.get_engine()
+        engine.submit_vote('team-a', 'team-b', 'device-1', name='Alice')
+        created = VoterAggregate.objects.get(name='Alice').updated_at
+
+        engine.submit_vote('team-a', 'team-c', 'device-2', name='Alice')
+
+        self.assertGreater(VoterAggregate.objects.get(name='Alice').updated_at, created)
+
+    def test_anonymous_row_lists_hundreds_of_teams(self):
+        votes = Vote.objects.bulk_create([
+            Vote(vote_id=f'v-{i}', user_team='team-a', voted_for=f'team-{i:04d}', user_identifier=f'device-{i}')
+            for i in range(300)
+        ])
+        record_votes(votes)
+
+        anonymous = VoterAggregate.objects.get(name=VoterAggregate.ANONYMOUS)
+        self.assertEqual(len(anonymous.voted_for_teams.split(',')), 300)
+
+    def test_sync_deletions_rebuild_affected_voters(self):
+        votes = [{'id': 'v1', 'userTeam': 'Team 01', 'votedFor': 'Team 02', 'timestamp': '2025-01-01T10:00:00.000Z',
+                  'name': 'Bob'},
+                 {'id': 'v2', 'userTeam': 'Team 01', 'votedFor': 'Team 03', 'timestamp': '2025-01-01T10:01:00.000Z',
+                  'name': 'Bob'}]
+        service = VotingDataService()
+        with mock.patch.object(service.api, 'get_all_votes', return_value={'votes': votes}):
+            service.sync_votes_from_backend()
+        with mock.patch.object(service.api, 'get_all_votes', return_value={'votes': votes[:1]}):
+            service.sync_votes_from_backend()
+
+        bob = VoterAggregate.objects.get(name='Bob')
+        self.assertEqual(bob.vote_count, 1)
+        self.assertEqual(bob.voted_for_display_name, 'Team 02')
+
+    def test_dashboard_reads_latest_voters_in_one_query(self):
+        engine = ingestion.get_engine()
+        for i in range(12):
+            engine.submit_vote('team-a', 'team-b', f'device-{i}', name=f'Voter {i}' if i % 4 else None)
+
+        with mock.patch.object(VotingDataService, 'get_dashboard_stats', return_value={'results': []}), \
+                self.assertNumQueries(3):  # active round, voter aggregates, recent logs
+            response = self.client.get(reverse('management:dashboard'))
+
+        recent = response.context['recent_votes']
+        self.assertEqual([voter.name for voter in recent[:2]], ['Voter 11', 'Voter 10'])
+        self.assertEqual(len(recent), 10)
+        self.assertEqual(response.context['named_voters_count'], 9)
+        self.assertEqual(response.context['anonymous_voters_count'], 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConditionalGetTests(TestCase):
+    """Tests for ETag support on the results and dashboard stats endpoints"""
+
+    def setUp(self):
+        caches['stats'].clear()
+        self._previous_engine = ingestion._engine
+        ingestion._engine = ingestion.VoteIngestionEngine(refresh_interval=60)
+
+    def tearDown(self):
+        ingestion._engine = self._previous_engine
+
+    def test_results_are_not_modified_until_a_vote(self):
+        url = reverse('management:api_results')
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        ingestion.get_engine().submit_vote('team-a', 'team-b', 'device-1')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['totalVotes'], 1)
+
+    def test_results_etag_follows_this_workers_tallies(self):
+        url = reverse('management:api_results')
+        etag = self.client.get(url)['ETag']
+
+        # Another worker takes a vote; this one hasn't refreshed yet and
+        # must not tag its old tallies as the new state
+        ingestion.VoteIngestionEngine(refresh_interval=0).submit_vote('team-a', 'team-b', 'device-1')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        ingestion.get_engine()._last_refresh = 0.0  # The refresh interval has passed
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['totalVotes'], 1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_dashboard_stats_skip_backend_when_unchanged(self):
+        url = reverse('management:dashboard_stats_ajax')
+        results = {'totalVotes': 3, 'results': []}
+        api = VotingAPIService
+        with mock.patch.object(api, 'get_results', return_value=results) as get_results, \
+                mock.patch.object(api, 'get_all_votes', return_value={'uniqueVoters': 3}):
+            response = self.client.get(url)
+            etag = response['ETag']
+            self.assertIn('Last-Modified', response)
+
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(get_results.call_count, 1)
+
+            VotingDataService().invalidate_stats_cache()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class SearchIndexTests(TestCase):
+    """Tests for full-text search over votes and system logs"""
+
+    def log(self, message, **fields):
+        return SystemLog.objects.create(level='INFO', action_type='API_CALL', message=message, **fields)
+
+    def test_prefix_search_covers_details_and_ranks_matches(self):
+        self.log('Backend timeout on votes', details={'endpoint': 'admin/votes'})
+        self.log('Results fetched', details={'note': 'timeout retried'})
+        self.log('Timeout, timeout and another timeout')
+        self.log('Unrelated')
+
+        messages = [log.message for log in search.search(SystemLog.objects.all(), 'time')]
+
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(messages[0], 'Timeout, timeout and another timeout')
+        self.assertEqual([log.message for log in search.search(SystemLog.objects.all(), 'admin/vot')],
+                         ['Backend timeout on votes'])
+
+    def test_index_follows_updates_and_deletes(self):
+        vote = Vote.objects.create(vote_id='v-1', user_team='team-a', voted_for='team-b',
+                                   user_identifier='device-1', ip_address='10.1.2.3', name='Alice')
+        self.assertEqual(list(search.search(Vote.objects.all(), '10.1.2')), [vote])
+
+        Vote.objects.filter(pk=vote.pk).update(name='Bob')
+        self.assertFalse(search.search(Vote.objects.all(), 'alice').exists())
+        self.assertTrue(search.search(Vote.objects.all(), 'bo').exists())
+
+        vote.delete()
+        self.assertFalse(search.search(Vote.objects.all(), 'bob').exists())
+
+    def test_broad_searches_are_newest_first(self):
+        for i in range(3):
+            self.log(f'Success {i}')
+
+        with self.settings(SEARCH_RANK_MAX_MATCHES=2):
+            messages = [log.message for log in search.search(SystemLog.objects.all(), 'success')]
+
+        self.assertEqual(messages, ['Success 2', 'Success 1', 'Success 0'])
+
+    def test_rank_decision_counts_only_filtered_matches(self):
+        for i in range(3):
+            self.log(f'Success {i}')
+        SystemLog.objects.create(level='ERROR', action_type='API_CALL', message='Success, success')
+
+        with self.settings(SEARCH_RANK_MAX_MATCHES=2):
+            logs = SystemLogsView.build_queryset(level_filter='ERROR', search='success')
+
+        self.assertEqual(logs.query.order_by, ('search_rank', '-search_rowid'))
+
+    def test_icontains_fallback_without_fts5(self):
+        self.log('Request failed', user='carol')
+
+        with mock.patch.object(search, 'fts_available', return_value=False):
+            self.assertEqual(search.search(SystemLog.objects.all(), 'aro').count(), 1)
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests for cursor pagination of the list views"""
+
+    def setUp(self):
+        # Timestamp ties: ids must break them without skipping or repeating rows
+        now = timezone.now()
+        SystemLog.objects.bulk_create([
+            SystemLog(level='ERROR' if i % 3 == 0 else 'INFO', action_type='API_CALL', message=f'Log {i}')
+            for i in range(23)
+        ])
+        for i, log in enumerate(SystemLog.objects.order_by('id')):
+            SystemLog.objects.filter(pk=log.pk).update(timestamp=now - timezone.timedelta(minutes=i // 4))
+        self.expected = list(SystemLog.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+
+    def test_walks_forward_and_back_without_gaps(self):
+        paginator = KeysetPaginator(SystemLogsView.build_queryset(), 5)
+        pages, page = [], paginator.get_page()
+        while True:
+            pages.append([log.id for log in page])
+            if not page.has_next():
+                break
+            page = paginator.get_page(page.next_cursor)
+
+        self.assertEqual([log_id for ids in pages for log_id in ids], self.expected)
+        self.assertEqual([len(ids) for ids in pages], [5, 5, 5, 5, 3])
+
+        backwards = []
+        while page.has_previous():
+            page = paginator.get_page(page.previous_cursor)
+            backwards.append([log.id for log in page])
+        self.assertEqual(backwards, pages[-2::-1])
+
+    def test_deep_pages_seek_instead_of_offset(self):
+        paginator = KeysetPaginator(SystemLogsView.build_queryset(level_filter='INFO'), 5)
+        page = paginator.get_page(paginator.get_page().next_cursor)
+
+        with CaptureQueriesContext(connection) as captured:
+            paginator.get_page(page.next_cursor)
+
+        self.assertEqual(len(captured), 1)
+        self.assertNotIn('OFFSET', captured[0]['sql'])
+
+    def test_count_stops_at_limit(self):
+        self.assertEqual(KeysetPaginator(SystemLogsView.build_queryset(), 5).count, 23)
+
+        capped = KeysetPaginator(SystemLogsView.build_queryset(), 5, count_limit=10)
+        self.assertEqual(capped.count, 11)
+        self.assertFalse(capped.count_is_exact)
+
+    def test_bad_or_stale_cursor_returns_first_page(self):
+        paginator = KeysetPaginator(SystemLogsView.build_queryset(), 5)
+        first = [log.id for log in paginator.get_page()]
+
+        stale = KeysetPaginator(SystemLog.objects.order_by('-id'), 5).get_page().next_cursor
+        for cursor in ('not-a-cursor', 'e30', stale):
+            self.assertEqual([log.id for log in paginator.get_page(cursor)], first)
+
+    def test_paginates_search_results(self):
+        queryset = SystemLogsView.build_queryset(search='log')
+        paginator = KeysetPaginator(queryset, 10)
+        page = paginator.get_page()
+        ids = [log.id for log in page] + [log.id for log in paginator.get_page(page.next_cursor)]
+        self.assertEqual(ids, [log.id for log in queryset[:20]])
+
+    def test_ranked_search_pages_by_offset(self):
+        queryset = SystemLogsView.build_queryset(search='log')
+        paginator = KeysetPaginator(queryset, 10)
+        self.assertTrue(paginator.by_offset)
+
+        pages, page = [], paginator.get_page()
+        while True:
+            pages.append([log.id for log in page])
+            if not page.has_next():
+                break
+            page = paginator.get_page(page.next_cursor)
+        self.assertEqual([log_id for ids in pages for log_id in ids], [log.id for log in queryset])
+        self.assertEqual([len(ids) for ids in pages], [10, 10, 3])
+
+        self.assertEqual([log.id for log in paginator.get_page(page.previous_cursor)], pages[1])
+        stale = KeysetPaginator(SystemLogsView.build_queryset(), 10).get_page().next_cursor
+        self.assertEqual([log.id for log in paginator.get_page(stale)], pages[0])
+
+    def test_page_controls_keep_filters(self):
+        paginator = KeysetPaginator(SystemLogsView.build_queryset(level_filter='INFO'), 5, count_limit=10)
+        page = paginator.get_page()
+        request = RequestFactory().get('/management/logs/', {'level': 'INFO', 'cursor': 'old'})
+
+        html = render_to_string('management/includes/keyset_pagination.html',
+                                {'page': page, 'label': 'logs'}, request=request)
+
+        self.assertIn('More than 10 logs', html)
+        self.assertIn(f'?level=INFO&amp;cursor={page.next_cursor}', html)
+        self.assertIn('href="?level=INFO"', html)
+
+
+def _resident_bytes():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AdminPagesTests(TestCase):
+    """Tests that the votes, results and logs pages render"""
+
+    def setUp(self):
+        caches['stats'].clear()
+        for i in range(30):
+            Vote.objects.create(vote_id=f'v-{i}', user_team='team-a', voted_for='team-b',
+                                user_identifier=f'device-{i}', name=f'Voter {i}')
+
+    def test_votes_list_pages_with_filters(self):
+        response = self.client.get(reverse('management:votes_list'), {'team': 'team-a'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['votes']), 25)
+        self.assertContains(response, f"?team=team-a&amp;cursor={response.context['votes'].next_cursor}")
+
+        second = self.client.get(reverse('management:votes_list'),
+                                 {'team': 'team-a', 'cursor': response.context['votes'].next_cursor})
+        self.assertEqual(len(second.context['votes']), 5)
+
+    def test_results_and_logs_render(self):
+        SystemLog.objects.create(level='ERROR', action_type='API_CALL', message='Backend timeout')
+        api = VotingAPIService
+        with mock.patch.object(api, 'get_results', return_value={'totalVotes': 0, 'results': []}), \
+                mock.patch.object(api, 'get_all_votes', return_value={'uniqueVoters': 0}):
+            self.assertContains(self.client.get(reverse('management:results')), 'cumulativeShareChart')
+
+        response = self.client.get(reverse('management:system_logs'), {'search': 'timeout'})
+        self.assertContains(response, 'Backend timeout')
+
+
+PROFILING_ON = {'ENABLED': True, 'SLOWEST': 2}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RequestProfilingTests(TestCase):
+    """Tests for the Server-Timing profiling middleware"""
+
+    def setUp(self):
+        caches['stats'].clear()
+        profiling._slowest = None
+
+    def test_off_by_default(self):
+        response = self.client.get(reverse('management:votes_list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertContains(self.client.get(reverse('management:profiling')), 'Request profiling is off')
+
+    @override_settings(REQUEST_PROFILING=PROFILING_ON)
+    def test_breaks_down_db_backend_and_render_time(self):
+        # Fan-out threads can't write API logs while the test transaction holds the database
+        with StubVotingBackend(votes=3, latency={'results': 0.02}) as backend, \
+                self.settings(VOTING_API_BASE_URL=backend.base_url), \
+                mock.patch('management.services.write_log'):
+            response = self.client.get(reverse('management:dashboard'))
+
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertRegex(timing, r'backend-get_results;dur=(2\d|[3-9]\d|\d{3,})\.\d;desc="1 calls"')
+        self.assertIn('backend-get_all_votes;', timing)
+        self.assertRegex(timing, r'render;dur=[\d.]+$')
+
+        [profile] = profiling.get_slowest_requests().snapshot()
+        self.assertEqual((profile.path, profile.status), ('/management/', 200))
+        self.assertGreater(profile.db_count, 0)
+        self.assertEqual(profile.backend_count, 2)
+
+    @override_settings(REQUEST_PROFILING=PROFILING_ON)
+    async def test_counts_queries_of_sync_views_under_asgi(self):
+        # The sync view runs on an executor thread, not the event loop's
+        response = await self.async_client.get(reverse('management:votes_list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotRegex(response['Server-Timing'], r'desc="0 queries"')
+        [profile] = profiling.get_slowest_requests().snapshot()
+        self.assertGreater(profile.db_count, 0)
+
+    @override_settings(REQUEST_PROFILING=PROFILING_ON)
+    def test_keeps_the_slowest_requests(self):
+        slowest = profiling.get_slowest_requests()
+        for path, total in (('/a', 0.3), ('/b', 0.1), ('/c', 0.5), ('/d', 0.2)):
+            profile = profiling.RequestProfile('GET', path)
+            profile.total = total
+            slowest.add(profile)
+
+        self.assertEqual([profile.path for profile in slowest.snapshot()], ['/c', '/a'])
+
+        response = self.client.get(reverse('management:profiling'))
+        self.assertContains(response, 'GET /c')
+        self.client.post(reverse('management:profiling'))
+        # Only the request to the page itself since clearing
+        self.assertEqual([profile.path for profile in slowest.snapshot()], ['/management/profiling/'])
+
+
+def _metric(client, sample_name, **labels):
+    """Current value of one sample from the scrape endpoint (0 if absent)"""
+    response = client.get(reverse('management:metrics'))
+    for family in text_string_to_metric_families(response.content.decode()):
+        for sample in family.samples:
+            if sample.name == sample_name and all(sample.labels.get(k) == v for k, v in labels.items()):
+                return sample.value
+    return 0
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MetricsTests(TestCase):
+    """Tests for the Prometheus metrics (shared files, so compare deltas)"""
+
+    def setUp(self):
+        caches['stats'].clear()
+
+    def test_backend_calls_syncs_and_cache_lookups(self):
+        api_calls = dict(endpoint='get_all_votes', method='GET', status='200')
+        before = {
+            'api': _metric(self.client, 'voting_api_request_duration_seconds_count', **api_calls),
+            'sync': _metric(self.client, 'voting_sync_duration_seconds_count', kind='votes', outcome='success'),
+            'inserted': _metric(self.client, 'voting_votes_synced_total', action='inserted'),
+            'miss': _metric(self.client, 'voting_stats_cache_requests_total', key='dashboard_stats', result='miss'),
+            'hit': _metric(self.client, 'voting_stats_cache_requests_total', key='dashboard_stats', result='hit'),
+        }
+
+        with StubVotingBackend(votes=4) as backend, self.settings(VOTING_API_BASE_URL=backend.base_url), \
+                mock.patch('management.services.write_log'):
+            VotingDataService().sync_votes_from_backend()
+            VotingDataService().get_dashboard_stats()
+            VotingDataService().get_dashboard_stats()
+
+        self.assertEqual(_metric(self.client, 'voting_api_request_duration_seconds_count', **api_calls),
+                         before['api'] + 2)
+        self.assertEqual(_metric(self.client, 'voting_sync_duration_seconds_count', kind='votes', outcome='success'),
+                         before['sync'] + 1)
+        self.assertEqual(_metric(self.client, 'voting_votes_synced_total', action='inserted'), before['inserted'] + 4)
+        self.assertEqual(_metric(self.client, 'voting_stats_cache_requests_total', key='dashboard_stats',
+                                 result='miss'), before['miss'] + 1)
+        self.assertEqual(_metric(self.client, 'voting_stats_cache_requests_total', key='dashboard_stats',
+                                 result='hit'), before['hit'] + 1)
+
+    def test_failed_backend_calls_are_labelled_error(self):
+        labels = dict(endpoint='get_results', method='GET', status='error')
+        before = _metric(self.client, 'voting_api_request_duration_seconds_count', **labels)
+
+        with self.settings(VOTING_API_BASE_URL='http://127.0.0.1:9'), mock.patch('management.services.write_log'), \
+                self.assertRaises(Exception):
+            VotingAPIService().get_results()
+
+        self.assertEqual(_metric(self.client, 'voting_api_request_duration_seconds_count', **labels), before + 1)
+
+
+@override_settings(VOTE_GROUP_COMMIT=INLINE_VOTES)
+class WriteLockMetricsTests(TransactionTestCase):
+    """BEGIN IMMEDIATE only runs outside TestCase's wrapping transaction"""
+
+    # Keep the teams seeded by the migrations through the flush
+    serialized_rollback = True
+
+    def test_times_begin_immediate(self):
+        before = _metric(self.client, 'voting_db_write_lock_wait_seconds_count')
+        ingestion.VoteIngestionEngine(refresh_interval=0).submit_vote('team-a', 'team-b', 'device-1')
+        with transaction.atomic():
+            pass
+        self.assertGreaterEqual(_metric(self.client, 'voting_db_write_lock_wait_seconds_count'), before + 2)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GroupCommitDurabilityTests(TransactionTestCase):
+    """Batches commit at synchronous=FULL (only outside TestCase's wrapping transaction)"""
+
+    serialized_rollback = True
+
+    def synchronous(self):
+        return connection.connection.execute('PRAGMA synchronous').fetchone()[0]
+
+    def test_batches_commit_at_full(self):
+        caches['stats'].clear()
+        engine = ingestion.VoteIngestionEngine(refresh_interval=3600)
+        engine.results()
+        committer = ingestion.GroupCommitter(engine)
+        connection.connection.execute('PRAGMA synchronous = NORMAL')
+        levels = []
+        bulk_create = Vote.objects.bulk_create
+
+        def record_level(votes):
+            levels.append(self.synchronous())
+            return bulk_create(votes)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(committer.submit, Vote(vote_id='v-1', user_team='team-a',
+                                                            voted_for='team-b', user_identifier='device-1'))
+            while not committer.pending():
+                time.sleep(0.005)
+            with mock.patch.object(Vote.objects, 'bulk_create', record_level):
+                self.assertEqual(committer.flush(), 1)
+            future.result(timeout=5)
+
+        self.assertEqual(levels, [2])  # FULL
+        self.assertEqual(self.synchronous(), 1)  # Back to NORMAL
+        self.assertTrue(engine.has_voted('device-1'))
+
+
+class ExportTests(TestCase):
+    """Tests for the streaming CSV / NDJSON exports"""
+
+    def export(self, dataset, **params):
+        response = self.client.get(reverse('management:export_data', args=[dataset]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_votes_csv_uses_list_filters(self):
+        Vote.objects.create(vote_id='v-1', user_team='team-a', voted_for='team-b', user_identifier='d-1',
+                            name='=HYPERLINK("x")')
+        Vote.objects.create(vote_id='v-2', user_team='team-c', voted_for='team-b', user_identifier='d-2')
+
+        response, body = self.export('votes', team='team-a')
+
+        self.assertIn('attachment; filename="votes-', response['Content-Disposition'])
+        rows = list(csv.DictReader(body.decode().splitlines()))
+        self.assertEqual([row['vote_id'] for row in rows], ['v-1'])
+        # Not run as a formula when opened in a spreadsheet
+        self.assertEqual(rows[0]['name'], '\'=HYPERLINK("x")')
+
+    def test_logs_ndjson_gzip(self):
+        SystemLog.objects.create(level='ERROR', action_type='API_CALL', message='Timeout', details={'status': 504})
+        SystemLog.objects.create(level='INFO', action_type='API_CALL', message='Success')
+
+        response, body = self.export('logs', format='ndjson', gzip='1', level='ERROR')
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = [json.loads(line) for line in gzip.decompress(body).decode().splitlines()]
+        self.assertEqual([(row['message'], row['details']) for row in rows], [('Timeout', {'status': 504})])
+
+    def test_results_history_has_running_totals(self):
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) - timezone.timedelta(hours=2)
+        for i, (hour, team) in enumerate([(0, 'team-a'), (0, 'team-a'), (1, 'team-b'), (2, 'team-a')]):
+            Vote.objects.create(vote_id=f'v-{i}', user_team='team-c', voted_for=team, user_identifier=f'd-{i}',
+                                timestamp=start + timezone.timedelta(hours=hour, minutes=5))
+
+        _, body = self.export('results', format='ndjson')
+
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([(row['team_id'], row['votes'], row['cumulative_votes']) for row in rows],
+                         [('team-a', 2, 2), ('team-b', 1, 1), ('team-a', 1, 3)])
+
+    def test_rejects_unknown_dataset_and_format(self):
+        self.assertEqual(self.client.get(reverse('management:export_data', args=['users'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('management:export_data', args=['votes']),
+                                         {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('management:export_data', args=['results']),
+                                         {'interval': 'week'}).status_code, 400)
+
+    def test_memory_stays_flat_for_large_exports(self):
+        """
+        Peak RSS while streaming must not grow with the row count.
+
+        Defaults to 100k rows to keep the suite fast; set
+        EXPORT_MEMORY_TEST_ROWS=3000000 for a multi-million-row run.
+        """
+        if not os.path.exists('/proc/self/statm'):
+            self.skipTest("RSS sampling needs /proc")
+        rows = int(os.environ.get('EXPORT_MEMORY_TEST_ROWS', 100_000))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < %s) "
+                "INSERT INTO management_systemlog (timestamp, level, action_type, message, details) "
+                "SELECT datetime('2025-01-01', '+' || i || ' seconds'), 'INFO', 'API_CALL', "
+                "'GET /api/results - Success in ' || (i % 900) || 'ms', '{\"request\": ' || i || '}' FROM n",
+                [rows])
+
+        response = self.client.get(reverse('management:export_data', args=['logs']), {'gzip': '1'})
+        baseline = peak = _resident_bytes()
+        chunks = compressed = 0
+        for chunk in response.streaming_content:
+            chunks += 1
+            compressed += len(chunk)
+            if chunks % 20 == 0:
+                peak = max(peak, _resident_bytes())
+        response.close()
+
+        compressed_mib = compressed / 2 ** 20
+        growth_mib = (peak - baseline) / 2 ** 20
+        print(f"\nExport of {rows} rows: {compressed_mib:.1f} MiB gzipped in {chunks} chunks, "
+              f"peak RSS growth {growth_mib:.1f} MiB")
+        self.assertGreater(chunks, 10)
+        self.assertLess(growth_mib, 32)
+
+
+class QueryPlanTests(TestCase):
+    """The admin views' queries must stay index-backed"""
+
+    def test_view_queries_use_indexes(self):
+        out = StringIO()
+        call_command('audit_query_plans', stdout=out)
+        self.assertNotIn('FAIL', out.getvalue())
+
+
+@override_settings(SYSTEM_LOG_BUFFER=INLINE_LOGS)
+class VotingAPIServiceTests(TestCase):
+    """Tests for the pooled backend HTTP client"""
+
+    def test_services_share_one_session(self):
+        self.assertIs(VotingAPIService().session, VotingAPIService().session)
+
+    def test_endpoints_use_their_own_timeouts(self):
+        with StubVotingBackend(votes=3) as backend, self.settings(VOTING_API_BASE_URL=backend.base_url):
+            api = VotingAPIService()
+            with mock.patch.object(api.session, 'get', wraps=api.session.get) as get:
+                api.health_check()
+                api.get_all_votes()
+
+        self.assertEqual(get.call_args_list[0].kwargs['timeout'], (1, 2))
+        self.assertEqual(get.call_args_list[1].kwargs['timeout'], (3.05, 30))
+
+    def test_connections_are_reused(self):
+        with StubVotingBackend() as backend, self.settings(VOTING_API_BASE_URL=backend.base_url):
+            api = VotingAPIService()
+            for _ in range(5):
+                api.get_results()
+
+        self.assertEqual(backend.requests, 5)
+        self.assertEqual(backend.connections, 1)
+
+    def test_read_timeouts_are_not_retried(self):
+        timeouts = {**settings.VOTING_API_TIMEOUTS, 'get_results': (1, 0.2)}
+        with mock.patch.object(services, '_session', None), \
+                StubVotingBackend(latency={'results': 1}) as backend, \
+                self.settings(CACHES=TEST_CACHES, VOTING_API_BASE_URL=backend.base_url, VOTING_API_RETRIES=2,
+                              VOTING_API_TIMEOUTS=timeouts):
+            caches['stats'].clear()
+            started = time.monotonic()
+            with self.assertRaises(Exception):
+                VotingAPIService().get_results()
+            # Three reads of 0.2s each if retried
+            self.assertLess(time.monotonic() - started, 0.4)
+
+
+@override_settings(CACHES=TEST_CACHES, VOTING_API_BASE_URL='http://127.0.0.1:9', VOTING_API_RETRIES=0,
+                   VOTING_API_CIRCUIT_BREAKER={'ENABLED': True, 'FAILURE_THRESHOLD': 2, 'RECOVERY_TIMEOUT': 60,
+                                               'PROBE_TIMEOUT': 60})
+@mock.patch('management.services.write_log')
+@mock.patch('management.circuit_breaker.write_log')
+class CircuitBreakerTests(TestCase):
+    """Tests for the backend circuit breaker (management/circuit_breaker.py)"""
+
+    def setUp(self):
+        caches['stats'].clear()
+
+    def trip(self, api):
+        for _ in range(2):
+            with self.assertRaises(Exception):
+                api.get_results()
+
+    def test_opens_after_consecutive_failures_and_fails_fast(self, breaker_log, service_log):
+        api = VotingAPIService()
+        self.trip(api)
+        self.assertEqual(api.breaker.state, 'open')
+        self.assertEqual(breaker_log.call_args.kwargs['action_type'], 'CIRCUIT_BREAKER')
+        self.assertEqual(breaker_log.call_args.kwargs['details']['to'], 'open')
+
+        # Another worker's service sees the shared state and never calls the backend
+        other = VotingAPIService()
+        with mock.patch.object(other.session, 'get') as get, self.assertRaises(CircuitOpenError):
+            other.health_check()
+        get.assert_not_called()
+
+    def test_half_open_probe_closes_or_reopens(self, breaker_log, service_log):
+        api = VotingAPIService()
+        self.trip(api)
+        api.breaker.recovery_timeout = 0
+
+        # Failed probe: open again
+        with self.assertRaises(Exception):
+            api.get_results()
+        self.assertEqual(api.breaker.state, 'open')
+
+        with StubVotingBackend(votes=1) as backend:
+            api.base_url = backend.base_url
+            api.get_results()
+        self.assertEqual(api.breaker.state, 'closed')
+        transitions = [c.kwargs['details']['to'] for c in breaker_log.call_args_list]
+        self.assertEqual(transitions, ['open', 'half_open', 'open', 'half_open', 'closed'])
+
+    def test_only_one_probe_at_a_time(self, breaker_log, service_log):
+        api = VotingAPIService()
+        self.trip(api)
+        api.breaker.recovery_timeout = 0
+        api.breaker.before_call()  # This caller is probing
+        self.assertEqual(api.breaker.state, 'half_open')
+        with self.assertRaises(CircuitOpenError):
+            VotingAPIService().breaker.before_call()
+
+    def test_client_errors_do_not_count(self, breaker_log, service_log):
+        with StubVotingBackend() as backend:
+            api = VotingAPIService()
+            api.base_url = backend.base_url
+            for _ in range(3):
+                with self.assertRaises(Exception):
+                    api._make_request('GET', '/api/missing')
+        self.assertEqual(api.breaker.state, 'closed')
+
+    def test_dashboard_serves_stale_local_data_while_open(self, breaker_log, service_log):
+        VoteResults.objects.create(team_id='team-a', team_name='Team 01', vote_count=3, percentage=100.0,
+                                   total_votes=3)
+        self.trip(VotingAPIService())
+
+        with mock.patch('requests.Session.get') as get:
+            started = time.perf_counter()
+            stats = VotingDataService().get_dashboard_stats()
+            elapsed = time.perf_counter() - started
+        get.assert_not_called()
+        self.assertLess(elapsed, 1)
+        self.assertEqual(stats['total_votes'], 3)
+        self.assertTrue(stats['stale'])
+        self.assertFalse(stats['backend_connected'])
+        self.assertEqual(stats['circuit']['state'], 'open')
+
+        response = self.client.get(reverse('management:health_check_ajax'))
+        self.assertEqual(response.json()['circuit']['state'], 'open')
+
+
+@override_settings(CACHES=TEST_CACHES, SYSTEM_LOG_BUFFER=INLINE_LOGS)
+class SyncWorkerTests(TestCase):
+    """Tests for the background sync worker (management/sync_worker.py)"""
+
+    def setUp(self):
+        caches['stats'].clear()
+
+    def test_syncs_every_task_and_bumps_version_only_on_change(self):
+        stats_cache = SingleFlightCache()
+        with StubVotingBackend(votes=6) as backend, self.settings(VOTING_API_BASE_URL=backend.base_url):
+            worker = SyncWorker()
+            version = stats_cache.version()
+            self.assertEqual(worker.run_due(), {'results': True, 'votes': True, 'devices': True, 'tallies': True,
+                                                'rounds': True})
+            self.assertGreater(stats_cache.version(), version)
+
+            # Nothing changed on the backend: no rewrite, no new version, no log rows
+            version = stats_cache.version()
+            logs = SystemLog.objects.count()
+            for task in worker.tasks:
+                worker.run_task(task)
+            self.assertEqual(stats_cache.version(), version)
+            self.assertEqual(SystemLog.objects.count(), logs)
+
+        self.assertEqual(Vote.objects.count(), 6)
+        self.assertEqual(sum(VoteResults.objects.values_list('vote_count', flat=True)), 6)
+        devices = SyncStatus.objects.get(task='devices')
+        self.assertEqual(devices.data['totalUniqueDevices'], 6)
+        self.assertTrue(all(status.healthy for status in SyncStatus.objects.all()))
+
+    @mock.patch('management.services.write_log')
+    @mock.patch('management.circuit_breaker.write_log')
+    def test_failures_back_off_with_jitter(self, breaker_log, service_log):
+        with self.settings(VOTING_API_BASE_URL='http://127.0.0.1:9', VOTING_API_RETRIES=0):
+            worker = SyncWorker(tasks=['results'], intervals={'results': 10}, jitter=0.1)
+            for failures in (1, 2):
+                self.assertFalse(worker.run_task('results'))
+                delay = (worker._next_run['results'] - time.monotonic())
+                self.assertTrue(10 * 2 ** failures * 0.85 < delay <= 10 * 2 ** failures * 1.1, delay)
+
+        status = SyncStatus.objects.get(task='results')
+        self.assertEqual(status.consecutive_failures, 2)
+        self.assertIn('Connection refused', status.last_error)
+        self.assertIsNone(status.last_success_at)
+
+    def test_only_one_worker_holds_the_lock(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'sync_worker.lock')
+            with worker_lock(path):
+                with self.assertRaises(WorkerAlreadyRunning):
+                    with worker_lock(path):
+                        pass
+            with worker_lock(path):
+                pass
+
+    def test_local_reads_never_call_the_backend(self):
+        with StubVotingBackend(votes=4) as backend, self.settings(VOTING_API_BASE_URL=backend.base_url):
+            SyncWorker().run_due()
+
+        with self.settings(SYNC_WORKER={**settings.SYNC_WORKER, 'LOCAL_READS': True}), \
+                mock.patch('requests.Session.request') as request:
+            stats = self.client.get(reverse('management:dashboard_stats_ajax')).json()['stats']
+            health = self.client.get(reverse('management:health_check_ajax'))
+            devices = self.client.get(reverse('management:device_stats_ajax')).json()['stats']
+            for name in ('dashboard', 'results', 'admin_actions'):
+                self.assertEqual(self.client.get(reverse(f'management:{name}')).status_code, 200)
+        request.assert_not_called()
+
+        self.assertEqual(stats['total_votes'], 4)
+        self.assertEqual(stats['unique_voters'], 4)
+        self.assertTrue(stats['backend_connected'])
+        self.assertFalse(stats['stale'])
+        self.assertEqual(health.status_code, 200)
+        self.assertTrue(health.json()['health']['sync_worker_running'])
+        self.assertEqual(devices['totalUniqueDevices'], 4)
+
+        # The worker stopped reporting: the data is stale and the backend status unknown
+        SyncStatus.objects.update(last_attempt_at=timezone.now() - timezone.timedelta(hours=1))
+        caches['stats'].clear()
+        with self.settings(SYNC_WORKER={**settings.SYNC_WORKER, 'LOCAL_READS': True}):
+            stats = VotingDataService().get_dashboard_stats()
+            health = self.client.get(reverse('management:health_check_ajax'))
+        self.assertTrue(stats['stale'])
+        self.assertFalse(stats['backend_connected'])
+        self.assertEqual(health.status_code, 503)
+
+
+@override_settings(CACHES=TEST_CACHES, TALLY_SHARDS=4)
+class TallyTests(TestCase):
+    """Tests for the sharded vote counters (management/tallies.py)"""
+
+    def setUp(self):
+        caches['stats'].clear()
+        self._previous_engine = ingestion._engine
+        ingestion._engine = ingestion.VoteIngestionEngine(refresh_interval=0)
+
+    def tearDown(self):
+        ingestion._engine = self._previous_engine
+
+    def test_increments_spread_over_shards_and_compact_exactly(self):
+        for i in range(40):
+            tallies.increment('team-a')
+        tallies.increment('team-b', 2)
+        self.assertLessEqual(TallyShard.objects.filter(team_id='team-a').count(), 4)
+        self.assertEqual(tallies.read_tallies(), {'team-a': 40, 'team-b': 2})
+
+        self.assertEqual(tallies.compact(), {'team-a': 40, 'team-b': 2})
+        self.assertEqual(tallies.pending(), {})
+        self.assertEqual(tallies.compact(), {})
+
+        tallies.increment('team-b')
+        self.assertEqual(tallies.read_tallies(), {'team-a': 40, 'team-b': 3})
+        tallies.compact()
+        team_a = VoteResults.objects.get(team_id='team-a')
+        self.assertEqual((team_a.vote_count, team_a.total_votes, team_a.percentage), (40, 43, 93))
+        self.assertEqual(team_a.team_name, 'Team 01')
+
+    def test_ingested_votes_reach_the_local_results(self):
+        engine = ingestion.get_engine()
+        engine.submit_vote('team-a', 'team-b', 'device-1')
+        engine.submit_vote('team-c', 'team-b', 'device-2')
+        with self.assertRaises(ingestion.VoteRejected):
+            engine.submit_vote('team-c', 'team-a', 'device-2')  # Rolled back with its vote
+
+        results, total = tallies.current_results()
+        self.assertEqual(total, 2)
+        self.assertEqual(results[0], {'teamId': 'team-b', 'teamName': 'Team 02', 'votes': 2, 'percentage': 100})
+        self.assertEqual(VotingDataService()._local_dashboard_stats()['total_votes'], 2)
+
+        engine.reset_votes()
+        self.assertEqual(tallies.read_tallies(), {})
+
+    @mock.patch('management.services.write_log')
+    def test_backend_results_snapshot_replaces_pending_counts(self, write_log):
+        tallies.increment('team-a', 5)
+        with StubVotingBackend(votes=4) as backend, self.settings(VOTING_API_BASE_URL=backend.base_url):
+            VotingDataService().sync_results_from_backend()
+        self.assertEqual(tallies.pending(), {})
+        self.assertEqual(sum(tallies.read_tallies().values()), 4)
+
+    def test_multi_process_stress_counts_are_exact(self):
+        out = StringIO()
+        call_command('benchmark_tallies', processes=3, increments=40, modes='sharded', json=True, stdout=out)
+        result = json.loads(out.getvalue())['modes']['sharded']
+        self.assertTrue(result['exact'], result)
+        self.assertEqual(sum(result['counts'].values()), 120)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RoundTests(TestCase):
+    """Tests for voting rounds (management/rounds.py)"""
+
+    def setUp(self):
+        caches['stats'].clear()
+        self._previous_engine = ingestion._engine
+        ingestion._engine = ingestion.VoteIngestionEngine(refresh_interval=0)
+
+    def tearDown(self):
+        ingestion._engine = self._previous_engine
+
+    def vote_in_new_round(self, votes):
+        engine = ingestion.get_engine()
+        engine.reset_votes()
+        for i in range(votes):
+            engine.submit_vote('team-a', 'team-b', f'device-{i}', name=f'Voter {i}')
+        return rounds.active_round()
+
+    def test_reset_opens_a_round_without_deleting(self):
+        first = self.vote_in_new_round(3)
+        engine = ingestion.get_engine()
+
+        with CaptureQueriesContext(connection) as captured:
+            engine.reset_votes()
+        self.assertFalse([query for query in captured.captured_queries if query['sql'].startswith('DELETE')])
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'archived')
+        self.assertEqual(first.summary, {'total_votes': 3, 'results': {'team-b': 3}})
+        self.assertEqual(Vote.objects.in_round(first.pk).count(), 3)
+        self.assertFalse(Vote.objects.in_round().exists())
+        self.assertFalse(VoterAggregate.objects.in_round().exists())
+        self.assertEqual(engine.results()[1], 0)
+        self.assertEqual(tallies.current_results(), ([], 0))
+
+        # Voters of the previous round may vote again
+        engine.submit_vote('team-a', 'team-c', 'device-0')
+        self.assertEqual(engine.results(), ({'team-a': 0, 'team-b': 0, 'team-c': 1, 'team-d': 0}, 1))
+        response = self.client.get(reverse('management:votes_list'))
+        self.assertEqual(len(response.context['votes']), 1)
+
+    def test_other_workers_see_the_new_round(self):
+        self.vote_in_new_round(2)
+        other = ingestion.VoteIngestionEngine(refresh_interval=0)
+        self.assertEqual(other.results()[1], 2)
+
+        ingestion.get_engine().reset_votes()
+        self.assertEqual(other.results()[1], 0)
+        self.assertFalse(other.has_voted('device-0'))
+
+    @mock.patch('management.rounds.write_log')
+    def test_purge_deletes_old_rounds_in_batches(self, write_log):
+        oldest = self.vote_in_new_round(5)
+        kept = self.vote_in_new_round(2)
+        active = self.vote_in_new_round(1)
+        tallies.compact()
+
+        with CaptureQueriesContext(connection) as captured:
+            purged = rounds.purge_rounds(keep=1, batch_size=2)
+        deletes = [query for query in captured.captured_queries
+                   if query['sql'].startswith('DELETE FROM "management_vote"')]
+
+        self.assertIn(oldest.pk, purged)
+        self.assertNotIn(kept.pk, purged)
+        self.assertEqual(len(deletes), 3)  # 5 votes, 2 per batch
+        oldest.refresh_from_db()
+        self.assertEqual(oldest.status, 'purged')
+        self.assertEqual(oldest.summary['total_votes'], 5)
+        for model in rounds.PURGE_ORDER:
+            self.assertFalse(model.objects.in_round(oldest.pk).exists())
+        self.assertEqual(Vote.objects.in_round(kept.pk).count(), 2)
+        self.assertEqual(Vote.objects.in_round(active.pk).count(), 1)
+        self.assertEqual(tallies.read_tallies(), {'team-b': 1})
+        self.assertEqual(rounds.purge_rounds(keep=1), [])
+
+        with self.assertRaises(ValueError):
+            rounds.purge_round(active)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GroupCommitTests(TestCase):
+    """
+    Tests for batched vote commits (ingestion.GroupCommitter). The flusher
+    thread isn't started: the test flushes the queue itself, so submitters
+    only wait and every query runs on the test's connection.
+    """
+
+    def setUp(self):
+        caches['stats'].clear()
+        self._previous_engine = ingestion._engine
+        # Loaded up front and not refreshed again by the submitting threads
+        self.engine = ingestion._engine = ingestion.VoteIngestionEngine(refresh_interval=3600)
+        self.engine.results()
+        self.committer = ingestion.GroupCommitter(self.engine, batch_size=3)
+        self.engine._committer, self.engine._committer_pid = self.committer, os.getpid()
+
+    def tearDown(self):
+        ingestion._engine = self._previous_engine
+
+    def submit_in_background(self, submit, *votes):
+        """Run ``submit(*vote)`` per vote in threads, queued in the order given"""
+        executor = ThreadPoolExecutor(max_workers=len(votes))
+        self.addCleanup(executor.shutdown)
+        futures = []
+        for queued, vote in enumerate(votes, start=1):
+            futures.append(executor.submit(submit, *vote))
+            deadline = time.monotonic() + 5
+            while self.committer.pending() < queued and time.monotonic() < deadline:
+                time.sleep(0.001)
+            self.assertEqual(self.committer.pending(), queued)
+        return futures
+
+    def outcome(self, future):
+        try:
+            return future.result(timeout=5).user_identifier
+        except ingestion.VoteRejected as e:
+            return e.status
+
+    def test_batches_share_a_transaction(self):
+        Vote.objects.create(vote_id='v-0', user_team='team-a', voted_for='team-b', user_identifier='device-0')
+
+        def submit(user_identifier, voted_for):
+            return self.committer.submit(Vote(vote_id=f'v-{user_identifier}-{voted_for}', user_team='team-a',
+                                              voted_for=voted_for, user_identifier=user_identifier))
+        futures = self.submit_in_background(submit, ('device-0', 'team-b'), ('device-1', 'team-b'),
+                                            ('device-1', 'team-c'), ('device-2', 'team-c'),
+                                            ('device-3', 'team-d'))
+
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.committer.flush(), 3)
+        inserts = [query for query in captured.captured_queries
+                   if query['sql'].startswith('INSERT INTO "management_vote"')]
+
+        self.assertEqual(len(inserts), 2)  # Batches of at most 3
+        # Already in the database, and a second vote within the batch
+        self.assertEqual([self.outcome(future) for future in futures],
+                         [409, 'device-1', 409, 'device-2', 'device-3'])
+        self.assertEqual(self.engine.results(), ({'team-a': 0, 'team-b': 2, 'team-c': 1, 'team-d': 1}, 4))
+        self.assertEqual(tallies.read_tallies(), {'team-b': 1, 'team-c': 1, 'team-d': 1})
+        self.assertEqual(Vote.objects.in_round().count(), 4)
+
+    def test_votes_fail_with_their_batch(self):
+        def submit(user_identifier):
+            return self.committer.submit(Vote(vote_id=f'v-{user_identifier}', user_team='team-a',
+                                              voted_for='team-b', user_identifier=user_identifier))
+        futures = self.submit_in_background(submit, ('device-1',), ('device-2',))
+
+        # Fails before any vote of the batch is looked at
+        with mock.patch('management.ingestion.active_round_id', side_effect=Exception('database is locked')):
+            self.assertEqual(self.committer.flush(), 0)
+
+        for future in futures:
+            with self.assertRaisesMessage(Exception, 'database is locked'):
+                future.result(timeout=5)
+        self.assertFalse(Vote.objects.exists())
+
+    def test_engine_rejects_queued_voters(self):
+        def vote(user_identifier):
+            # Threads have their own connections, outside the test's transaction
+            return self.engine.submit_vote('team-a', 'team-b', user_identifier)
+        futures = self.submit_in_background(vote, ('device-1',))
+        # Not yet in the database, nor in the engine's voters
+        with self.assertRaises(ingestion.VoteRejected) as rejected:
+            self.engine._submit_to_group(self.committer, 'team-a', 'team-c', 'device-1', None, None)
+        self.assertEqual(rejected.exception.status, 409)
+
+        self.committer.flush()
+        self.assertEqual(self.outcome(futures[0]), 'device-1')
+        self.assertTrue(self.engine.has_voted('device-1'))
+        self.assertFalse(self.engine._pending)
+
+    def test_transactions_commit_their_own_votes(self):
+        with transaction.atomic():
+            self.engine.submit_vote('team-a', 'team-b', 'device-1')
+        self.assertEqual(self.committer.pending(), 0)
+        self.assertTrue(Vote.objects.filter(user_identifier='device-1').exists())
+
+    def test_rejects_unknown_synchronous_level(self):
+        with self.assertRaises(ValueError):
+            ingestion.GroupCommitter(self.engine, synchronous='SOMETIMES')
+
+    def test_full_queue_is_rejected(self):
+        committer = ingestion.GroupCommitter(self.engine, max_queue=1, put_timeout=0.01, commit_timeout=0.01)
+        with self.assertRaises(ingestion.VoteRejected) as unconfirmed:
+            committer.submit(Vote(vote_id='v-1', user_team='team-a', voted_for='team-b', user_identifier='d-1'))
+        with self.assertRaises(ingestion.VoteRejected) as full:
+            committer.submit(Vote(vote_id='v-2', user_team='team-a', voted_for='team-b', user_identifier='d-2'))
+        self.assertEqual((unconfirmed.exception.status, full.exception.status), (503, 503))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TeamRegistryTests(TestCase):
+    """Tests for the Team table and its process-wide registry (management/teams.py)"""
+
+    def setUp(self):
+        caches['stats'].clear()
+        teams.invalidate()
+        self.addCleanup(teams.invalidate)
+        self._previous_engine = ingestion._engine
+        ingestion._engine = ingestion.VoteIngestionEngine(refresh_interval=0)
+
+    def tearDown(self):
+        ingestion._engine = self._previous_engine
+
+    def test_lookups_both_ways(self):
+        registry = teams.get_registry()
+        self.assertEqual(list(registry), ['team-a', 'team-b', 'team-c', 'team-d'])
+        self.assertEqual(registry.name('team-b'), 'Team 02')
+        self.assertEqual(registry.name('team-z'), 'team-z')
+        self.assertEqual(registry.id_for('Team 03'), 'team-c')
+        self.assertEqual(registry.id_for('team-c'), 'team-c')
+        self.assertEqual(registry.id_for('New Team'), 'new-team')
+        self.assertIs(teams.get_registry(), registry)
+        with self.assertRaises(TypeError):
+            registry.names['team-e'] = 'Team 05'
+
+    def test_saving_or_deleting_a_team_reloads_the_registry(self):
+        team = Team.objects.create(team_id='team-e', name='Team 05', position=4)
+        self.assertEqual(teams.get_registry().name('team-e'), 'Team 05')
+        vote = ingestion.get_engine().submit_vote('team-a', 'team-e', 'device-1')
+        self.assertEqual(vote.voted_for_display_name, 'Team 05')
+        self.assertEqual(ingestion.get_engine().results()[0]['team-e'], 1)
+
+        team.name = 'Team Five'
+        team.save()
+        response = self.client.get(reverse('management:votes_list'))
+        self.assertContains(response, 'Team Five')
+
+        Vote.objects.all().delete()
+        team.delete()
+        self.assertNotIn('team-e', teams.get_registry())
+        with self.assertRaises(ingestion.VoteRejected):
+            ingestion.get_engine().submit_vote('team-a', 'team-e', 'device-2')
+
+    def test_other_processes_reload_when_the_shared_version_moves(self):
+        registry = teams.get_registry()
+        # Another process renames a team: this one only sees the version bump
+        Team.objects.filter(team_id='team-a').update(name='Renamed')
+        caches['stats'].set(teams.VERSION_KEY, 1, timeout=None)
+
+        with override_settings(TEAM_REGISTRY_RECHECK_INTERVAL=60):
+            self.assertIs(teams.get_registry(), registry)
+        with override_settings(TEAM_REGISTRY_RECHECK_INTERVAL=0):
+            self.assertEqual(teams.get_registry().name('team-a'), 'Renamed')
+
+    def test_pages_list_every_team(self):
+        Team.objects.bulk_create([Team(team_id=f't{i:03d}', name=f'Extra {i:03d}', position=10 + i)
+                                  for i in range(50)])
+        teams.invalidate()
+        Vote.objects.create(vote_id='v-1', user_team='t007', voted_for='team-a', user_identifier='d-1')
+
+        response = self.client.get(reverse('management:votes_list'))
+        self.assertEqual(len(response.context['team_choices']), 54)
+        self.assertContains(response, 'Extra 049')
+        self.assertEqual(response.context['votes'][0].team_display_name, 'Extra 007')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AnalyticsTests(TestCase):
+    """Tests for the vectorized vote analytics (management/analytics.py)"""
+
+    def setUp(self):
+        caches['stats'].clear()
+        analytics._loader = None
+        self.addCleanup(setattr, analytics, '_loader', None)
+        self.start = timezone.now().replace(second=0, microsecond=0) - timezone.timedelta(hours=1)
+
+    def votes(self, *votes):
+        """(minute offset, user_team, voted_for) triples"""
+        Vote.objects.bulk_create([
+            Vote(vote_id=f'v-{Vote.objects.count()}-{i}', user_team=user_team, voted_for=voted_for,
+                 user_identifier=f'd-{i}', timestamp=self.start + timezone.timedelta(minutes=minute, seconds=i % 60))
+            for i, (minute, user_team, voted_for) in enumerate(votes)
+        ])
+
+    def test_reports(self):
+        self.votes((0, 'team-a', 'team-b'), (0, 'team-c', 'team-b'), (1, 'team-b', 'team-a'),
+                   (3, 'team-b', 'team-a'), (3, 'team-d', 'team-a'))
+        frame = analytics.get_frame()
+        self.assertEqual(frame.total, 5)
+        self.assertEqual(frame.user_team.dtype, analytics.TEAM_CODE)
+
+        per_minute = analytics.votes_per_minute(frame)
+        self.assertEqual(per_minute['bucket_minutes'], 1)
+        self.assertEqual(per_minute['votes'], [2, 1, 0, 2])
+        self.assertEqual(per_minute['votes_by_team'][0], [0, 1, 0, 2])
+        self.assertEqual(per_minute['labels'][0], self.start.strftime('%Y-%m-%dT%H:%MZ'))
+
+        share = analytics.cumulative_share(frame)
+        self.assertEqual([series[-1] for series in share['share']], [60.0, 40.0, 0.0, 0.0])
+        self.assertEqual(share['share'][1][0], 100.0)
+
+        matrix = analytics.team_matrix(frame)
+        self.assertEqual(matrix['teams'], ['Team 01', 'Team 02', 'Team 03', 'Team 04'])
+        self.assertEqual(matrix['matrix'][1], [2, 0, 0, 0])
+        self.assertEqual(matrix['cast'], [1, 2, 1, 1])
+        self.assertEqual(matrix['received'], [3, 2, 0, 0])
+
+        # Team 02 leads, ties at 2-2 after minute 1 (no change), then Team 01 leads
+        leaders = analytics.leader_changes(frame)
+        self.assertEqual(leaders['leader'], 'Team 01')
+        self.assertEqual([(change['from'], change['to']) for change in leaders['changes']],
+                         [(None, 'Team 02'), ('Team 02', 'Team 01')])
+        self.assertEqual(leaders['changes'][1]['votes'], 3)
+
+    def test_frame_appends_new_votes_and_reloads_for_a_new_round(self):
+        self.votes((0, 'team-a', 'team-b'))
+        first = analytics.get_frame()
+        self.assertIs(analytics.get_frame(), first)
+
+        self.votes((2, 'team-b', 'team-c'))
+        with CaptureQueriesContext(connection) as captured:
+            frame = analytics.get_frame()
+        self.assertEqual(frame.total, 2)
+        grouped = [query['sql'] for query in captured.captured_queries if 'GROUP BY' in query['sql']]
+        self.assertEqual(len(grouped), 1)
+        self.assertIn('"management_vote"."id" >', grouped[0])
+
+        with override_settings(ANALYTICS={'MAX_POINTS': 2}):
+            self.assertEqual(analytics.votes_per_minute(frame)['bucket_minutes'], 2)
+
+        rounds.open_round()
+        self.assertEqual(analytics.get_frame().total, 0)
+        self.assertEqual(analytics.leader_changes(analytics.get_frame()),
+                         {'bucket_minutes': 1, 'leader': None, 'changes': []})
+
+    def test_endpoint_caches_per_data_version(self):
+        self.votes((0, 'team-a', 'team-b'))
+        url = reverse('management:analytics_ajax', args=['matrix'])
+        self.assertEqual(self.client.get(url).json()['cast'], [1, 0, 0, 0])
+
+        with mock.patch('management.analytics.get_frame') as get_frame:
+            self.assertEqual(self.client.get(url).json()['total_votes'], 1)
+        get_frame.assert_not_called()
+
+        self.votes((1, 'team-c', 'team-d'))
+        response = self.client.get(url).json()
+        self.assertEqual(response['total_votes'], 2)
+        self.assertEqual(response['report'], 'matrix')
+
+        self.assertEqual(self.client.get(reverse('management:analytics_ajax', args=['nope'])).status_code, 404)
+
+
+class RateLimiterTests(TestCase):
+    """Tests for the shared sliding-window counters (management/ratelimit.py)"""
+
+    def setUp(self):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        self.path = os.path.join(workdir, 'ratelimit.bin')
+        self.limiter = self.open()
+
+    def open(self):
+        limiter = ratelimit.SlidingWindowLimiter(self.path, 1024)
+        self.addCleanup(limiter.close)
+        return limiter
+
+    def test_client_address_trusts_forwarded_for_only_from_proxies(self):
+        factory = RequestFactory()
+        spoofed = factory.get('/', REMOTE_ADDR='203.0.113.7', HTTP_X_FORWARDED_FOR='198.51.100.1')
+        self.assertEqual(ratelimit.client_address(spoofed), '203.0.113.7')
+
+        proxies = {**settings.RATE_LIMIT, 'TRUSTED_PROXIES': ['127.0.0.1', '10.0.0.0/8']}
+        with self.settings(RATE_LIMIT=proxies):
+            self.assertEqual(ratelimit.client_address(spoofed), '203.0.113.7')
+            # The client prepended a fake hop; the proxies appended the real one
+            proxied = factory.get('/', REMOTE_ADDR='127.0.0.1',
+                                  HTTP_X_FORWARDED_FOR='198.51.100.1, 203.0.113.7, 10.1.2.3')
+            self.assertEqual(ratelimit.client_address(proxied), '203.0.113.7')
+            self.assertEqual(ratelimit.client_address(factory.get('/', REMOTE_ADDR='127.0.0.1')), '127.0.0.1')
+
+    def test_window_slides(self):
+        for _ in range(10):
+            self.assertIsNone(self.limiter.hit('ip:a', 10, 60, now=6000))
+        # Over the limit until just after the next window starts at 6060
+        self.assertEqual(self.limiter.hit('ip:a', 10, 60, now=6001), 60)
+        self.assertIsNone(self.limiter.hit('ip:b', 10, 60, now=6001))
+        self.assertIsNone(self.limiter.hit('ip:a', 10, 60, now=6061))
+
+        # Halfway through that window half of the previous ten still count
+        for _ in range(4):
+            self.assertIsNone(self.limiter.hit('ip:a', 10, 60, now=6090))
+        self.assertEqual(self.limiter.hit('ip:a', 10, 60, now=6090), 1)
+        # Two windows later nothing counts
+        self.assertIsNone(self.limiter.hit('ip:a', 10, 60, now=6200))
+
+    def test_counts_are_shared_between_processes(self):
+        other_worker = self.open()
+        self.assertIsNone(self.limiter.hit('identifier:x', 2, 60, now=100))
+        self.assertIsNone(other_worker.hit('identifier:x', 2, 60, now=101))
+        self.assertIsNotNone(self.limiter.hit('identifier:x', 2, 60, now=102))
+
+    def test_check_costs_microseconds(self):
+        started = time.perf_counter()
+        for i in range(2000):
+            self.limiter.hit(f'ip:{i % 50}', 1000, 60)
+        # Typically ~10us; generous for slow CI machines
+        self.assertLess((time.perf_counter() - started) / 2000, 0.0005)
+
+    def test_disabled_or_unlimited_routes_are_not_counted(self):
+        routes = {'vote': {'ip': (1, 60)}}
+        with self.settings(RATE_LIMIT={**settings.RATE_LIMIT, 'PATH': self.path, 'SLOTS': 1024, 'ROUTES': routes}):
+            self.assertIsNone(ratelimit.check('vote', ip='10.0.0.1'))
+            self.assertIsNotNone(ratelimit.check('vote', ip='10.0.0.1'))
+            self.assertIsNone(ratelimit.check('vote', ip=None))
+            self.assertIsNone(ratelimit.check('vote_status', ip='10.0.0.1'))
+        with self.settings(RATE_LIMIT={**settings.RATE_LIMIT, 'PATH': self.path, 'SLOTS': 1024,
+                                       'ROUTES': routes, 'ENABLED': False}):
+            self.assertIsNone(ratelimit.check('vote', ip='10.0.0.1'))
+
+class SQLiteProfileTests(TestCase):
+    """Tests for the connection PRAGMA profiles (management/sqlite.py)"""
+
+    def test_new_connections_get_the_tuned_pragmas(self):
+        values = sqlite.current_pragmas(connection)
+        self.assertEqual(values['busy_timeout'], '5000')
+        self.assertEqual(values['synchronous'], '1')  # NORMAL
+        self.assertEqual(values['temp_store'], '2')  # MEMORY
+        self.assertEqual(values['cache_size'], '-32000')
+
+    def test_wal_on_a_file_database(self):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        settings_dict = {**connection.settings_dict, 'NAME': os.path.join(workdir, 'wal.sqlite3')}
+        other = type(connections['default'])(settings_dict, alias='wal_test')
+        self.addCleanup(other.close)
+        self.assertEqual(sqlite.current_pragmas(other, ['journal_mode']), {'journal_mode': 'wal'})
+
+    @override_settings(SQLITE_PRAGMAS={'mmap_size': 0, 'wal_autocheckpoint': 2000})
+    def test_overrides_and_validation(self):
+        pragmas = sqlite.get_pragmas('tuned')
+        self.assertEqual((pragmas['mmap_size'], pragmas['wal_autocheckpoint']), ('0', '2000'))
+        self.assertEqual(sqlite.get_pragmas('default'), {'mmap_size': '0', 'wal_autocheckpoint': '2000'})
+        with self.assertRaises(ImproperlyConfigured):
+            sqlite.get_pragmas('fastest')
+        with self.settings(SQLITE_PRAGMAS={'journal_mode': 'WAL; DROP TABLE x'}):
+            with self.assertRaises(ImproperlyConfigured):
+                sqlite.get_pragmas()
+
+    def test_benchmark_runs_each_profile(self):
+        out = StringIO()
+        call_command('benchmark_sqlite', readers=1, writers=1, operations=5, seed_votes=50, conn_max_age='60',
+                     json=True, stdout=out)
+        runs = json.loads(out.getvalue())['runs']
+        self.assertEqual([run['profile'] for run in runs], list(sqlite.PROFILES))
+        for run in runs:
+            self.assertEqual(run['reads']['requests'] + run['writes']['requests'] + run['locked_errors'], 10)
+
+
+class SystemLogWriterTests(TestCase):
+    """Tests for the buffered SystemLog writer (flusher thread not started)"""
+
+    def test_records_are_written_on_flush(self):
+        writer = SystemLogWriter(batch_size=10)
+        for i in range(3):
+            writer.write(level='INFO', action_type='API_CALL', message=f'call {i}')
+        self.assertFalse(SystemLog.objects.exists())
+
+        with self.assertNumQueries(3):  # savepoint, one bulk INSERT, release
+            self.assertEqual(writer.flush(), 3)
+        self.assertEqual(SystemLog.objects.count(), 3)
+
+    def test_full_queue_flushes_inline(self):
+        writer = SystemLogWriter(batch_size=10, max_queue=2, put_timeout=0.01)
+        for i in range(3):
+            writer.write(level='INFO', action_type='API_CALL', message=f'call {i}')
+
+        self.assertEqual(SystemLog.objects.count(), 2)
+        self.assertEqual(writer.pending(), 1)
+        writer.stop()
+        self.assertEqual(SystemLog.objects.count(), 3)
+
+    def test_failed_batches_are_retried(self):
+        writer = SystemLogWriter(batch_size=10)
+        for i in range(3):
+            writer.write(level='INFO', action_type='API_CALL', message=f'call {i}')
+
+        with mock.patch.object(SystemLog.objects, 'bulk_create', side_effect=Exception('database is locked')):
+            self.assertEqual(writer.flush(), 0)
+        self.assertEqual(writer.pending(), 3)
+
+        writer.write(level='INFO', action_type='API_CALL', message='call 3')
+        self.assertEqual(writer.flush(), 4)
+        self.assertEqual(list(SystemLog.objects.order_by('id').values_list('message', flat=True)),
+                         ['call 0', 'call 1', 'call 2', 'call 3'])
+
+    def test_rows_are_written_one_by_one_after_repeated_failures(self):
+        writer = SystemLogWriter(batch_size=10, max_attempts=2)
+        for i in range(3):
+            writer.write(level='INFO', action_type='API_CALL', message=f'call {i}')
+        bulk_create = SystemLog.objects.bulk_create
+
+        def reject_call_1(records):
+            if any(record.message == 'call 1' for record in records):
+                raise Exception('bad row')
+            return bulk_create(records)
+
+        with mock.patch.object(SystemLog.objects, 'bulk_create', side_effect=reject_call_1):
+            self.assertEqual(writer.flush(), 0)
+            self.assertEqual(writer.flush(), 2)
+        self.assertEqual(writer.pending(), 0)
+        self.assertEqual(sorted(SystemLog.objects.values_list('message', flat=True)), ['call 0', 'call 2'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SingleFlightCacheTests(TestCase):
+    """Tests for the shared stats cache"""
+
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.lock_dir, ignore_errors=True)
+        caches['stats'].clear()
+
+    def make_cache(self, ttl=60, stale_ttl=60):
+        return SingleFlightCache(ttl=ttl, stale_ttl=stale_ttl, lock_dir=self.lock_dir)
+
+    def test_concurrent_misses_share_one_fetch(self):
+        cache = self.make_cache()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'totalVotes': 7}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: cache.get_or_compute('results', fetch), range(8)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'totalVotes': 7}] * 8)
+
+    def test_stale_entry_is_served_while_revalidating(self):
+        cache = self.make_cache(ttl=0)
+        cache.get_or_compute('results', lambda: 'old')
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return 'new'
+
+        self.assertEqual(cache.get_or_compute('results', fetch), 'old')
+        self.assertTrue(refreshed.wait(2))
+
+    def test_invalidate_forces_refetch(self):
+        cache = self.make_cache()
+        cache.get_or_compute('results', lambda: 'old')
+        cache.invalidate('results')
+
+        self.assertEqual(cache.get_or_compute('results', lambda: 'new'), 'new')
+
+
+class FetchConcurrentlyTests(TestCase):
+    """Tests for concurrent backend fan-out"""
+
+    def test_calls_overlap_and_failures_stay_separate(self):
+        def slow(value):
+            time.sleep(0.2)
+            return value
+
+        def broken():
+            raise RuntimeError('backend down')
+
+        started = time.monotonic()
+        results = fetch_concurrently({
+            'get_results': lambda: slow('results'),
+            'get_all_votes': lambda: slow('votes'),
+            'health_check': broken,
+        })
+
+        self.assertLess(time.monotonic() - started, 0.35)
+        self.assertEqual(results['get_results'], 'results')
+        self.assertEqual(results['get_all_votes'], 'votes')
+        self.assertIsInstance(results['health_check'], RuntimeError)
+
+    def test_slow_call_misses_its_deadline(self):
+        fanout = {'ENABLED': True, 'MAX_WORKERS': 4, 'TIMEOUTS': {'default': 0.1}}
+        with self.settings(BACKEND_FANOUT=fanout):
+            results = fetch_concurrently({
+                'get_results': lambda: 'results',
+                'get_all_votes': lambda: time.sleep(0.5),
+            })
+
+        self.assertEqual(results['get_results'], 'results')
+        self.assertIsInstance(results['get_all_votes'], TimeoutError)
+
+    @override_settings(CACHES=TEST_CACHES)
+    def test_dashboard_stats_survive_votes_failure(self):
+        caches['stats'].clear()
+        service = VotingDataService()
+        results = {'totalVotes': 3, 'results': [{'teamId': 'team-a', 'votes': 3}]}
+        with mock.patch.object(service.api, 'get_results', return_value=results), \
+                mock.patch.object(service.api, 'get_all_votes', side_effect=Exception('timeout')):
+            stats = service.get_dashboard_stats()
+
+        self.assertTrue(stats['backend_connected'])
+        self.assertEqual(stats['total_votes'], 3)
+        self.assertEqual(stats['unique_voters'], 0)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LiveStreamTests(TransactionTestCase):
+    """Tests for the Server-Sent Events dashboard stream (the poller reads from its own thread)"""
+
+    serialized_rollback = True
+
+    SUBSCRIBERS = 300
+
+    def stats(self, team_b_votes=1, backend_connected=True):
+        return {'total_votes': team_b_votes, 'unique_voters': team_b_votes, 'backend_connected': backend_connected,
+                'last_updated': None,
+                'results': [{'teamName': 'Team 01', 'votes': 0, 'percentage': 0},
+                            {'teamName': 'Team 02', 'votes': team_b_votes, 'percentage': 100}]}
+
+    async def next_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), timeout=2)
+        while chunk.startswith((b'retry:', b':')):
+            chunk = await asyncio.wait_for(anext(stream), timeout=2)
+        event, data = chunk.decode().strip().split('\n')
+        return event[len('event: '):], json.loads(data[len('data: '):])
+
+    async def test_subscribers_share_one_upstream_poller(self):
+        broadcaster = live.get_broadcaster()
+        broadcaster.poll_interval = 0.2
+        stats = mock.Mock(return_value=self.stats())
+        url = reverse('management:live_stream_ajax')
+
+        with mock.patch.object(VotingDataService, 'get_dashboard_stats', stats):
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            responses, streams = [], []
+            for _ in range(self.SUBSCRIBERS):
+                response = await self.async_client.get(url)
+                responses.append(response)
+                streams.append(aiter(response.streaming_content))
+            snapshots = [await self.next_event(stream) for stream in streams]
+            after = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+            per_connection = sum(stat.size_diff for stat in after.compare_to(before, 'filename')) / self.SUBSCRIBERS
+            self.assertEqual(broadcaster.subscriber_count, self.SUBSCRIBERS)
+            self.assertTrue(all(event == 'snapshot' for event, _ in snapshots))
+            # One upstream read per poll (plus one in flight), however many clients are connected
+            self.assertLessEqual(stats.call_count, broadcaster.polls + 1)
+            self.assertLess(broadcaster.polls, self.SUBSCRIBERS,
+                            f"{broadcaster.polls} upstream polls for {self.SUBSCRIBERS} subscribers")
+            self.assertLess(per_connection, 64 * 1024,
+                            f"{per_connection / 1024:.1f} KiB per connection for {self.SUBSCRIBERS} subscribers")
+
+            stats.return_value = self.stats(team_b_votes=2, backend_connected=False)
+            await sync_to_async(Vote.objects.create)(vote_id='live-1', user_team='team-a', voted_for='team-b',
+                                                     user_identifier='device-1', name='Alice')
+            events = {}
+            while len(events) < 3:
+                event, data = await self.next_event(streams[-1])
+                events[event] = data
+
+        self.assertEqual(events['tally']['results'], {'Team 02': {'votes': 2, 'percentage': 100}})
+        self.assertFalse(events['health']['backend_connected'])
+        self.assertEqual(events['vote']['name'], 'Alice')
+
+        for response in responses:
+            response.close()
+        self.assertEqual(broadcaster.subscriber_count, 0)
+        await broadcaster.close()
+
+    def test_wsgi_pages_poll_instead(self):
+        # The test client is a WSGI handler
+        self.assertEqual(self.client.get(reverse('management:live_stream_ajax')).status_code, 204)
+        with mock.patch.object(VotingAPIService, 'get_all_votes', return_value={'uniqueVoters': 0}):
+            response = self.client.get(reverse('management:votes_list'))
+        self.assertFalse(response.context['live_stream_available'])
+        self.assertNotContains(response, 'startLiveUpdates')
+
+    async def test_slow_subscriber_is_disconnected(self):
+        broadcaster = live.LiveBroadcaster(poll_interval=60, queue_size=2)
+        subscriber = live.Subscriber(queue_size=2)
+        broadcaster._subscribers.add(subscriber)
+        broadcaster._state = {'total_votes': 1, 'unique_voters': 1, 'backend_connected': True,
+                              'circuit_state': 'closed', 'last_updated': None, 'results': {}}
+
+        for votes in range(2, 6):
+            broadcaster._publish(dict(broadcaster._state, total_votes=votes), [])
+
+        self.assertTrue(subscriber.closed)
+        self.assertEqual(broadcaster.subscriber_count, 0)
+        self.assertEqual([chunk async for chunk in subscriber], [])
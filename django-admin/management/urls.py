@@ -10,6 +10,7 @@ urlpatterns = [
     path('results/', views.ResultsView.as_view(), name='results'),
     path('logs/', views.SystemLogsView.as_view(), name='system_logs'),
     path('admin-actions/', views.AdminActionsView.as_view(), name='admin_actions'),
+    path('profiling/', views.ProfilingView.as_view(), name='profiling'),
     
     # AJAX endpoints
     path('ajax/sync-votes/', views.sync_votes_ajax, name='sync_votes_ajax'),
@@ -19,6 +20,14 @@ urlpatterns = [
     path('ajax/device-stats/', views.device_stats_ajax, name='device_stats_ajax'),
     path('ajax/health-check/', views.health_check_ajax, name='health_check_ajax'),
     path('ajax/dashboard-stats/', views.dashboard_stats_ajax, name='dashboard_stats_ajax'),
+    path('ajax/live/', views.live_stream_ajax, name='live_stream_ajax'),
+    path('ajax/analytics/<slug:report>/', views.analytics_ajax, name='analytics_ajax'),
+    
+    # Streaming CSV / NDJSON exports
+    path('export/<slug:dataset>/', views.export_data, name='export_data'),
+    
+    # Prometheus scrape endpoint
+    path('metrics/', views.metrics_view, name='metrics'),
     
     # API endpoints for voting
     path('api/health/', api_views.health_check, name='api_health'),
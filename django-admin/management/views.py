@@ -1,19 +1,25 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
-from django.core.paginator import Paginator
-from django.db.models import Q
-from django.utils import timezone
-from django.utils.dateparse import parse_datetime
+from django.conf import settings
 import json
 import logging
-
-from .models import Vote, VoteResults, SystemLog
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from .models import Vote, VoteResults, SystemLog, VoterAggregate
+from .teams import get_registry
+from .live import EventStream, get_broadcaster
+from .pagination import KeysetPaginator
+from . import analytics, exports, metrics, profiling, search as search_index
 from .services import VotingAPIService, VotingDataService
+from .stats_cache import get_stats_cache
 
 logger = logging.getLogger(__name__)
 
@@ -34,73 +40,25 @@ class DashboardView(View):
     def get(self, request):
         try:
             data_service = VotingDataService()
-            api_service = VotingAPIService()
             stats = data_service.get_dashboard_stats()
 
-            # Get all votes from backend admin endpoint and aggregate by voter name
-            backend_votes_response = api_service.get_all_votes()
-            backend_votes = backend_votes_response.get('votes', [])
-
-            # Aggregate votes by voter name (combine votedFor for the same name)
-            name_to_votes = {}
-            for v in backend_votes:
-                # Normalize fields from backend
-                voter_name = (v.get('name') or '').strip()
-                if not voter_name:
-                    voter_name = 'Anonymous'
-
-                voted_for_display = v.get('votedFor') or ''  # Already a display name like "Team 01"
-                user_team_display = v.get('userTeam') or ''   # Display name if present
-                ip_addr = v.get('ipAddress')
-                ts = parse_datetime(v.get('timestamp')) if v.get('timestamp') else None
-
-                if voter_name not in name_to_votes:
-                    name_to_votes[voter_name] = {
-                        'name': voter_name,
-                        'team_display_name': user_team_display,
-                        'voted_for_set': set(),
-                        'timestamp': ts,
-                        'ip_address': ip_addr,
-                        'user_identifier': '',
-                    }
-
-                entry = name_to_votes[voter_name]
-                if voted_for_display:
-                    entry['voted_for_set'].add(voted_for_display)
-                # Prefer non-empty team name; keep latest timestamp/ip
-                if user_team_display and not entry['team_display_name']:
-                    entry['team_display_name'] = user_team_display
-                if ts and (entry['timestamp'] is None or ts > entry['timestamp']):
-                    entry['timestamp'] = ts
-                    entry['ip_address'] = ip_addr
-
-            # Convert to list for template with combined voted_for
-            recent_votes = []
-            for agg in name_to_votes.values():
-                combined = dict(agg)
-                combined['voted_for_display_name'] = ', '.join(sorted(list(agg['voted_for_set']))) if agg['voted_for_set'] else ''
-                # Remove helper set
-                combined.pop('voted_for_set', None)
-                recent_votes.append(combined)
-
-            # Sort by latest timestamp desc and limit
-            recent_votes.sort(key=lambda x: x.get('timestamp') or timezone.make_aware(timezone.datetime.min), reverse=True)
-            recent_votes = recent_votes[:10]
+            # Latest voters from the incrementally maintained aggregate table
+            recent_votes = list(VoterAggregate.objects.in_round().order_by('-latest_timestamp')[:10])
 
             # Calculate named vs anonymous counts
-            named_voters_count = sum(1 for rv in recent_votes if rv.get('name') and rv.get('name').strip() and rv.get('name') != 'Anonymous')
-            anonymous_voters_count = sum(1 for rv in recent_votes if not rv.get('name') or rv.get('name') == 'Anonymous')
+            named_voters_count = sum(1 for rv in recent_votes if rv.name != VoterAggregate.ANONYMOUS)
+            anonymous_voters_count = len(recent_votes) - named_voters_count
             
             # Get recent logs
             recent_logs = SystemLog.objects.order_by('-timestamp')[:10]
             
             # Get team performance data for charts
-            # Ensure all 4 teams are present and sort by votes desc so the first is the true leader
+            # Ensure every team is present and sort by votes desc so the first is the true leader
             backend_results = stats.get('results', []) or []
             name_to_result = {r.get('teamName'): r for r in backend_results}
 
             team_performance = []
-            for team_code, team_display_name in Vote.TEAM_CHOICES:
+            for team_code, team_display_name in get_registry().choices:
                 r = name_to_result.get(team_display_name, {})
                 team_performance.append({
                     'name': team_display_name,
@@ -142,34 +100,35 @@ class DashboardView(View):
 class VotesListView(View):
     """View to list and manage all votes"""
     
+    @staticmethod
+    def build_queryset(search='', team_filter=''):
+        votes = Vote.objects.in_round()
+        
+        if team_filter:
+            votes = votes.filter(user_team=team_filter)
+        
+        if search:
+            # Full-text index (best matches first), icontains without FTS5
+            return search_index.search(votes, search)
+        
+        return votes.order_by('-timestamp', '-id')
+    
     def get(self, request):
         try:
             # Get query parameters
             search = request.GET.get('search', '')
             team_filter = request.GET.get('team', '')
-            page = request.GET.get('page', 1)
+            cursor = request.GET.get('cursor')
             
             # Build queryset
-            votes = Vote.objects.all()
-            
-            if search:
-                votes = votes.filter(
-                    Q(user_identifier__icontains=search) |
-                    Q(vote_id__icontains=search) |
-                    Q(ip_address__icontains=search)
-                )
-            
-            if team_filter:
-                votes = votes.filter(user_team=team_filter)
+            votes = self.build_queryset(search, team_filter)
             
-            votes = votes.order_by('-timestamp')
-            
-            # Pagination
-            paginator = Paginator(votes, 25)
-            votes_page = paginator.get_page(page)
+            # Keyset pagination: deep pages cost the same as the first
+            paginator = KeysetPaginator(votes, 25, count_limit=settings.LIST_COUNT_LIMIT)
+            votes_page = paginator.get_page(cursor)
             
             # Team choices for filter
-            team_choices = Vote.TEAM_CHOICES
+            team_choices = get_registry().choices
             
             context = {
                 'votes': votes_page,
@@ -190,13 +149,17 @@ class VotesListView(View):
 class ResultsView(View):
     """View to display voting results and analytics"""
     
+    @staticmethod
+    def build_queryset():
+        return VoteResults.objects.in_round().order_by('-vote_count')
+    
     def get(self, request):
         try:
             data_service = VotingDataService()
             stats = data_service.get_dashboard_stats()
             
             # Get detailed results
-            results = VoteResults.objects.all().order_by('-vote_count')
+            results = self.build_queryset()
             
             # Calculate additional analytics
             analytics = {
@@ -231,34 +194,35 @@ class ResultsView(View):
 class SystemLogsView(View):
     """View to display system logs and activities"""
     
+    @staticmethod
+    def build_queryset(level_filter='', action_filter='', search=''):
+        logs = SystemLog.objects.all()
+        
+        if level_filter:
+            logs = logs.filter(level=level_filter)
+        
+        if action_filter:
+            logs = logs.filter(action_type=action_filter)
+        
+        if search:
+            return search_index.search(logs, search)
+        
+        return logs.order_by('-timestamp', '-id')
+    
     def get(self, request):
         try:
             # Get query parameters
             level_filter = request.GET.get('level', '')
             action_filter = request.GET.get('action', '')
             search = request.GET.get('search', '')
-            page = request.GET.get('page', 1)
+            cursor = request.GET.get('cursor')
             
             # Build queryset
-            logs = SystemLog.objects.all()
-            
-            if level_filter:
-                logs = logs.filter(level=level_filter)
+            logs = self.build_queryset(level_filter, action_filter, search)
             
-            if action_filter:
-                logs = logs.filter(action_type=action_filter)
-            
-            if search:
-                logs = logs.filter(
-                    Q(message__icontains=search) |
-                    Q(user__icontains=search)
-                )
-            
-            logs = logs.order_by('-timestamp')
-            
-            # Pagination
-            paginator = Paginator(logs, 50)
-            logs_page = paginator.get_page(page)
+            # Keyset pagination: deep pages cost the same as the first
+            paginator = KeysetPaginator(logs, 50, count_limit=settings.LIST_COUNT_LIMIT)
+            logs_page = paginator.get_page(cursor)
             
             # Filter choices
             level_choices = SystemLog.LOG_LEVELS
@@ -282,6 +246,26 @@ class SystemLogsView(View):
             return render(request, 'management/system_logs.html', {'logs': [], 'page_title': 'System Logs'})
 
 
+class ProfilingView(View):
+    """View to display the slowest requests recorded by the profiling middleware"""
+    
+    def get(self, request):
+        slowest = profiling.get_slowest_requests()
+        context = {
+            'enabled': settings.REQUEST_PROFILING['ENABLED'],
+            'requests': [profile.as_dict() for profile in slowest.snapshot()],
+            'capacity': slowest.size,
+            'pid': os.getpid(),
+            'page_title': 'Request Profiling'
+        }
+        return render(request, 'management/profiling.html', context)
+    
+    def post(self, request):
+        profiling.get_slowest_requests().clear()
+        messages.success(request, 'Cleared the slowest requests for this worker')
+        return redirect('management:profiling')
+
+
 class AdminActionsView(View):
     """View for administrative actions"""
     
@@ -289,18 +273,23 @@ class AdminActionsView(View):
         try:
             api_service = VotingAPIService()
             
-            # Check backend health
-            try:
-                health = api_service.health_check()
-                backend_status = 'healthy'
-                backend_info = health
-            except Exception as e:
-                backend_status = 'error'
-                backend_info = {'error': str(e)}
+            # Check backend health (as last seen by the sync worker with local reads on)
+            if settings.SYNC_WORKER['LOCAL_READS']:
+                backend_info = VotingDataService(api_service).get_backend_health()
+                backend_status = 'healthy' if backend_info['backend_connected'] else 'error'
+            else:
+                try:
+                    health = api_service.health_check()
+                    backend_status = 'healthy'
+                    backend_info = health
+                except Exception as e:
+                    backend_status = 'error'
+                    backend_info = {'error': str(e)}
             
             context = {
                 'backend_status': backend_status,
                 'backend_info': backend_info,
+                'circuit': api_service.breaker.snapshot(),
                 'page_title': 'Admin Actions'
             }
             
@@ -323,12 +312,16 @@ def sync_votes_ajax(request):
         user = request.user.username if request.user.is_authenticated else 'anonymous'
         ip_address = get_client_ip(request)
         
-        synced_count = data_service.sync_votes_from_backend(user=user, ip_address=ip_address)
+        full = (request.POST.get('full') or request.GET.get('full')) in ('1', 'true')
+        
+        metrics = data_service.sync_votes_from_backend(user=user, ip_address=ip_address, full=full)
+        synced_count = metrics['inserted'] + metrics['updated']
         
         return JsonResponse({
             'success': True,
             'message': f'Successfully synced {synced_count} votes from backend',
-            'synced_count': synced_count
+            'synced_count': synced_count,
+            'metrics': metrics
         })
         
     except Exception as e:
@@ -403,17 +396,48 @@ def reset_votes_ajax(request):
         }, status=500)
 
 
+@require_http_methods(["GET"])
+def analytics_ajax(request, report):
+    """AJAX endpoint for the results page's analytics charts (management/analytics.py)"""
+    if report not in analytics.REPORTS:
+        return JsonResponse({
+            'success': False,
+            'error': f"report must be one of {', '.join(analytics.REPORTS)}"
+        }, status=404)
+    
+    try:
+        return JsonResponse({'success': True, 'report': report, **analytics.report(report)})
+    
+    except Exception as e:
+        logger.error(f"Analytics AJAX error: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
 @require_http_methods(["GET"])
 def health_check_ajax(request):
     """AJAX endpoint to check backend health"""
     try:
         api_service = VotingAPIService()
+        if settings.SYNC_WORKER['LOCAL_READS']:
+            # Report what the sync worker last saw instead of calling the backend
+            health = VotingDataService(api_service).get_backend_health()
+            return JsonResponse({
+                'success': health['backend_connected'],
+                'health': health,
+                'backend_connected': health['backend_connected'],
+                'circuit': api_service.breaker.snapshot()
+            }, status=200 if health['backend_connected'] else 503)
+        
         health = api_service.health_check()
         
         return JsonResponse({
             'success': True,
             'health': health,
-            'backend_connected': True
+            'backend_connected': True,
+            'circuit': api_service.breaker.snapshot()
         })
         
     except Exception as e:
@@ -421,11 +445,40 @@ def health_check_ajax(request):
         return JsonResponse({
             'success': False,
             'error': str(e),
-            'backend_connected': False
+            'backend_connected': False,
+            'circuit': VotingAPIService().breaker.snapshot()
         }, status=500)
 
 
 @require_http_methods(["GET"])
+async def live_stream_ajax(request):
+    """Server-Sent Events stream of tally, vote and backend-health changes"""
+    if not isinstance(request, ASGIRequest):
+        # WSGI drains an async stream before sending a byte, holding the
+        # worker forever; 204 tells EventSource not to reconnect
+        return HttpResponse(status=204)
+    broadcaster = get_broadcaster()
+    subscriber = broadcaster.subscribe()
+    response = StreamingHttpResponse(EventStream(broadcaster, subscriber), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
+
+
+def _dashboard_stats_etag(request):
+    # Refresh expired stats first: a changed recompute bumps the version
+    if not get_stats_cache().is_fresh('dashboard_stats'):
+        VotingDataService().get_dashboard_stats()
+    return str(get_stats_cache().version())
+
+
+def _dashboard_stats_last_modified(request):
+    return datetime.fromtimestamp(get_stats_cache().version() / 1e6, tz=dt_timezone.utc)
+
+
+@require_http_methods(["GET"])
+@cache_control(no_cache=True)
+@condition(etag_func=_dashboard_stats_etag, last_modified_func=_dashboard_stats_last_modified)
 def dashboard_stats_ajax(request):
     """AJAX endpoint to get dashboard statistics"""
     try:
@@ -504,4 +557,66 @@ def device_stats_ajax(request):
         return JsonResponse({
             'success': False,
             'error': str(e)
-        }, status=500)
\ No newline at end of file
+        }, status=500)
+
+
+def _export_source(dataset, params):
+    """(rows, columns) for an export, filtered like the matching list view"""
+    if dataset == 'votes':
+        votes = VotesListView.build_queryset(params.get('search', ''), params.get('team', ''))
+        return exports.queryset_rows(votes, exports.VOTE_COLUMNS), exports.VOTE_COLUMNS
+    if dataset == 'logs':
+        logs = SystemLogsView.build_queryset(params.get('level', ''), params.get('action', ''),
+                                             params.get('search', ''))
+        return exports.queryset_rows(logs, exports.LOG_COLUMNS), exports.LOG_COLUMNS
+    if dataset == 'results':
+        interval = params.get('interval', 'hour')
+        if interval not in exports.RESULTS_INTERVALS:
+            raise ValueError(f"interval must be one of {', '.join(exports.RESULTS_INTERVALS)}")
+        votes = Vote.objects.in_round()
+        if params.get('team'):
+            votes = votes.filter(voted_for=params['team'])
+        return exports.results_history_rows(votes, interval), exports.RESULTS_HISTORY_COLUMNS
+    raise LookupError(f"Unknown export: {dataset}")
+
+
+@require_http_methods(["GET"])
+def export_data(request, dataset):
+    """
+    Stream votes, results history or system logs as CSV or NDJSON.
+
+    Accepts the list views' filters plus ``format=csv|ndjson`` and ``gzip=1``.
+    """
+    fmt = request.GET.get('format', 'csv')
+    gzip = request.GET.get('gzip') in ('1', 'true')
+    
+    if fmt not in exports.EXPORT_FORMATS:
+        return JsonResponse({
+            'success': False,
+            'error': f"format must be one of {', '.join(exports.EXPORT_FORMATS)}"
+        }, status=400)
+    
+    try:
+        rows, columns = _export_source(dataset, request.GET)
+    except LookupError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=404)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    content_type, extension = exports.EXPORT_FORMATS[fmt]
+    filename = f"{dataset}-{datetime.now(dt_timezone.utc):%Y%m%d-%H%M%S}.{extension}"
+    if gzip:
+        content_type, filename = 'application/gzip', f'{filename}.gz'
+    
+    response = StreamingHttpResponse(exports.stream_export(rows, columns, fmt, gzip=gzip),
+                                     content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """Prometheus text exposition of the metrics of every worker process"""
+    body, content_type = metrics.render()
+    return HttpResponse(body, content_type=content_type)
@@ -72,10 +72,10 @@ function stopAutoRefresh() {
 
 // Refresh dashboard data via AJAX
 function refreshDashboardData() {
-    fetch(window.location.pathname + '?ajax=1')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
+    fetchIfChanged(document.body.dataset.statsUrl)
+        .then(({ data, changed }) => {
+            // Unchanged polls come back as an empty 304
+            if (data.success && changed) {
                 updateDashboardElements(data);
                 showToast('success', 'Dashboard updated');
             }
@@ -96,14 +96,7 @@ function updateDashboardElements(data) {
         updateElement('last-updated', formatTimeAgo(stats.last_updated));
         
         // Update backend connection status
-        const backendStatus = document.getElementById('backend-connection');
-        if (backendStatus) {
-            if (stats.backend_connected) {
-                backendStatus.innerHTML = '<span class="text-success"><i class="fas fa-check-circle me-1"></i>Connected</span>';
-            } else {
-                backendStatus.innerHTML = '<span class="text-danger"><i class="fas fa-times-circle me-1"></i>Disconnected</span>';
-            }
-        }
+        updateBackendStatus(stats.backend_connected, stats.circuit && stats.circuit.state);
     }
     
     // Update charts if data is available
@@ -112,6 +105,152 @@ function updateDashboardElements(data) {
     }
 }
 
+// Live updates (Server-Sent Events)
+let liveSource = null;
+
+function startLiveUpdates(url) {
+    if (!window.EventSource) {
+        return false;
+    }
+    stopLiveUpdates();
+    liveSource = new EventSource(url);
+    
+    liveSource.addEventListener('snapshot', function(event) {
+        const state = JSON.parse(event.data);
+        applyTally(state);
+        updateBackendStatus(state.backend_connected, state.circuit_state);
+    });
+    liveSource.addEventListener('tally', function(event) {
+        applyTally(JSON.parse(event.data));
+    });
+    liveSource.addEventListener('health', function(event) {
+        const health = JSON.parse(event.data);
+        updateBackendStatus(health.backend_connected, health.circuit_state);
+    });
+    liveSource.addEventListener('vote', function(event) {
+        applyVote(JSON.parse(event.data));
+    });
+    
+    console.log('Live updates started');
+    return true;
+}
+
+function stopLiveUpdates() {
+    if (liveSource) {
+        liveSource.close();
+        liveSource = null;
+    }
+}
+
+// Patch totals, rankings and the chart; results may be a list or a {teamName: result} map
+function applyTally(tally) {
+    updateElement('total-votes', tally.total_votes);
+    updateElement('unique-voters', tally.unique_voters);
+    if (tally.last_updated) {
+        updateElement('last-updated', formatTimeAgo(tally.last_updated));
+    }
+    
+    let results = tally.results || {};
+    if (Array.isArray(results)) {
+        results = Object.fromEntries(results.map(r => [r.teamName, r]));
+    }
+    
+    Object.entries(results).forEach(([teamName, result]) => {
+        const percentage = Number(result.percentage || 0);
+        document.querySelectorAll('[data-team-votes]').forEach(el => {
+            if (el.dataset.teamVotes === teamName) el.textContent = result.votes;
+        });
+        document.querySelectorAll('[data-team-percentage]').forEach(el => {
+            if (el.dataset.teamPercentage === teamName) el.textContent = percentage.toFixed(1);
+        });
+        document.querySelectorAll('[data-team-progress]').forEach(el => {
+            if (el.dataset.teamProgress === teamName) {
+                el.style.width = percentage + '%';
+                el.setAttribute('aria-valuenow', percentage);
+            }
+        });
+    });
+    
+    const chart = chartInstances.votingChart;
+    if (chart) {
+        chart.data.labels.forEach((label, index) => {
+            if (results[label]) {
+                chart.data.datasets[0].data[index] = results[label].votes;
+            }
+        });
+        chart.update('none');
+    }
+}
+
+// circuitState is the backend circuit breaker's state: closed, open or half_open
+function updateBackendStatus(connected, circuitState) {
+    let label = connected ? 'Backend Online' : 'Backend Offline';
+    if (circuitState === 'open') {
+        label += ' (paused)';
+    } else if (circuitState === 'half_open') {
+        label = 'Backend Recovering';
+    }
+    const badge = document.getElementById('backend-status');
+    if (badge) {
+        badge.className = connected ? 'badge bg-success' : (circuitState === 'half_open' ? 'badge bg-warning' : 'badge bg-danger');
+        badge.innerHTML = '<i class="fas fa-circle me-1"></i>' + label;
+    }
+    const backendStatus = document.getElementById('backend-connection');
+    if (backendStatus) {
+        backendStatus.innerHTML = connected
+            ? '<span class="text-success"><i class="fas fa-check-circle me-1"></i>Connected</span>'
+            : '<span class="text-danger"><i class="fas fa-times-circle me-1"></i>Disconnected</span>'
+              + '<div class="small text-muted">Showing last synced local data</div>';
+    }
+}
+
+// Move the voter's row to the top of each voters table (adding it if new), keeping 10 rows
+function applyVote(vote) {
+    ['voters-table', 'recent-votes-table'].forEach(tableId => {
+        const tbody = document.querySelector(`#${tableId} tbody`);
+        if (!tbody) return;
+        
+        let row = Array.from(tbody.rows).find(r => r.dataset.voter === vote.name);
+        if (row) {
+            const votedFor = row.querySelector('[data-voted-for]');
+            if (votedFor) {
+                const teams = new Set(votedFor.textContent.split(',').map(t => t.trim()).filter(Boolean));
+                teams.add(vote.voted_for_display_name);
+                votedFor.textContent = Array.from(teams).sort().join(', ');
+            }
+        } else {
+            row = buildVoterRow(vote, tableId === 'voters-table');
+        }
+        tbody.insertBefore(row, tbody.firstChild);
+        while (tbody.rows.length > 10) {
+            tbody.deleteRow(-1);
+        }
+    });
+}
+
+function buildVoterRow(vote, detailed) {
+    const row = document.createElement('tr');
+    row.dataset.voter = vote.name;
+    const cells = [
+        [vote.name, detailed ? 'text-dark fw-bold' : 'text-primary fw-bold'],
+        [vote.team_display_name, 'badge bg-info'],
+        [vote.voted_for_display_name, 'badge bg-success', true],
+        ['Just now', 'text-muted small'],
+    ];
+    if (detailed) {
+        cells.push([vote.ip_address || 'N/A', 'small font-monospace']);
+    }
+    cells.forEach(([text, className, isVotedFor]) => {
+        const cell = row.insertCell();
+        const span = document.createElement('span');
+        span.className = className;
+        span.textContent = text;  // Names are user input; never insert as HTML
+        if (isVotedFor) span.dataset.votedFor = '';
+        cell.appendChild(span);
+    });
+    return row;
+}
+
 // Helper function to update element content
 function updateElement(id, content) {
     const element = document.getElementById(id);
@@ -306,17 +445,51 @@ function makeApiRequest(url, options = {}) {
         });
 }
 
+// Conditional GET: resend the last ETag and reuse the cached body on 304
+const conditionalResponses = {};
+
+function fetchIfChanged(url) {
+    const cached = conditionalResponses[url];
+    const headers = { 'X-Requested-With': 'XMLHttpRequest' };
+    if (cached) {
+        headers['If-None-Match'] = cached.etag;
+    }
+    
+    // no-store: we handle revalidation ourselves instead of the browser cache
+    return fetch(url, { headers, cache: 'no-store' })
+        .then(response => {
+            if (response.status === 304 && cached) {
+                return { data: cached.data, changed: false };
+            }
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            return response.json().then(data => {
+                const etag = response.headers.get('ETag');
+                if (etag) {
+                    conditionalResponses[url] = { etag, data };
+                }
+                return { data, changed: true };
+            });
+        });
+}
+
 // Export functions for global use
 window.adminUtils = {
     showToast,
     showButtonLoading,
     hideButtonLoading,
     makeApiRequest,
+    fetchIfChanged,
     formatTimeAgo,
     formatNumber,
     copyToClipboard,
     startAutoRefresh,
     stopAutoRefresh,
+    startLiveUpdates,
+    stopLiveUpdates,
+    applyTally,
+    updateBackendStatus,
     updateChart,
     destroyChart
 };
@@ -324,6 +497,7 @@ window.adminUtils = {
 // Cleanup on page unload
 window.addEventListener('beforeunload', function() {
     stopAutoRefresh();
+    stopLiveUpdates();
     
     // Destroy all chart instances
     Object.keys(chartInstances).forEach(chartId => {
@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -56,6 +58,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Removes itself unless REQUEST_PROFILING['ENABLED']
+    'management.profiling.RequestProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'voting_admin.urls'
@@ -70,6 +74,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'management.context_processors.live_stream',
             ],
         },
     },
@@ -84,10 +89,29 @@ WSGI_APPLICATION = 'voting_admin.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': config('DATABASE_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'OPTIONS': {
+            # Take the write lock when a transaction starts so concurrent vote
+            # writers queue on the busy timeout instead of failing to upgrade
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # Keep connections open across requests (the PRAGMAs below run once
+        # per connection) and check they still work before reusing them
+        'CONN_MAX_AGE': config('DATABASE_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# PRAGMAs run on every new SQLite connection (management/sqlite.py):
+# 'tuned' (WAL, synchronous=NORMAL, busy timeout, mmap, bigger cache) or
+# 'default' (SQLite's own). SQLITE_PRAGMAS overrides single values, e.g.
+# {'mmap_size': 0}. SQLITE_SYNCHRONOUS=FULL makes every commit survive power
+# loss, at an fsync per commit.
+SQLITE_PROFILE = config('SQLITE_PROFILE', default='tuned')
+SQLITE_PRAGMAS = {}
+if config('SQLITE_SYNCHRONOUS', default=''):
+    SQLITE_PRAGMAS['synchronous'] = config('SQLITE_SYNCHRONOUS')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -130,6 +154,214 @@ STATIC_ROOT = BASE_DIR / 'staticfiles_build' / 'static'
 # Voting API Configuration
 VOTING_API_BASE_URL = config('VOTING_API_BASE_URL', default='http://192.168.20.52:3002')
 
+# Shared keep-alive connection pool for VotingAPIService (per worker process);
+# calls beyond it use a one-off connection instead of waiting
+VOTING_API_POOL_SIZE = config('VOTING_API_POOL_SIZE', default=10, cast=int)
+# Retries for idempotent GETs only (connection errors and 502/503/504, not read timeouts)
+VOTING_API_RETRIES = config('VOTING_API_RETRIES', default=2, cast=int)
+# (connect, read) timeouts in seconds, keyed by VotingAPIService method name
+VOTING_API_TIMEOUTS = {
+    'default': (3.05, 10),
+    'health_check': (1, 2),
+    'get_results': (2, 5),
+    'get_vote_status': (2, 5),
+    'get_all_votes': (3.05, 30),
+}
+
+# Circuit breaker around VotingAPIService, shared by all workers through the
+# stats cache (management/circuit_breaker.py). FAILURE_THRESHOLD consecutive
+# connection errors, timeouts or 5xx responses open it; calls then fail fast
+# for RECOVERY_TIMEOUT seconds before one probe call is let through. Another
+# worker may probe if the first hasn't reported back within PROBE_TIMEOUT.
+VOTING_API_CIRCUIT_BREAKER = {
+    'ENABLED': config('VOTING_API_CIRCUIT_BREAKER_ENABLED', default=True, cast=bool),
+    'FAILURE_THRESHOLD': config('VOTING_API_CIRCUIT_FAILURE_THRESHOLD', default=5, cast=int),
+    'RECOVERY_TIMEOUT': config('VOTING_API_CIRCUIT_RECOVERY_TIMEOUT', default=30, cast=float),
+    'PROBE_TIMEOUT': config('VOTING_API_CIRCUIT_PROBE_TIMEOUT', default=40, cast=float),
+}
+
+# Vote ingestion engine (management/ingestion.py)
+# Minimum seconds between catch-up reads of votes written by other workers
+VOTING_ENGINE_REFRESH_INTERVAL = config('VOTING_ENGINE_REFRESH_INTERVAL', default=0.25, cast=float)
+
+# Group commit for vote submissions (management/ingestion.py). A flusher thread
+# per worker writes queued votes in one transaction per batch of up to BATCH_SIZE,
+# FLUSH_INTERVAL_MS after the first vote of a batch arrives; each request returns
+# once its batch has committed. Bypassed inside an open transaction.
+VOTE_GROUP_COMMIT = {
+    'ENABLED': config('VOTE_GROUP_COMMIT_ENABLED', default=True, cast=bool),
+    'BATCH_SIZE': config('VOTE_GROUP_COMMIT_BATCH_SIZE', default=64, cast=int),
+    'FLUSH_INTERVAL_MS': config('VOTE_GROUP_COMMIT_FLUSH_INTERVAL_MS', default=5, cast=float),
+    'MAX_QUEUE': config('VOTE_GROUP_COMMIT_MAX_QUEUE', default=2000, cast=int),
+    # Seconds a request waits for its batch before answering 503
+    'COMMIT_TIMEOUT': config('VOTE_GROUP_COMMIT_TIMEOUT', default=10, cast=float),
+    # SQLite synchronous level for batch commits: FULL acknowledges a vote only
+    # once its batch is on disk, whatever SQLITE_PROFILE uses for other writes
+    'SYNCHRONOUS': config('VOTE_GROUP_COMMIT_SYNCHRONOUS', default='FULL'),
+}
+
+# Concurrent backend calls in dashboard/results views (management/services.py).
+# TIMEOUTS are per-call deadlines in seconds, keyed like VOTING_API_TIMEOUTS.
+BACKEND_FANOUT = {
+    'ENABLED': config('BACKEND_FANOUT_ENABLED', default=True, cast=bool),
+    'MAX_WORKERS': config('BACKEND_FANOUT_MAX_WORKERS', default=8, cast=int),
+    'TIMEOUTS': {
+        'default': 10,
+        'get_results': 5,
+        'get_all_votes': 30,
+    },
+}
+
+# Buffered SystemLog writer (management/logbuffer.py). When disabled, log rows
+# are written inline.
+SYSTEM_LOG_BUFFER = {
+    'ENABLED': config('SYSTEM_LOG_BUFFER_ENABLED', default=True, cast=bool),
+    'BATCH_SIZE': config('SYSTEM_LOG_BUFFER_BATCH_SIZE', default=100, cast=int),
+    'FLUSH_INTERVAL_MS': config('SYSTEM_LOG_BUFFER_FLUSH_INTERVAL_MS', default=200, cast=int),
+    'MAX_QUEUE': config('SYSTEM_LOG_BUFFER_MAX_QUEUE', default=10000, cast=int),
+}
+
+# Backend data cache shared by all worker processes (management/stats_cache.py)
+STATS_CACHE_ALIAS = 'stats'
+STATS_CACHE_TTL = config('STATS_CACHE_TTL', default=10, cast=float)
+# Seconds an expired entry may still be served while one refresh runs
+STATS_CACHE_STALE_TTL = config('STATS_CACHE_STALE_TTL', default=60, cast=float)
+STATS_CACHE_LOCATION = config('STATS_CACHE_LOCATION',
+                              default=str(Path(tempfile.gettempdir()) / 'voting_admin_cache'))
+STATS_CACHE_LOCK_DIR = str(Path(STATS_CACHE_LOCATION) / 'locks')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    STATS_CACHE_ALIAS: {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(Path(STATS_CACHE_LOCATION) / 'data'),
+    },
+}
+
+# Sliding-window rate limits on the public vote endpoints (management/ratelimit.py),
+# counted per client address and per userIdentifier as (requests, window seconds).
+# Kiosks send every voter's requests from one address, so the per-address limits
+# are generous. Counters are shared by every worker through a memory-mapped file
+# of SLOTS slots. The client address is REMOTE_ADDR; only when that is one of
+# TRUSTED_PROXIES (addresses or CIDR networks, e.g. "127.0.0.1,10.0.0.0/8") is
+# X-Forwarded-For read, taking its rightmost hop that isn't a trusted proxy.
+RATE_LIMIT = {
+    'ENABLED': config('RATE_LIMIT_ENABLED', default=True, cast=bool),
+    'TRUSTED_PROXIES': config('RATE_LIMIT_TRUSTED_PROXIES', default='', cast=Csv()),
+    'PATH': config('RATE_LIMIT_PATH', default=str(Path(STATS_CACHE_LOCATION) / 'ratelimit.bin')),
+    'SLOTS': config('RATE_LIMIT_SLOTS', default=65536, cast=int),
+    'ROUTES': {
+        'vote': {
+            'ip': (config('RATE_LIMIT_VOTE_PER_IP', default=120, cast=int), 60),
+            'identifier': (config('RATE_LIMIT_VOTE_PER_IDENTIFIER', default=5, cast=int), 60),
+        },
+        'vote_status': {
+            'ip': (config('RATE_LIMIT_STATUS_PER_IP', default=600, cast=int), 60),
+            'identifier': (config('RATE_LIMIT_STATUS_PER_IDENTIFIER', default=30, cast=int), 60),
+        },
+    },
+}
+
+# Background sync worker (manage.py run_sync_worker, management/sync_worker.py).
+# With LOCAL_READS on, the dashboard, results, health and device views read
+# only the local tables the worker keeps current and never call the backend.
+# INTERVALS are seconds between runs of each task, with +/-JITTER spread;
+# failing tasks back off exponentially up to MAX_BACKOFF seconds. With no
+# task run for STALE_AFTER seconds the worker counts as down.
+SYNC_WORKER = {
+    'LOCAL_READS': config('SYNC_WORKER_LOCAL_READS', default=False, cast=bool),
+    'INTERVALS': {
+        'results': config('SYNC_WORKER_RESULTS_INTERVAL', default=5, cast=float),
+        'votes': config('SYNC_WORKER_VOTES_INTERVAL', default=10, cast=float),
+        'devices': config('SYNC_WORKER_DEVICES_INTERVAL', default=30, cast=float),
+        # Folds sharded vote counters into VoteResults; never calls the backend
+        'tallies': config('SYNC_WORKER_TALLIES_INTERVAL', default=5, cast=float),
+        # Purges archived voting rounds beyond ROUNDS['KEEP_ARCHIVED']; local only
+        'rounds': config('SYNC_WORKER_ROUNDS_INTERVAL', default=300, cast=float),
+    },
+    'JITTER': config('SYNC_WORKER_JITTER', default=0.1, cast=float),
+    'MAX_BACKOFF': config('SYNC_WORKER_MAX_BACKOFF', default=300, cast=float),
+    'STALE_AFTER': config('SYNC_WORKER_STALE_AFTER', default=120, cast=float),
+    # Held by the running worker so a second one refuses to start
+    'LOCK_FILE': str(Path(STATS_CACHE_LOCK_DIR) / 'sync_worker.lock'),
+}
+
+# Counter slots per team for locally ingested votes (management/tallies.py).
+# More shards spread concurrent increments over more rows.
+TALLY_SHARDS = config('TALLY_SHARDS', default=8, cast=int)
+
+# Voting rounds (management/rounds.py). A reset opens a new round; the newest
+# KEEP_ARCHIVED old rounds stay readable and older ones have their rows
+# deleted, PURGE_BATCH_SIZE rows per transaction.
+ROUNDS = {
+    'KEEP_ARCHIVED': config('ROUNDS_KEEP_ARCHIVED', default=3, cast=int),
+    'PURGE_BATCH_SIZE': config('ROUNDS_PURGE_BATCH_SIZE', default=1000, cast=int),
+}
+
+# Teams are read through a per-process registry (management/teams.py). Saving
+# a Team reloads it in the same process at once; other processes check the
+# shared version in the stats cache at most this often (seconds).
+TEAM_REGISTRY_RECHECK_INTERVAL = config('TEAM_REGISTRY_RECHECK_INTERVAL', default=5, cast=float)
+
+# Vote analytics on the results page (management/analytics.py). Time series
+# are bucketed into wider intervals than a minute so a chart has at most
+# MAX_POINTS points.
+ANALYTICS = {
+    'MAX_POINTS': config('ANALYTICS_MAX_POINTS', default=720, cast=int),
+}
+
+# Rows per transaction when upserting/deleting votes during a backend sync
+VOTE_SYNC_BATCH_SIZE = config('VOTE_SYNC_BATCH_SIZE', default=500, cast=int)
+# Seconds between comparisons of local and backend vote ids when the counts
+# match (a deletion plus an insertion keeps them equal)
+VOTE_SYNC_RECONCILE_INTERVAL = config('VOTE_SYNC_RECONCILE_INTERVAL', default=300, cast=float)
+
+# Full-text searches with at most this many matches are ordered by relevance;
+# broader ones newest first (management/search.py)
+SEARCH_RANK_MAX_MATCHES = config('SEARCH_RANK_MAX_MATCHES', default=2000, cast=int)
+
+# The votes and logs lists count matching rows up to this many and show
+# "10000+" beyond it, instead of an exact COUNT(*) over the whole table
+LIST_COUNT_LIMIT = config('LIST_COUNT_LIMIT', default=10000, cast=int)
+
+# Rows fetched per database round trip by the streaming exports (management/exports.py)
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Prometheus metrics (management/metrics.py) are recorded by every worker process
+# into files in this directory and summed at /management/metrics/. prometheus_client
+# reads the environment variable when first imported, so it is set here.
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR',
+                                  default=str(Path(tempfile.gettempdir()) / 'voting_admin_metrics'))
+os.environ['PROMETHEUS_MULTIPROC_DIR'] = PROMETHEUS_MULTIPROC_DIR
+Path(PROMETHEUS_MULTIPROC_DIR).mkdir(parents=True, exist_ok=True)
+
+# Per-request profiling (management/profiling.py): Server-Timing headers with DB,
+# backend and render time, and the slowest requests per worker at /management/profiling/.
+# Off by default; when off the middleware is not loaded at all.
+REQUEST_PROFILING = {
+    'ENABLED': config('REQUEST_PROFILING_ENABLED', default=False, cast=bool),
+    # Slowest requests kept per worker process
+    'SLOWEST': config('REQUEST_PROFILING_SLOWEST', default=50, cast=int),
+}
+
+# Server-Sent Events stream for the dashboards (management/live.py). The stream
+# holds a connection open per client, so serve it from an ASGI worker, e.g.
+#   gunicorn voting_admin.asgi:application -k uvicorn.workers.UvicornWorker
+# Under WSGI the pages keep polling and the stream answers 204 No Content.
+LIVE_STREAM = {
+    # Seconds between polls of the shared upstream data (one poller per worker)
+    'POLL_INTERVAL': config('LIVE_STREAM_POLL_INTERVAL', default=1.0, cast=float),
+    # Seconds of silence before a keepalive comment is sent
+    'KEEPALIVE': config('LIVE_STREAM_KEEPALIVE', default=15.0, cast=float),
+    # Events queued per client before a slow client is disconnected
+    'QUEUE_SIZE': config('LIVE_STREAM_QUEUE_SIZE', default=100, cast=int),
+    'MAX_VOTES_PER_POLL': config('LIVE_STREAM_MAX_VOTES_PER_POLL', default=50, cast=int),
+    # Reconnect delay advertised to EventSource clients
+    'RETRY_MS': config('LIVE_STREAM_RETRY_MS', default=3000, cast=int),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 